@@ -1,55 +1,260 @@
 import os
+import json
+import time
+import base64
+import cProfile
 import secrets
 import logging
+import threading
 import tempfile
-import magic
 from werkzeug.utils import secure_filename
 from werkzeug.security import safe_join
 from crypto_utils import (
-    hash_file, 
     generate_key_pair, 
-    save_keys, 
-    load_public_key, 
-    load_private_key,
-    sign_file,
-    verify_signature,
-    save_signature,
-    load_signature
+    load_public_key_data,
+    load_private_key_data,
+    make_signature,
+    verify_digest,
+    digest_stream,
+    DigestingBuffer,
+    SIGNATURE_ALGORITHMS,
+    DEFAULT_SIGNATURE_ALGORITHM,
+    DIGEST_ALGORITHMS,
+    DEFAULT_DIGEST_ALGORITHM,
+    parse_signature,
+    signature_bytes,
+    SIGNATURE_MAGIC,
+    signature_digest_algorithm,
+    parse_digest,
+    is_merkle,
+    sign_merkle,
+    verify_merkle,
+    set_verification_cache,
+    STREAM_CHUNK_SIZE
 )
-from flask import Flask, render_template, request, redirect, url_for, flash, session, send_file, abort, Response, jsonify
+from parallel import default_workers, verify_files
+from jobs import JobQueue, QueueFull
+from key_pool import KeyPool
+from verification_cache import VerificationCache
+from challenge_catalog import ChallengeCatalog, ANSWERS
+from key_store import KeyStore
+from artifact_store import ArtifactStore
+import crypto_utils
+import metrics
+from metrics import time_phase
+from flask import Flask, Request, current_app, g, render_template, request, redirect, url_for, flash, session, send_file, abort, Response, jsonify, stream_with_context
+
+class UploadRequest(Request):
+    """Request that keeps file uploads in memory and hashes them as they arrive"""
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        # A body of unknown length (chunked transfer) may be any size, so it is spooled too
+        if (current_app.config['SPOOL_UPLOADS_TO_DISK'] or total_content_length is None or
+                total_content_length > current_app.config['MAX_IN_MEMORY_UPLOAD']):
+            return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+        return DigestingBuffer()
+
+def parse_size(value):
+    """Parse a byte size such as '16M' or '8G'; '0' or 'none' means unlimited"""
+    value = str(value).strip().upper()
+    if value in ('0', 'NONE', 'UNLIMITED'):
+        return None
+    units = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3, 'T': 1024 ** 4}
+    if value[-1:] == 'B':
+        value = value[:-1]
+    if value[-1:] in units:
+        return int(float(value[:-1]) * units[value[-1]])
+    return int(value)
 
 # Configuration
 app = Flask(__name__, template_folder='templates')
+app.request_class = UploadRequest
 app.secret_key = secrets.token_hex(32)
 app.config['UPLOAD_FOLDER'] = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads')
 app.config['ALLOWED_EXTENSIONS'] = {'txt', 'pdf', 'doc', 'docx', 'jpg', 'jpeg', 'png', 'pem', 'sig'}
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max upload size
+# 16MB max upload size; override with e.g. MAX_CONTENT_LENGTH=8G for evidence images.
+# Large caps are safe because bodies above MAX_IN_MEMORY_UPLOAD or of unknown
+# length are spooled to disk, and chunked bodies are cut off at the cap too.
+app.config['MAX_CONTENT_LENGTH'] = parse_size(os.environ.get('MAX_CONTENT_LENGTH', '16M'))
+app.config['MAX_IN_MEMORY_UPLOAD'] = 16 * 1024 * 1024  # Larger uploads are spooled to temp files
+app.config['CRYPTO_WORKERS'] = default_workers()  # Pool size for bulk hashing/verification
+app.config['SPOOL_UPLOADS_TO_DISK'] = False  # Let Werkzeug spool large uploads to temp files
+app.config['JOB_WORKERS'] = 2  # Background sign/verify worker threads
+app.config['JOB_QUEUE_SIZE'] = 32  # Pending jobs accepted before returning 503
+app.config['KEY_SIZES'] = {2048, 3072, 4096}  # RSA sizes accepted by /generate_keys
+app.config['KEY_POOLS'] = {2048: 8}  # Pre-generated key pairs kept ready per key size (default algorithm only)
+app.config['VERIFY_CACHE_SIZE'] = 10_000  # Verdicts kept in memory per process (0 disables the cache)
+app.config['VERIFY_CACHE_TTL'] = 3600  # Seconds a cached verdict is reused
+app.config['VERIFY_CACHE_DB'] = os.environ.get('VERIFY_CACHE_DB')  # SQLite file shared by worker processes
+app.config['PROFILE_REQUESTS'] = bool(os.environ.get('PROFILE_REQUESTS'))  # Dump a cProfile .prof per request
+app.config['PROFILE_DIR'] = os.path.join(tempfile.gettempdir(), 'dsv-profiles')  # Where request profiles go
+app.config['KEY_STORE_SIZE'] = 10_000  # Generated key pairs held server-side, referenced from the session
+app.config['KEY_STORE_TTL'] = 1800  # Seconds a generated key pair stays available
+app.config['KEY_STORE_DB'] = os.environ.get('KEY_STORE_DB')  # SQLite file shared by worker processes
+app.config['SIGNATURE_STORE_MAX_BYTES'] = parse_size(os.environ.get('SIGNATURE_STORE_MAX_BYTES', '256M'))  # Quota for stored .sig files
+app.config['SIGNATURE_STORE_MAX_AGE'] = 24 * 3600  # Seconds a stored signature is kept for download
+app.config['CHALLENGES_PER_PAGE'] = 20  # Challenges shown per page of /forensic_challenges
+app.config['CHALLENGE_CHECK_INTERVAL'] = 5.0  # Seconds between rescans of the challenges directory
+app.config['ARCHIVE_MAX_MEMBERS'] = 10_000  # Files accepted in one /api/verify_batch archive
+app.config['ARCHIVE_MAX_EXTRACTED_SIZE'] = parse_size(os.environ.get('ARCHIVE_MAX_EXTRACTED_SIZE', '1G'))  # Uncompressed archive quota
+app.config['CHALLENGES_DIR'] = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'challenges')  # Served by /forensic_challenges
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Create upload directory if it doesn't exist
-os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
-# Create challenges directory if it doesn't exist
-challenges_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'challenges')
-os.makedirs(challenges_dir, exist_ok=True)
+# Built from app.config on first use (see _resource), so importing this module
+# has no side effects and create_app() can override the config beforehand
+job_queue = None
+key_pools = None
+key_store = None
+signature_store = None
+challenge_catalog = None
+verification_cache = None
+_RESOURCES = ('job_queue', 'key_pools', 'key_store', 'signature_store', 'challenge_catalog')
+_resource_lock = threading.Lock()
+_initialized = False
+
+def _resource(name, factory):
+    """The module-level resource ``name``, created by ``factory`` on first use.
+
+    Tests may assign their own instance to the module attribute.
+    """
+    resource = globals()[name]
+    if resource is None:
+        with _resource_lock:
+            resource = globals()[name]
+            if resource is None:
+                resource = globals()[name] = factory()
+    return resource
+
+def _job_queue():
+    return _resource('job_queue', lambda: JobQueue(workers=app.config['JOB_WORKERS'],
+                                                   max_queued=app.config['JOB_QUEUE_SIZE']))
+
+def _key_pools():
+    return _resource('key_pools', lambda: {size: KeyPool(key_size=size, target=target)
+                                           for size, target in app.config['KEY_POOLS'].items()})
+
+def _key_store():
+    return _resource('key_store', lambda: KeyStore(max_size=app.config['KEY_STORE_SIZE'],
+                                                   ttl=app.config['KEY_STORE_TTL'],
+                                                   db_path=app.config['KEY_STORE_DB']))
+
+def _signature_store():
+    return _resource('signature_store', lambda: ArtifactStore(
+        os.path.join(app.config['UPLOAD_FOLDER'], 'signatures'),
+        max_bytes=app.config['SIGNATURE_STORE_MAX_BYTES'], max_age=app.config['SIGNATURE_STORE_MAX_AGE']))
+
+def _challenge_catalog():
+    # The first scan hashes and verifies every challenge file
+    return _resource('challenge_catalog', lambda: ChallengeCatalog(
+        app.config['CHALLENGES_DIR'], check_interval=app.config['CHALLENGE_CHECK_INTERVAL']))
+
+def init_app():
+    """Create the upload and challenge directories and install the verification cache (once)"""
+    global _initialized, verification_cache
+    if _initialized:
+        return
+    with _resource_lock:
+        if _initialized:
+            return
+        os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+        os.makedirs(app.config['CHALLENGES_DIR'], exist_ok=True)
+        if app.config['VERIFY_CACHE_SIZE']:
+            verification_cache = VerificationCache(max_size=app.config['VERIFY_CACHE_SIZE'],
+                                                   ttl=app.config['VERIFY_CACHE_TTL'],
+                                                   db_path=app.config['VERIFY_CACHE_DB'])
+            set_verification_cache(verification_cache)
+        _initialized = True
+
+def create_app(config=None):
+    """Apply ``config`` overrides, set up logging and resources, and return the app.
+
+    There is one Flask app per process (the module-level ``app``); this
+    configures and returns it rather than building a new one. Overrides only
+    take effect before anything is set up, so passing ``config`` once
+    init_app() has run or a resource exists raises RuntimeError instead of
+    silently keeping the old settings. Calling it again without ``config`` is
+    harmless.
+
+    Used by ``python app.py`` and asgi_app; WSGI servers can load ``app:create_app()``.
+    Importing the module alone only defines the routes, and anything not set up
+    here is set up on the first request instead.
+    """
+    if config:
+        with _resource_lock:
+            ready = [name for name in _RESOURCES if globals()[name] is not None]
+            if _initialized or ready:
+                raise RuntimeError("create_app(config) must be called before the app is set up "
+                                   f"(already set up: {', '.join(ready) or 'directories'})")
+            app.config.update(config)
+    logging.basicConfig(level=logging.INFO)
+    init_app()
+    _challenge_catalog()
+    return app
+
+@app.before_request
+def _init_on_first_request():
+    init_app()
 
 def allowed_file(filename):
     """Check if the file extension is allowed"""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in app.config['ALLOWED_EXTENSIONS']
 
+ALLOWED_MIME_TYPES = frozenset({
+    'text/plain', 'application/pdf',
+    'application/msword', 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    'image/jpeg', 'image/png', 'application/octet-stream'
+})
+
+# Leading bytes that libmagic always classifies the same way. Anything else
+# (plain text, Office files, zip containers, raw signatures) still goes to
+# libmagic, since telling e.g. text/plain from text/html needs its rules.
+MAGIC_SIGNATURES = (
+    (b'%PDF-', 'application/pdf'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (SIGNATURE_MAGIC, 'application/octet-stream'),
+)
+# Only key blocks: other PEM-style armour (PGP keys and messages) has its own MIME type
+_PEM_KEY_HEADERS = tuple(b'-----BEGIN %s-----' % label for label in (
+    b'PUBLIC KEY', b'PRIVATE KEY', b'RSA PRIVATE KEY', b'EC PRIVATE KEY', b'ENCRYPTED PRIVATE KEY'))
+_PEM_BYTES = b'\t\n\r' + bytes(range(0x20, 0x7f))
+
+_magic = None
+
+def _libmagic():
+    # One handle for the process; python-magic serializes calls on it
+    global _magic
+    if _magic is None:
+        # Imported here: loading libmagic and its database is slow and most uploads never need it
+        import magic
+        _magic = magic.Magic(mime=True)
+    return _magic
+
+def _is_pem_key(head):
+    for header in _PEM_KEY_HEADERS:
+        if head.startswith(header):
+            return (head[len(header):].startswith((b'\n', b'\r\n'))
+                    and not head.translate(None, _PEM_BYTES))
+    return False
+
+def sniff_mime(head):
+    """MIME type of a file from its first bytes: known signatures first, then libmagic"""
+    for prefix, mime in MAGIC_SIGNATURES:
+        if head.startswith(prefix):
+            return mime
+    # Keys: an ASCII PEM key block is what libmagic reports as text/plain
+    if _is_pem_key(head):
+        return 'text/plain'
+    return _libmagic().from_buffer(head)
+
 def is_file_allowed(file_stream):
     """Check file content using magic numbers"""
     try:
         file_stream.seek(0)
-        mime = magic.from_buffer(file_stream.read(2048), mime=True)
+        with time_phase('magic_sniff'):
+            mime = sniff_mime(file_stream.read(2048))
         file_stream.seek(0)
-        return mime in {
-            'text/plain', 'application/pdf', 
-            'application/msword', 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-            'image/jpeg', 'image/png', 'application/octet-stream'
-        }
+        return mime in ALLOWED_MIME_TYPES
     except Exception as e:
         logger.error(f"File validation error: {str(e)}")
         return False
@@ -59,10 +264,14 @@ def index():
     """Render the main page"""
     return render_template('index.html')
 
+def _session_keys():
+    """The key pair generated in this session, or None"""
+    return _key_store().get(session.get('key_handle'))
+
 @app.route('/keys')
 def keys_page():
     """Display generated keys page"""
-    if 'private_key' not in session or 'public_key' not in session:
+    if _session_keys() is None:
         flash('No keys found! Please generate keys first.', 'error')
         return redirect(url_for('generate_keys_route'))
     return render_template('keys.html')
@@ -71,9 +280,23 @@ def keys_page():
 @app.route('/generate_keys', methods=['POST'])
 def generate_keys_route():
     try:
-        private_key, public_key = generate_key_pair()
-        session['private_key'] = private_key
-        session['public_key'] = public_key
+        algorithm = request.form.get('algorithm', DEFAULT_SIGNATURE_ALGORITHM)
+        if algorithm not in SIGNATURE_ALGORITHMS:
+            flash('Unsupported signature algorithm.', 'error')
+            return redirect(url_for('generate_keys_route_get'))
+        key_size = request.form.get('key_size', 2048, type=int)
+        if algorithm.startswith('rsa-') and key_size not in app.config['KEY_SIZES']:
+            flash('Unsupported key size.', 'error')
+            return redirect(url_for('generate_keys_route_get'))
+        if algorithm == DEFAULT_SIGNATURE_ALGORITHM and key_size in _key_pools():
+            private_key, public_key = _key_pools()[key_size].get()
+        elif algorithm.startswith('rsa-'):
+            private_key, public_key = generate_key_pair(key_size, algorithm)
+        else:
+            private_key, public_key = generate_key_pair(algorithm=algorithm)
+        # Only a short handle goes into the cookie; the PEMs stay on the server
+        _key_store().delete(session.get('key_handle'))
+        session['key_handle'] = _key_store().put(private_key, public_key)
         flash('Keys generated successfully.', 'success')
         return redirect(url_for('keys_page'))
     except Exception as e:
@@ -85,6 +308,87 @@ def generate_keys_route_get():
     """Render the key generation page"""
     return render_template('generate_keys.html')
 
+requests_total = metrics.registry.counter('dsv_requests_total', "HTTP requests handled",
+                                          ('endpoint', 'method', 'status'))
+request_seconds = metrics.registry.histogram('dsv_request_seconds', "Time from request start to response",
+                                             ('endpoint',))
+key_cache_entries = metrics.registry.gauge('dsv_key_cache_entries', "Parsed keys held in the key cache")
+key_cache_lookups = metrics.registry.counter('dsv_key_cache_lookups_total', "Key cache lookups by outcome",
+                                             ('outcome',))
+verify_cache_lookups = metrics.registry.counter('dsv_verify_cache_lookups_total',
+                                                "Verification cache lookups by outcome", ('outcome',))
+job_queue_jobs = metrics.registry.gauge('dsv_job_queue_jobs', "Background jobs by status", ('status',))
+key_pool_depth = metrics.registry.gauge('dsv_key_pool_depth', "Pre-generated key pairs ready", ('key_size',))
+key_store_entries = metrics.registry.gauge('dsv_key_store_entries', "Generated key pairs held server-side")
+challenge_answers = metrics.registry.counter('dsv_challenge_answers_total', "Graded challenge answers", ('result',))
+
+@app.before_request
+def _start_request():
+    g.request_start = time.perf_counter()
+    if app.config['PROFILE_REQUESTS']:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+            g.profiler = profiler
+        except ValueError:
+            # Only one profiler can be active per interpreter on newer Pythons
+            pass
+    if request.mimetype == 'multipart/form-data':
+        # Parse the upload up front so its cost shows up as its own phase
+        with time_phase('upload_read'):
+            request.files
+
+@app.after_request
+def _record_request(response):
+    endpoint = request.endpoint or 'unmatched'
+    requests_total.inc(endpoint=endpoint, method=request.method, status=response.status_code)
+    start = g.pop('request_start', None)
+    if start is not None:
+        request_seconds.observe(time.perf_counter() - start, endpoint=endpoint)
+    if response.mimetype != 'text/event-stream':
+        # Time until the server has finished sending the body
+        sent = time.perf_counter()
+        response.call_on_close(lambda: metrics.phase_seconds.observe(time.perf_counter() - sent,
+                                                                     phase='response'))
+    return response
+
+@app.teardown_request
+def _finish_profile(exc):
+    profiler = g.pop('profiler', None)
+    if profiler is None:
+        return
+    profiler.disable()
+    try:
+        os.makedirs(app.config['PROFILE_DIR'], exist_ok=True)
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{request.endpoint or 'unmatched'}-{secrets.token_hex(4)}.prof"
+        profiler.dump_stats(os.path.join(app.config['PROFILE_DIR'], name))
+    except OSError as e:
+        logger.error(f"Profile dump error: {str(e)}")
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Counters and latency histograms in the Prometheus text format"""
+    cache_stats = crypto_utils._key_cache.stats()
+    key_cache_entries.set(cache_stats['size'])
+    for outcome in ('hits', 'misses', 'evictions', 'expirations'):
+        key_cache_lookups.set_total(cache_stats[outcome], outcome=outcome)
+    for status, count in _job_queue().stats().items():
+        if status not in ('capacity', 'submitted', 'rejected'):
+            job_queue_jobs.set(count, status=status)
+    if verification_cache is not None:
+        verify_stats = verification_cache.stats()
+        for outcome in ('hits', 'shared_hits', 'misses'):
+            verify_cache_lookups.set_total(verify_stats[outcome], outcome=outcome)
+    key_store_entries.set(len(_key_store()))
+    for size, pool in _key_pools().items():
+        key_pool_depth.set(pool.stats()['depth'], key_size=size)
+    return Response(metrics.registry.render(), content_type=metrics.CONTENT_TYPE)
+
+@app.route('/api/key_pool')
+def key_pool_stats():
+    """Depth and refill metrics of the pre-generated key pools"""
+    return jsonify({str(size): pool.stats() for size, pool in _key_pools().items()})
+
 @app.route('/run_tests')
 def run_tests():
     import subprocess
@@ -103,11 +407,12 @@ def download_key(key_type):
         flash('Invalid key type!', 'error')
         return redirect(url_for('generate_keys_route'))
     
-    if key_type + '_key' not in session:
+    keys = _session_keys()
+    if keys is None:
         flash('No keys found! Please generate keys first.', 'error')
         return redirect(url_for('generate_keys_route'))
     
-    key_content = session[key_type + '_key']
+    key_content = keys.private_pem if key_type == 'private' else keys.public_pem
     filename = key_type + '.pem'
     
     response = Response(
@@ -142,52 +447,51 @@ def sign_document():
     """Sign a document using a private key"""
     if request.method == 'POST':
         try:
-            if 'document' not in request.files or 'private_key' not in request.files:
+            # Without an uploaded key, sign with the pair generated in this session
+            private_key_file = request.files.get('private_key')
+            if private_key_file is not None and private_key_file.filename == '':
+                private_key_file = None
+            stored_keys = _session_keys() if private_key_file is None else None
+            if 'document' not in request.files or (private_key_file is None and stored_keys is None):
                 flash('Missing document or private key!', 'error')
                 return redirect(request.url)
             
             document = request.files['document']
-            private_key_file = request.files['private_key']
             
-            if document.filename == '' or private_key_file.filename == '':
+            if document.filename == '':
                 flash('No selected file!', 'error')
                 return redirect(request.url)
             
-            if not (document and allowed_file(document.filename) and private_key_file):
+            if not (document and allowed_file(document.filename)):
                 flash('Invalid file type!', 'error')
                 return redirect(request.url)
             
             # Validate file contents
-            if not is_file_allowed(document.stream) or not is_file_allowed(private_key_file.stream):
+            if not is_file_allowed(document.stream) or (
+                    private_key_file is not None and not is_file_allowed(private_key_file.stream)):
                 flash('Invalid file content detected!', 'error')
                 return redirect(request.url)
             
-            with tempfile.TemporaryDirectory() as temp_dir:
-                # Save files with secure names
-                document_filename = secure_filename(document.filename)
-                document_path = os.path.join(temp_dir, document_filename)
-                document.save(document_path)
-                
-                private_key_path = os.path.join(temp_dir, 'private.pem')
-                private_key_file.save(private_key_path)
-                
-                # Sign the document
-                signature = sign_file(document_path, private_key_path)
-                
-                # Save the signature
-                signature_filename = document_filename + '.sig'
-                signature_path = os.path.join(temp_dir, signature_filename)
-                save_signature(signature, signature_path)
-                
-                # Store in session for download
-                session['signature_filename'] = signature_filename
-                session['document_name'] = document_filename
-                
-                # Save signature to uploads for temporary access
-                final_signature_path = os.path.join(app.config['UPLOAD_FOLDER'], signature_filename)
-                save_signature(signature, final_signature_path)
-                
-                return redirect(url_for('signature_result'))
+            # Sign the digest of the upload stream; the document is never written to disk
+            document_filename = secure_filename(document.filename)
+            with time_phase('key_parse'):
+                if private_key_file is not None:
+                    private_key = load_private_key_data(private_key_file.read())
+                else:
+                    private_key = stored_keys.private_key
+            algorithm = request.form.get('algorithm') or None
+            digest_algorithm = _requested_digest_algorithm()
+            with time_phase('hash'):
+                digest = digest_stream(document.stream, algorithm=digest_algorithm)
+            with time_phase('sign'):
+                signature = make_signature(digest, private_key, algorithm, digest_algorithm)
+            
+            # Keep the signature in the content-addressed store for download
+            session['signature_id'] = _signature_store().put(signature_bytes(signature))
+            session['signature_filename'] = document_filename + '.sig'
+            session['document_name'] = document_filename
+            
+            return redirect(url_for('signature_result'))
         except Exception as e:
             logger.error(f"Signing error: {str(e)}")
             flash(f'Error signing document: {str(e)}', 'error')
@@ -209,21 +513,28 @@ def signature_result():
 @app.route('/download_signature')
 def download_signature():
     """Download the generated signature"""
-    if 'signature_filename' not in session:
+    if 'signature_id' not in session:
         flash('No signature found!', 'error')
         return redirect(url_for('sign_document'))
     
-    signature_filename = session['signature_filename']
-    signature_path = os.path.join(app.config['UPLOAD_FOLDER'], signature_filename)
-    
-    if not os.path.exists(signature_path):
+    signature_id = session['signature_id']
+    if request.if_none_match.contains(signature_id):
+        # Content-addressed: a matching ETag means the client already has these bytes
+        return Response(status=304, headers={'ETag': f'"{signature_id}"'})
+    signature_path = _signature_store().path(signature_id)
+    if signature_path is None:
         flash('Signature file not found!', 'error')
         return redirect(url_for('sign_document'))
     
-    return send_file(signature_path, 
+    response = send_file(signature_path, 
                     mimetype='application/octet-stream',
                     as_attachment=True,
-                    download_name=signature_filename)
+                    download_name=session['signature_filename'],
+                    etag=signature_id)
+    # The URL serves a different signature per session: let browsers keep it, but revalidate
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
 
 @app.route('/verify_signature', methods=['GET', 'POST'])
 def verify_signature_route():
@@ -255,25 +566,17 @@ def verify_signature_route():
                 flash('Invalid file content detected!', 'error')
                 return redirect(request.url)
             
-            with tempfile.TemporaryDirectory() as temp_dir:
-                # Save files with secure names
-                doc_path = os.path.join(temp_dir, secure_filename(document.filename))
-                sig_path = os.path.join(temp_dir, secure_filename(signature_file.filename))
-                key_path = os.path.join(temp_dir, secure_filename(public_key_file.filename))
-                
-                document.save(doc_path)
-                signature_file.save(sig_path)
-                public_key_file.save(key_path)
-                
-                # Load and verify signature
-                signature = load_signature(sig_path)
-                is_valid = verify_signature(doc_path, signature, key_path)
-                
-                # Store results
-                session['verification_result'] = is_valid
-                session['document_name'] = document.filename
-                
-                return redirect(url_for('verification_result'))
+            # Verify against the upload stream without temp files
+            signature = parse_signature(signature_file.read())
+            with time_phase('key_parse'):
+                public_key = load_public_key_data(public_key_file.read(), source=public_key_file.filename)
+            is_valid = _verify_upload(document, signature, public_key)['valid']
+            
+            # Store results
+            session['verification_result'] = is_valid
+            session['document_name'] = document.filename
+            
+            return redirect(url_for('verification_result'))
         except Exception as e:
             logger.error(f"Verification error: {str(e)}")
             flash(f'Verification failed: {str(e)}', 'error')
@@ -281,6 +584,408 @@ def verify_signature_route():
     
     return render_template('verify_signature.html')
 
+def _extract_archive(archive, dest_dir):
+    """Extract a zip or tar upload into dest_dir, rejecting unsafe member paths.
+
+    MAX_CONTENT_LENGTH only bounds the compressed upload, so the member count
+    and the total uncompressed size are capped too. Both archive readers
+    return at most a member's declared size, so checking it before the copy
+    is enough.
+    """
+    import shutil
+    import tarfile
+    import zipfile
+    max_members = app.config['ARCHIVE_MAX_MEMBERS']
+    max_bytes = app.config['ARCHIVE_MAX_EXTRACTED_SIZE']
+    extracted = members = 0
+
+    def target_for(name, size):
+        nonlocal extracted, members
+        members += 1
+        extracted += size
+        if members > max_members:
+            raise ValueError(f"Archive has more than {max_members} files")
+        if max_bytes is not None and extracted > max_bytes:
+            raise ValueError(f"Archive expands to more than {max_bytes} bytes")
+        target = safe_join(dest_dir, name)
+        if target is None:
+            raise ValueError(f"Unsafe path in archive: {name}")
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        return target
+
+    archive.stream.seek(0)
+    if zipfile.is_zipfile(archive.stream):
+        archive.stream.seek(0)
+        try:
+            with zipfile.ZipFile(archive.stream) as zf:
+                for member in zf.infolist():
+                    if member.is_dir():
+                        continue
+                    target = target_for(member.filename, member.file_size)
+                    with zf.open(member) as src, open(target, 'wb') as dst:
+                        shutil.copyfileobj(src, dst, STREAM_CHUNK_SIZE)
+        except zipfile.BadZipFile as e:
+            raise ValueError(f"Corrupt zip archive: {str(e)}")
+        return
+
+    archive.stream.seek(0)
+    try:
+        tf = tarfile.open(fileobj=archive.stream, mode='r:*')
+    except tarfile.TarError:
+        raise ValueError("Archive must be a zip or tar file")
+    with tf:
+        for member in tf:
+            if not member.isfile():
+                continue
+            target = target_for(member.name, member.size)
+            with tf.extractfile(member) as src, open(target, 'wb') as dst:
+                shutil.copyfileobj(src, dst, STREAM_CHUNK_SIZE)
+
+def _load_batch_manifest(temp_dir):
+    """Read the batch manifest from the request or from the extracted archive"""
+    if 'manifest' in request.files:
+        raw = request.files['manifest'].read()
+    elif 'manifest' in request.form:
+        raw = request.form['manifest']
+    else:
+        manifest_path = os.path.join(temp_dir, 'manifest.json')
+        if not os.path.isfile(manifest_path):
+            raise ValueError("Missing manifest")
+        with open(manifest_path, 'rb') as f:
+            raw = f.read()
+
+    manifest = json.loads(raw)
+    if isinstance(manifest, dict):
+        manifest = manifest.get('items')
+    if not isinstance(manifest, list):
+        raise ValueError("Manifest must be a list of {document, signature, public_key} entries")
+    return manifest
+
+@app.route('/api/verify_batch', methods=['POST'])
+def verify_batch_route():
+    """Verify many document/signature pairs uploaded as files or as one archive"""
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with time_phase('temp_save'):
+                if 'archive' in request.files:
+                    _extract_archive(request.files['archive'], temp_dir)
+                for upload in request.files.getlist('files'):
+                    filename = secure_filename(upload.filename or '')
+                    if filename:
+                        upload.save(os.path.join(temp_dir, filename))
+
+            manifest = _load_batch_manifest(temp_dir)
+
+            items = []
+            for entry in manifest:
+                entry = entry if isinstance(entry, dict) else {}
+                items.append({
+                    field: safe_join(temp_dir, entry[field])
+                    for field in ('document', 'signature', 'public_key')
+                    if isinstance(entry.get(field), str)
+                })
+
+            with time_phase('batch_verify'):
+                # Threads, not processes: forking this threaded server could deadlock the child
+                results = verify_files(items, workers=app.config['CRYPTO_WORKERS'], processes=False)
+            for entry, result in zip(manifest, results):
+                result['document'] = entry.get('document') if isinstance(entry, dict) else None
+                if result['error']:
+                    result['error'] = result['error'].replace(temp_dir + os.sep, '')
+
+        return jsonify({
+            'results': results,
+            'total': len(results),
+            'valid': sum(1 for r in results if r['valid'])
+        })
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Batch verification error: {str(e)}")
+        return jsonify({'error': 'Batch verification failed'}), 500
+
+def _requested_digest_algorithm():
+    """Digest algorithm named by the ``digest_algorithm`` form field, or None for the default"""
+    digest_algorithm = request.form.get('digest_algorithm') or None
+    if digest_algorithm and digest_algorithm not in DIGEST_ALGORITHMS:
+        raise ValueError(f"Unsupported digest algorithm: {digest_algorithm}")
+    return digest_algorithm
+
+def _detach_upload(upload, digest_algorithm=None):
+    """Return (digest, path) for an upload that must outlive the request.
+
+    In-memory uploads are hashed now (SHA-256 was already computed while they
+    arrived), so only the digest is kept. Spooled uploads are copied to a
+    temp file the job hashes and removes.
+    """
+    if isinstance(upload.stream, DigestingBuffer):
+        with time_phase('hash'):
+            return digest_stream(upload.stream, algorithm=digest_algorithm), None
+    with time_phase('temp_save'):
+        fd, path = tempfile.mkstemp(prefix='job-')
+        os.close(fd)
+        upload.save(path)
+    return None, path
+
+def _job_digest(job, digest, path, digest_algorithm):
+    """Finish hashing a detached upload while reporting progress on the job"""
+    if digest is not None:
+        return digest
+    try:
+        total = os.path.getsize(path) or 1
+        with open(path, 'rb', buffering=0) as f:
+            # Hashing is the bulk of the work; leave the last 10% for the RSA step
+            return digest_stream(f, progress=lambda done: job.set_progress(0.9 * done / total),
+                                 algorithm=digest_algorithm)
+    finally:
+        os.unlink(path)
+
+def _run_sign_job(job, digest, path, digest_algorithm, private_key_pem):
+    digest = _job_digest(job, digest, path, digest_algorithm)
+    signature = make_signature(digest, load_private_key_data(private_key_pem), digest_algorithm=digest_algorithm)
+    return {'digest': digest.hex(), 'signature': base64.b64encode(signature_bytes(signature)).decode('ascii')}
+
+def _run_verify_job(job, digest, path, digest_algorithm, signature, public_key_pem):
+    signature = parse_signature(signature)
+    if is_merkle(signature):
+        if path:
+            os.unlink(path)
+        raise ValueError("Merkle signatures are verified synchronously; use /api/verify")
+    digest = _job_digest(job, digest, path, digest_algorithm)
+    public_key = load_public_key_data(public_key_pem, source='Uploaded public key')
+    return {'digest': digest.hex(), 'valid': verify_digest(digest, signature, public_key)}
+
+def _api_uploads(fields):
+    """Fetch and validate uploaded fields for the JSON API.
+
+    Returns (uploads, None) on success or (None, error_response). The first
+    field is the document and also gets a content check.
+    """
+    missing = [field for field in fields if field not in request.files or request.files[field].filename == '']
+    if missing:
+        return None, (jsonify({'error': f"Missing files: {', '.join(missing)}"}), 400)
+    uploads = [request.files[field] for field in fields]
+    if not all(allowed_file(upload.filename) for upload in uploads):
+        return None, (jsonify({'error': 'Invalid file type'}), 400)
+    if not is_file_allowed(uploads[0].stream):
+        return None, (jsonify({'error': 'Invalid file content detected'}), 400)
+    return uploads, None
+
+def _submit_job(kind, fn, fields):
+    """Validate uploaded fields and queue a job; returns a JSON response"""
+    uploads, error = _api_uploads(fields)
+    if error:
+        return error
+
+    contents = [upload.read() for upload in uploads[1:]]
+    try:
+        # Verification must hash with whatever the uploaded signature records
+        if 'signature' in fields:
+            digest_algorithm = signature_digest_algorithm(parse_signature(contents[fields.index('signature') - 1]))
+        else:
+            digest_algorithm = _requested_digest_algorithm()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    digest, path = _detach_upload(uploads[0], digest_algorithm)
+    args = [digest, path, digest_algorithm] + contents
+    try:
+        job = _job_queue().submit(kind, fn, *args)
+    except QueueFull as e:
+        if path:
+            os.unlink(path)
+        response = jsonify({'error': str(e)})
+        response.headers['Retry-After'] = '5'
+        return response, 503
+    return jsonify({
+        'job_id': job.id,
+        'status': job.status,
+        'status_url': url_for('job_status', job_id=job.id),
+        'events_url': url_for('job_events', job_id=job.id),
+    }), 202
+
+def _verify_upload(document, signature, public_key):
+    """Verify an uploaded document against a parsed signature.
+
+    Returns a dict with at least ``valid``; merkle signatures also report
+    ``tampered_chunks`` and ``size_matches``, flat ones the ``digest``.
+    """
+    if is_merkle(signature):
+        with time_phase('merkle'):
+            return verify_merkle(document.stream, signature, public_key)
+    with time_phase('hash'):
+        digest = digest_stream(document.stream, algorithm=signature_digest_algorithm(signature))
+    with time_phase('verify'):
+        valid = verify_digest(digest, signature, public_key)
+    return {'valid': valid, 'digest': digest.hex()}
+
+@app.route('/api/sign', methods=['POST'])
+def api_sign():
+    """Sign a document and return the signature as base64 JSON.
+
+    Pass ``format=merkle`` to get a chunked Merkle-tree signature instead of
+    a plain one, ``algorithm`` to pick a scheme other than the key's
+    default (e.g. ``rsa-pss`` for an RSA key), and ``digest_algorithm`` to
+    hash flat signatures with something other than SHA-256.
+    """
+    uploads, error = _api_uploads(['document', 'private_key'])
+    if error:
+        return error
+    document, private_key_file = uploads
+    signature_format = request.form.get('format', 'flat')
+    if signature_format not in ('flat', 'merkle'):
+        return jsonify({'error': f"Unsupported signature format: {signature_format}"}), 400
+    algorithm = request.form.get('algorithm') or None
+    try:
+        digest_algorithm = _requested_digest_algorithm()
+        if signature_format == 'merkle' and digest_algorithm not in (None, DEFAULT_DIGEST_ALGORITHM):
+            raise ValueError("Merkle signatures use SHA-256 chunk hashes")
+        with time_phase('key_parse'):
+            private_key = load_private_key_data(private_key_file.read())
+        if signature_format == 'merkle':
+            with time_phase('merkle'):
+                envelope = sign_merkle(document.stream, private_key, algorithm=algorithm)
+            return jsonify({
+                'document': document.filename,
+                'format': 'merkle',
+                'algorithm': envelope.algorithm,
+                'chunks': len(envelope.chunk_hashes),
+                'signature': base64.b64encode(envelope.to_bytes()).decode('ascii')
+            })
+        with time_phase('hash'):
+            digest = digest_stream(document.stream, algorithm=digest_algorithm)
+        with time_phase('sign'):
+            signature = make_signature(digest, private_key, algorithm, digest_algorithm)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({
+        'document': document.filename,
+        'format': 'flat',
+        'algorithm': getattr(signature, 'algorithm', DEFAULT_SIGNATURE_ALGORITHM),
+        'digest_algorithm': signature_digest_algorithm(signature),
+        'digest': digest.hex(),
+        'signature': base64.b64encode(signature_bytes(signature)).decode('ascii')
+    })
+
+@app.route('/api/verify', methods=['POST'])
+def api_verify():
+    """Verify a document signature and return the verdict as JSON"""
+    uploads, error = _api_uploads(['document', 'signature', 'public_key'])
+    if error:
+        return error
+    document, signature_file, public_key_file = uploads
+    try:
+        signature = parse_signature(signature_file.read())
+        with time_phase('key_parse'):
+            public_key = load_public_key_data(public_key_file.read(), source=public_key_file.filename)
+        result = _verify_upload(document, signature, public_key)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(dict(result, document=document.filename))
+
+@app.route('/api/sign_digest', methods=['POST'])
+def api_sign_digest():
+    """Sign a digest the client computed (hex ``digest`` field); the document is never uploaded.
+
+    The key is the uploaded ``private_key`` or, without one, the pair
+    generated in this session. ``algorithm`` and ``digest_algorithm`` work
+    as for /api/sign; the digest must match ``digest_algorithm``.
+    """
+    if 'private_key' in request.files and request.files['private_key'].filename != '':
+        uploads, error = _api_uploads(['private_key'])
+        if error:
+            return error
+        stored_keys = None
+    else:
+        stored_keys = _session_keys()
+        if stored_keys is None:
+            return jsonify({'error': 'Missing files: private_key'}), 400
+    algorithm = request.form.get('algorithm') or None
+    try:
+        digest_algorithm = _requested_digest_algorithm()
+        digest = parse_digest(request.form.get('digest', ''), digest_algorithm)
+        with time_phase('key_parse'):
+            if stored_keys is None:
+                private_key = load_private_key_data(uploads[0].read())
+            else:
+                private_key = stored_keys.private_key
+        with time_phase('sign'):
+            signature = make_signature(digest, private_key, algorithm, digest_algorithm)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({
+        'format': 'flat',
+        'algorithm': getattr(signature, 'algorithm', DEFAULT_SIGNATURE_ALGORITHM),
+        'digest_algorithm': signature_digest_algorithm(signature),
+        'digest': digest.hex(),
+        'signature': base64.b64encode(signature_bytes(signature)).decode('ascii')
+    })
+
+@app.route('/api/verify_digest', methods=['POST'])
+def api_verify_digest():
+    """Verify a signature against a digest the client computed (hex ``digest`` field).
+
+    The digest must use the algorithm the signature records (SHA-256 unless
+    it was signed with another). Merkle signatures need the document itself
+    and are rejected; use /api/verify for them.
+    """
+    uploads, error = _api_uploads(['signature', 'public_key'])
+    if error:
+        return error
+    signature_file, public_key_file = uploads
+    try:
+        signature = parse_signature(signature_file.read())
+        if is_merkle(signature):
+            raise ValueError("Merkle signatures cannot be verified from a digest; use /api/verify")
+        digest = parse_digest(request.form.get('digest', ''), signature_digest_algorithm(signature))
+        with time_phase('key_parse'):
+            public_key = load_public_key_data(public_key_file.read(), source=public_key_file.filename)
+        with time_phase('verify'):
+            valid = verify_digest(digest, signature, public_key)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'valid': valid, 'digest': digest.hex(),
+                    'digest_algorithm': signature_digest_algorithm(signature)})
+
+@app.route('/api/jobs/sign', methods=['POST'])
+def submit_sign_job():
+    """Queue signing of a document; poll the returned status URL for the signature"""
+    return _submit_job('sign', _run_sign_job, ['document', 'private_key'])
+
+@app.route('/api/jobs/verify', methods=['POST'])
+def submit_verify_job():
+    """Queue verification of a document signature"""
+    return _submit_job('verify', _run_verify_job, ['document', 'signature', 'public_key'])
+
+@app.route('/api/jobs/<job_id>')
+def job_status(job_id):
+    """Current status, progress and result of a job"""
+    job = _job_queue().get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/api/jobs/<job_id>/events')
+def job_events(job_id):
+    """Stream job progress as server-sent events until it finishes"""
+    job = _job_queue().get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+
+    def events():
+        last = None
+        while True:
+            done = job.wait(timeout=1.0)
+            state = job.to_dict()
+            if state != last:
+                yield f"data: {json.dumps(state)}\n\n"
+                last = state
+            if done:
+                break
+
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache'})
+
 @app.route('/verification_result')
 def verification_result():
     """Display the verification result"""
@@ -298,75 +1003,87 @@ def verification_result():
 @app.route('/forensic_challenges')
 def forensic_challenges():
     """Display available forensic challenges"""
-    challenges_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'challenges')
-    challenges = []
-    
-    if os.path.exists(challenges_dir):
-        for challenge_dir in os.listdir(challenges_dir):
-            challenge_path = os.path.join(challenges_dir, challenge_dir)
-            if os.path.isdir(challenge_path):
-                desc_path = os.path.join(challenge_path, 'description.txt')
-                description = "No description available."
-                if os.path.exists(desc_path):
-                    with open(desc_path, 'r') as f:
-                        description = f.read()
-                
-                files = []
-                for filename in os.listdir(challenge_path):
-                    if filename != 'description.txt' and os.path.isfile(os.path.join(challenge_path, filename)):
-                        files.append(filename)
-                
-                challenges.append({
-                    'id': challenge_dir,
-                    'name': challenge_dir.replace('_', ' ').title(),
-                    'description': description,
-                    'files': files
-                })
-    
-    return render_template('challenges.html', challenges=challenges)
+    per_page = app.config['CHALLENGES_PER_PAGE']
+    page = request.args.get('page', 1, type=int)
+    challenges, total = _challenge_catalog().page(page, per_page)
+    pages = max(1, -(-total // per_page))
+    if page < 1 or page > pages:
+        return redirect(url_for('forensic_challenges', page=min(max(page, 1), pages)))
+
+    return render_template('challenges.html', challenges=challenges, page=page, pages=pages, total=total)
 
 @app.route('/challenge/<challenge_id>')
 def challenge(challenge_id):
     """Display a specific forensic challenge"""
-    challenge_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'challenges', challenge_id)
-    
-    if not os.path.exists(challenge_dir) or not os.path.isdir(challenge_dir):
+    entry = _challenge_catalog().get(challenge_id)
+    if entry is None:
         flash('Challenge not found!', 'error')
         return redirect(url_for('forensic_challenges'))
     
-    # Get challenge description
-    desc_path = os.path.join(challenge_dir, 'description.txt')
-    description = "No description available."
-    if os.path.exists(desc_path):
-        with open(desc_path, 'r') as f:
-            description = f.read()
-    
-    # Get challenge files
-    files = []
-    for filename in os.listdir(challenge_dir):
-        if filename != 'description.txt' and os.path.isfile(os.path.join(challenge_dir, filename)):
-            files.append(filename)
-    
     return render_template('challenge.html', 
                          challenge_id=challenge_id,
-                         challenge_name=challenge_id.replace('_', ' ').title(),
-                         description=description,
-                         files=files)
+                         challenge_name=entry['name'],
+                         description=entry['description'],
+                         files=entry['files'],
+                         gradable=entry['expected'] is not None,
+                         answers=ANSWERS)
+
+def _grade_answer(challenge_id, answer):
+    """Grade an answer against the catalog's precomputed verdict; raises KeyError/ValueError"""
+    correct = _challenge_catalog().grade(challenge_id, answer)
+    challenge_answers.inc(result='correct' if correct else 'incorrect')
+    return correct
+
+@app.route('/challenge/<challenge_id>/answer', methods=['POST'])
+def answer_challenge(challenge_id):
+    """Grade an answer submitted from the challenge page"""
+    try:
+        correct = _grade_answer(challenge_id, request.form.get('answer', ''))
+    except KeyError:
+        flash('Challenge not found!', 'error')
+        return redirect(url_for('forensic_challenges'))
+    except ValueError as e:
+        flash(str(e), 'error')
+        return redirect(url_for('challenge', challenge_id=challenge_id))
+
+    if correct:
+        flash('Correct! Your analysis matches the evidence.', 'success')
+    else:
+        flash('Incorrect. Take another look at the files.', 'error')
+    return redirect(url_for('challenge', challenge_id=challenge_id))
+
+@app.route('/api/challenges/<challenge_id>/answer', methods=['POST'])
+def api_answer_challenge(challenge_id):
+    """Grade an answer ("authentic" or "tampered") given as JSON or form field ``answer``"""
+    data = request.get_json(silent=True) if request.is_json else request.form
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Expected a JSON object with an "answer" field'}), 400
+    answer = data.get('answer', '')
+    try:
+        correct = _grade_answer(challenge_id, answer)
+    except KeyError:
+        return jsonify({'error': 'Challenge not found'}), 404
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'challenge': challenge_id, 'answer': str(answer).strip().lower(), 'correct': correct})
 
 @app.route('/download_challenge_file/<challenge_id>/<filename>')
 def download_challenge_file(challenge_id, filename):
     """Download a challenge file"""
     try:
-        safe_path = safe_join('challenges', challenge_id, filename)
-        if not os.path.exists(safe_path) or not os.path.isfile(safe_path):
+        path = _challenge_catalog().file_path(challenge_id, filename)
+        if path is None or not os.path.isfile(path):
             flash('File not found!', 'error')
             return redirect(url_for('challenge', challenge_id=challenge_id))
         
-        return send_file(safe_path, as_attachment=True, download_name=filename)
+        return send_file(path, as_attachment=True, download_name=filename)
     except Exception as e:
         logger.error(f"File download error: {str(e)}")
         flash('Failed to download file', 'error')
         return redirect(url_for('challenge', challenge_id=challenge_id))
 
 if __name__ == '__main__':
+    create_app()
+    for pool in _key_pools().values():
+        pool.start()
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
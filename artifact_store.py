@@ -0,0 +1,152 @@
+"""Content-addressed store for generated signature files.
+
+Each blob is named by the SHA-256 of its bytes and sharded two levels deep
+(``ab/cd/abcd...``). Identical outputs share one file, so concurrent users
+signing same-named documents never overwrite each other. Blobs are written
+to a temporary file and renamed into place, so readers never see a partial
+blob.
+
+A background thread garbage-collects the store every ``gc_interval``
+seconds. It first removes blobs older than ``max_age``, then the least
+recently stored blobs until the total size fits ``max_bytes`` (None means
+no size quota). Storing an
+existing blob again refreshes its age. The thread starts on the first
+``put``, like KeyPool's refill worker, so it runs under any server.
+"""
+import os
+import hashlib
+import tempfile
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+_HEX = frozenset('0123456789abcdef')
+
+
+class ArtifactStore:
+    def __init__(self, root, max_bytes=256 * 1024 * 1024, max_age=24 * 3600, gc_interval=300):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.gc_interval = gc_interval
+        self.stored = 0
+        self.deduplicated = 0
+        self.collected = 0
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _path(self, artifact_id):
+        return os.path.join(self.root, artifact_id[:2], artifact_id[2:4], artifact_id)
+
+    def put(self, data):
+        """Store bytes and return their artifact id (the SHA-256 hex digest)"""
+        self.start()
+        artifact_id = hashlib.sha256(data).hexdigest()
+        path = self._path(artifact_id)
+        try:
+            # Already stored: refresh its age so GC keeps it
+            os.utime(path)
+            self.deduplicated += 1
+            return artifact_id
+        except FileNotFoundError:
+            pass
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        self.stored += 1
+        return artifact_id
+
+    def path(self, artifact_id):
+        """Path of a stored artifact, or None if the id is malformed or unknown"""
+        if not isinstance(artifact_id, str) or len(artifact_id) != 64 or not _HEX.issuperset(artifact_id):
+            return None
+        path = self._path(artifact_id)
+        return path if os.path.isfile(path) else None
+
+    def _blobs(self):
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield path, name, st
+
+    def gc(self, now=None):
+        """Remove expired blobs, then the oldest until within max_bytes (if set); returns the number removed"""
+        now = time.time() if now is None else now
+        removed = 0
+        live = []
+        with self._lock:
+            for path, name, st in self._blobs():
+                # Temp files of writes that died mid-way are collected after max_age too
+                if now - st.st_mtime > self.max_age:
+                    removed += self._remove(path, st.st_mtime)
+                elif not name.startswith('.tmp-'):
+                    live.append((st.st_mtime, st.st_size, path))
+            if self.max_bytes is not None:
+                total = sum(size for _, size, _ in live)
+                live.sort()
+                for mtime, size, path in live:
+                    if total <= self.max_bytes:
+                        break
+                    removed += self._remove(path, mtime)
+                    total -= size
+        self.collected += removed
+        return removed
+
+    @staticmethod
+    def _remove(path, mtime):
+        try:
+            # A put() that refreshed the blob since it was listed wins
+            if os.stat(path).st_mtime != mtime:
+                return 0
+            os.unlink(path)
+            return 1
+        except FileNotFoundError:
+            return 0
+
+    def _run(self):
+        while not self._stop.wait(self.gc_interval):
+            try:
+                self.gc()
+            except Exception as e:
+                # Keep collecting; one failed pass must not end expiry for good
+                logger.error(f"Artifact GC error: {str(e)}")
+
+    def start(self):
+        """Start the background GC thread if it is not running"""
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name='artifact-gc', daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            thread.join()
+
+    def stats(self):
+        count = total = 0
+        for _, name, st in self._blobs():
+            if not name.startswith('.tmp-'):
+                count += 1
+                total += st.st_size
+        return {'artifacts': count, 'bytes': total, 'stored': self.stored,
+                'deduplicated': self.deduplicated, 'collected': self.collected}
@@ -0,0 +1,195 @@
+"""ASGI entry point serving the verifier with asyncio.
+
+Request bodies are received on the event loop without tying up a thread,
+so slow or large uploads do not block other clients. Once a body is fully
+received, the request is dispatched to the existing Flask routes on a
+bounded thread pool, where parsing, hashing and the RSA operations run
+(hashlib and OpenSSL release the GIL). Every route of ``app.py`` is served
+unchanged.
+
+Run with any ASGI server, e.g.::
+
+    uvicorn asgi_app:application --workers 4
+
+Response bodies are streamed: each chunk the WSGI iterable yields is
+pulled on the thread pool and sent as it is produced, so file downloads
+are not held in memory and server-sent event streams
+(``/api/jobs/<id>/events``) arrive as the job progresses.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from app import create_app
+
+logger = logging.getLogger(__name__)
+
+
+class WSGIBridge:
+    """Minimal ASGI-to-WSGI adapter with asynchronous body reception"""
+
+    def __init__(self, wsgi_app, workers=None, max_body=None, spool_size=16 * 1024 * 1024):
+        self.wsgi_app = wsgi_app
+        self.max_body = max_body
+        self.spool_size = spool_size
+        self.executor = ThreadPoolExecutor(max_workers=workers or min(32, (os.cpu_count() or 1) * 4),
+                                           thread_name_prefix='asgi-crypto')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self._http(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=True)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _http(self, scope, receive, send):
+        headers = {}
+        for name, value in scope['headers']:
+            name, value = name.decode('latin-1').lower(), value.decode('latin-1')
+            if name in headers:
+                # PEP 3333 / RFC 9110: repeated fields are combined; HTTP/2 clients split cookies
+                value = headers[name] + ('; ' if name == 'cookie' else ', ') + value
+            headers[name] = value
+        declared = headers.get('content-length')
+        if self.max_body is not None and declared and declared.isdigit() and int(declared) > self.max_body:
+            await self._send_error(send, 413, b'Request Entity Too Large')
+            return
+
+        body = tempfile.SpooledTemporaryFile(max_size=self.spool_size)
+        try:
+            size = 0
+            more_body = True
+            while more_body:
+                message = await receive()
+                if message['type'] == 'http.disconnect':
+                    return
+                chunk = message.get('body', b'')
+                size += len(chunk)
+                if self.max_body is not None and size > self.max_body:
+                    await self._send_error(send, 413, b'Request Entity Too Large')
+                    return
+                body.write(chunk)
+                more_body = message.get('more_body', False)
+            body.seek(0)
+
+            environ = self._environ(scope, headers, body, size)
+            loop = asyncio.get_running_loop()
+            # The app may still read the body while yielding, so it stays open until the end
+            status, response_headers, chunks, result = await loop.run_in_executor(
+                self.executor, self._start_wsgi, environ)
+            try:
+                await send({
+                    'type': 'http.response.start',
+                    'status': int(status.split(' ', 1)[0]),
+                    'headers': [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                                for name, value in response_headers],
+                })
+                while chunks is not None:
+                    for chunk in chunks:
+                        if chunk:
+                            await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+                    chunks = await loop.run_in_executor(self.executor, self._next_chunks, result)
+                await send({'type': 'http.response.body', 'body': b''})
+            finally:
+                if hasattr(result['iterable'], 'close'):
+                    await loop.run_in_executor(self.executor, result['iterable'].close)
+        finally:
+            body.close()
+
+    @staticmethod
+    async def _send_error(send, status, message):
+        await send({'type': 'http.response.start', 'status': status,
+                    'headers': [(b'content-type', b'text/plain'),
+                                (b'content-length', str(len(message)).encode())]})
+        await send({'type': 'http.response.body', 'body': message})
+
+    @staticmethod
+    def _environ(scope, headers, body, size):
+        server = scope.get('server') or ('localhost', 80)
+        client = scope.get('client') or ('', 0)
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': scope.get('root_path', ''),
+            # PEP 3333: the path is carried as latin-1 decoded UTF-8 bytes
+            'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+            'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+            'SERVER_NAME': server[0],
+            'SERVER_PORT': str(server[1]),
+            'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+            'REMOTE_ADDR': client[0],
+            'REMOTE_PORT': str(client[1]),
+            'CONTENT_LENGTH': str(size),
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': body,
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False,
+        }
+        for name, value in headers.items():
+            if name == 'content-type':
+                environ['CONTENT_TYPE'] = value
+            elif name != 'content-length':
+                environ['HTTP_' + name.upper().replace('-', '_')] = value
+        return environ
+
+    def _start_wsgi(self, environ):
+        """Call the app and pull chunks until it has started the response.
+
+        Returns (status, headers, first chunks, state for _next_chunks).
+        """
+        started = {}
+        written = []
+
+        def start_response(status, response_headers, exc_info=None):
+            if exc_info and started:
+                raise exc_info[1].with_traceback(exc_info[2])
+            started['status'] = status
+            started['headers'] = response_headers
+            return written.append
+
+        iterable = self.wsgi_app(environ, start_response)
+        result = {'iterable': iterable, 'iterator': iter(iterable), 'written': written}
+        try:
+            chunks = []
+            # WSGI lets the app delay start_response until its first chunk
+            while not started or not chunks:
+                more = self._next_chunks(result)
+                if more is None:
+                    break
+                chunks.extend(more)
+        except BaseException:
+            if hasattr(iterable, 'close'):
+                iterable.close()
+            raise
+        return started['status'], started['headers'], chunks, result
+
+    @staticmethod
+    def _next_chunks(result):
+        """The next body chunks (including write() output), or None at the end"""
+        written = result['written']
+        try:
+            chunk = next(result['iterator'])
+        except StopIteration:
+            if not written:
+                return None
+            chunk = b''
+        chunks = written[:] + [chunk]
+        written.clear()
+        return chunks
+
+flask_app = create_app()
+application = WSGIBridge(flask_app, max_body=flask_app.config['MAX_CONTENT_LENGTH'],
+                         spool_size=flask_app.config['MAX_IN_MEMORY_UPLOAD'])
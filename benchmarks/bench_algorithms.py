@@ -0,0 +1,62 @@
+"""Key generation, signing and verification cost per signature algorithm.
+
+Reports ops/sec for keygen, sign and verify, plus signature and public key
+sizes, for RSA PKCS#1 v1.5 and RSA-PSS at each RSA key size and for
+ECDSA P-256 and Ed25519.
+
+Usage: python benchmarks/bench_algorithms.py [--ops N] [--keygen-ops N] [--rsa-sizes 2048,3072,4096]
+"""
+import argparse
+import hashlib
+
+from common import report, timed
+
+from crypto_utils import (
+    SIGNATURE_ALGORITHMS,
+    generate_key_pair,
+    load_private_key_data,
+    load_public_key_data,
+)
+
+
+def repeat(fn, count):
+    for _ in range(count):
+        fn()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--ops', type=int, default=500, help="sign/verify operations per algorithm")
+    parser.add_argument('--keygen-ops', type=int, default=5, help="key pairs generated per algorithm")
+    parser.add_argument('--rsa-sizes', default='2048,3072,4096')
+    args = parser.parse_args()
+
+    cases = []
+    for name in sorted(SIGNATURE_ALGORITHMS):
+        if name.startswith('rsa-'):
+            cases.extend((name, int(size)) for size in args.rsa_sizes.split(','))
+        else:
+            cases.append((name, None))
+
+    digest = hashlib.sha256(b'benchmark document').digest()
+    for name, key_size in cases:
+        label = f'{name}-{key_size}' if key_size else name
+        elapsed, pairs = timed(lambda: [generate_key_pair(key_size, name) for _ in range(args.keygen_ops)])
+        report(f'{label} keygen', elapsed, args.keygen_ops)
+
+        scheme = SIGNATURE_ALGORITHMS[name]
+        private_pem, public_pem = pairs[0]
+        private_key = load_private_key_data(private_pem.encode())
+        public_key = load_public_key_data(public_pem.encode())
+        signature = scheme.sign(private_key, digest)
+        scheme.verify(public_key, signature, digest)
+
+        elapsed, _ = timed(repeat, lambda: scheme.sign(private_key, digest), args.ops)
+        report(f'{label} sign', elapsed, args.ops)
+        elapsed, _ = timed(repeat, lambda: scheme.verify(public_key, signature, digest), args.ops)
+        report(f'{label} verify', elapsed, args.ops)
+        print(f"{'':<40} signature {len(signature)} bytes, public key {len(public_pem)} bytes PEM")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""Throughput of each digest algorithm across input and buffer sizes.
+
+Every entry of DIGEST_ALGORITHMS (blake3 only when the blake3 package is
+installed) hashes in-memory data and a file read with readinto buffers of
+several sizes, so the fastest digest for a deployment's CPU can be picked
+with --digest / digest_algorithm.
+
+Usage: python benchmarks/bench_digests.py [--sizes 64K,1M,64M] [--dir PATH]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+
+from common import make_file, report, timed
+
+from app import parse_size
+from crypto_utils import DIGEST_ALGORITHMS, digest_file, new_hash
+
+CHUNK_SIZES = [64 * 1024, 1024 * 1024, 8 * 1024 * 1024]
+
+
+def best_of(repeat, fn, *args, **kwargs):
+    return min(timed(fn, *args, **kwargs)[0] for _ in range(repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='64K,1M,64M')
+    parser.add_argument('--dir', default=None)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(dir=args.dir)
+    try:
+        for label in args.sizes.split(','):
+            size = parse_size(label)
+            path = make_file(os.path.join(work_dir, f'{label}.bin'), size)
+            with open(path, 'rb') as f:
+                data = f.read()
+            # Small inputs are timed over many iterations to get stable numbers
+            count = max(1, (64 * 1024 * 1024) // size)
+            print(f"--- {label} ({count} iterations)")
+
+            def loop(fn, *a, **kw):
+                for _ in range(count):
+                    fn(*a, **kw)
+
+            def hash_memory(algorithm):
+                h = new_hash(algorithm)
+                h.update(data)
+                return h.digest()
+
+            for algorithm in DIGEST_ALGORITHMS:
+                elapsed = best_of(args.repeat, loop, hash_memory, algorithm)
+                report(f'{algorithm} in-memory', elapsed, count, size * count)
+                for chunk_size in CHUNK_SIZES:
+                    elapsed = best_of(args.repeat, loop, digest_file, path, backend='readinto',
+                                      chunk_size=chunk_size, algorithm=algorithm)
+                    report(f'{algorithm} file chunk={chunk_size // 1024}K', elapsed, count, size * count)
+            os.unlink(path)
+    finally:
+        shutil.rmtree(work_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""Throughput of the file hashing backends across file and chunk sizes.
+
+The "legacy" row reproduces the original 4 KiB read loop for comparison.
+Files up to --max-size are generated in a temp directory (use --dir to put
+them on the disk you actually care about, e.g. an evidence volume).
+
+Usage: python benchmarks/bench_hashing.py [--max-size 4G] [--dir PATH]
+"""
+import argparse
+import hashlib
+import os
+import shutil
+import tempfile
+
+from common import make_file, report, timed
+
+from app import parse_size
+from crypto_utils import HASH_BACKENDS, digest_file
+
+SIZES = ['1K', '64K', '1M', '16M', '256M', '1G', '4G']
+CHUNK_SIZES = [4096, 64 * 1024, 1024 * 1024, 8 * 1024 * 1024]
+
+
+def legacy_digest(path):
+    sha256_hash = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(4096), b''):
+            sha256_hash.update(chunk)
+    return sha256_hash.digest()
+
+
+def best_of(repeat, fn, *args, **kwargs):
+    return min(timed(fn, *args, **kwargs)[0] for _ in range(repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--max-size', default='256M')
+    parser.add_argument('--dir', default=None)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    max_size = parse_size(args.max_size)
+
+    work_dir = tempfile.mkdtemp(dir=args.dir)
+    try:
+        for label in SIZES:
+            size = parse_size(label)
+            if size > max_size:
+                break
+            path = make_file(os.path.join(work_dir, f'{label}.bin'), size)
+            # Small files are timed over many iterations to get stable numbers
+            count = max(1, (16 * 1024 * 1024) // size)
+            print(f"--- {label} ({count} iterations)")
+
+            def loop(fn, *a, **kw):
+                for _ in range(count):
+                    fn(*a, **kw)
+
+            elapsed = best_of(args.repeat, loop, legacy_digest, path)
+            report('legacy 4 KiB read()', elapsed, count, size * count)
+            for backend in HASH_BACKENDS:
+                chunk_sizes = CHUNK_SIZES if backend != 'file_digest' else [None]
+                for chunk_size in chunk_sizes:
+                    kwargs = {'backend': backend}
+                    name = backend
+                    if chunk_size:
+                        kwargs['chunk_size'] = chunk_size
+                        name += f' chunk={chunk_size // 1024}K'
+                    elapsed = best_of(args.repeat, loop, digest_file, path, **kwargs)
+                    report(name, elapsed, count, size * count)
+            os.unlink(path)
+    finally:
+        shutil.rmtree(work_dir)
+
+
+if __name__ == '__main__':
+    main()
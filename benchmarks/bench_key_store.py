@@ -0,0 +1,80 @@
+"""Session cookie size and per-request cost, PEMs in the cookie vs. a key-store handle.
+
+"pem cookie" is the session the app used to set after key generation (both
+PEM strings in the signed cookie); "handle cookie" is what it sets now (a
+handle into key_store.KeyStore). For each, the script prints the cookie
+size and times:
+
+* serializing + signing and then verifying + parsing the session cookie
+  (what Flask does on every response/request touching the session)
+* a GET / round trip through the test client carrying that cookie
+
+Finally it compares signing with a key parsed from the PEM on every
+request (key cache cold) against the parsed key held by the store.
+
+Usage: python benchmarks/bench_key_store.py [--count N] [--key-size BITS]
+"""
+import argparse
+import hashlib
+
+from common import report, timed
+
+import crypto_utils
+from app import app
+from crypto_utils import generate_key_pair, load_private_key_data, make_signature
+from key_store import KeyStore
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=2000)
+    parser.add_argument('--key-size', type=int, default=2048)
+    args = parser.parse_args()
+
+    private_pem, public_pem = generate_key_pair(args.key_size)
+    store = KeyStore()
+    handle = store.put(private_pem, public_pem)
+    sessions = {
+        'pem cookie': {'private_key': private_pem, 'public_key': public_pem},
+        'handle cookie': {'key_handle': handle},
+    }
+    serializer = app.session_interface.get_signing_serializer(app)
+    client = app.test_client()
+
+    def round_trip(data):
+        for _ in range(args.count):
+            serializer.loads(serializer.dumps(data))
+
+    def requests(cookie):
+        client.set_cookie(app.config['SESSION_COOKIE_NAME'], cookie)
+        for _ in range(args.count):
+            client.get('/')
+
+    for name, data in sessions.items():
+        cookie = serializer.dumps(data)
+        print(f"{name:<14} {len(cookie):6d} bytes per Cookie/Set-Cookie header")
+        elapsed, _ = timed(round_trip, data)
+        report(f'{name} serialize+parse', elapsed, args.count)
+        elapsed, _ = timed(requests, cookie)
+        report(f'{name} GET /', elapsed, args.count)
+
+    digest = hashlib.sha256(b'key store benchmark').digest()
+    count = max(1, args.count // 10)
+
+    def sign_from_pem():
+        for _ in range(count):
+            crypto_utils._key_cache.clear()
+            make_signature(digest, load_private_key_data(private_pem.encode()))
+
+    def sign_from_store():
+        for _ in range(count):
+            make_signature(digest, store.get(handle).private_key)
+
+    elapsed, _ = timed(sign_from_pem)
+    report('sign, parse PEM each time', elapsed, count)
+    elapsed, _ = timed(sign_from_store)
+    report('sign, stored parsed key', elapsed, count)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""Scaling of parallel hashing and verification with the worker count.
+
+Reports files/sec and MB/sec for hash_files and verify_files at 1..N workers.
+
+Usage: python benchmarks/bench_parallel.py [--count N] [--size BYTES] [--max-workers N]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+
+from common import make_file, report, timed
+
+from crypto_utils import generate_key_pair, save_keys
+import parallel
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=64)
+    parser.add_argument('--size', type=int, default=4 * 1024 * 1024)
+    parser.add_argument('--max-workers', type=int, default=parallel.default_workers())
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp()
+    try:
+        private_pem, public_pem = generate_key_pair()
+        priv_path = os.path.join(work_dir, 'private.pem')
+        pub_path = os.path.join(work_dir, 'public.pem')
+        save_keys(private_pem, public_pem, priv_path, pub_path)
+        paths = [make_file(os.path.join(work_dir, f'doc_{i}.bin'), args.size) for i in range(args.count)]
+        signatures = parallel.sign_files(paths, priv_path)
+        items = [{'document': p, 'signature': s, 'public_key': pub_path} for p, s in zip(paths, signatures)]
+        total_bytes = args.count * args.size
+
+        print(f"{args.count} files x {args.size} bytes")
+        for workers in range(1, args.max_workers + 1):
+            # Warm the pools so process start-up is not billed to the first run
+            parallel.hash_files(paths[:workers], workers=workers)
+            elapsed, _ = timed(parallel.hash_files, paths, workers=workers)
+            report(f'hash_files workers={workers}', elapsed, args.count, total_bytes)
+            elapsed, results = timed(parallel.verify_files, items, workers=workers)
+            assert all(r['valid'] for r in results)
+            report(f'verify_files workers={workers}', elapsed, args.count, total_bytes)
+    finally:
+        parallel.shutdown()
+        shutil.rmtree(work_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+"""Load test the WSGI dev server against the ASGI serving mode.
+
+Starts each server in a subprocess, then fires POST /api/verify requests
+from concurrent client threads and reports requests/sec and p50/p99
+latency. The ASGI run needs uvicorn (pip install uvicorn).
+
+Usage: python benchmarks/bench_serving.py [--target wsgi|asgi|both]
+       [--concurrency 1,8,32] [--requests 400] [--size BYTES]
+"""
+import argparse
+import hashlib
+import http.client
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import uuid
+
+from common import REPO_ROOT
+
+from crypto_utils import generate_key_pair, load_private_key_data, sign_digest
+
+SERVERS = {
+    'wsgi': [sys.executable, '-c',
+             'import sys; from app import app; app.run(port=int(sys.argv[1]), threaded=True)'],
+    'asgi': [sys.executable, '-m', 'uvicorn', 'asgi_app:application', '--log-level', 'warning', '--port'],
+}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(target, port):
+    proc = subprocess.Popen(SERVERS[target] + [str(port)], cwd=REPO_ROOT,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+            return proc
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError(f"{target} server did not start")
+
+
+def multipart(fields):
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, (filename, data) in fields.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+            f'Content-Type: application/octet-stream\r\n\r\n'.encode() + data + b'\r\n'
+        )
+    body = b''.join(parts) + f'--{boundary}--\r\n'.encode()
+    return body, f'multipart/form-data; boundary={boundary}'
+
+
+def run_load(port, body, content_type, concurrency, total):
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    remaining = [total]
+
+    def client():
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        while True:
+            with lock:
+                if remaining[0] == 0:
+                    break
+                remaining[0] -= 1
+            start = time.perf_counter()
+            try:
+                conn.request('POST', '/api/verify', body, {'Content-Type': content_type})
+                response = conn.getresponse()
+                response.read()
+                if response.status != 200:
+                    raise RuntimeError(f"HTTP {response.status}")
+            except Exception as e:
+                conn.close()
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+                with lock:
+                    errors.append(str(e))
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - start)
+        conn.close()
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, sorted(latencies), errors
+
+
+def percentile(values, fraction):
+    if not values:
+        return float('nan')
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--target', choices=['wsgi', 'asgi', 'both'], default='both')
+    parser.add_argument('--concurrency', default='1,8,32')
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--size', type=int, default=256 * 1024)
+    args = parser.parse_args()
+
+    private_pem, public_pem = generate_key_pair()
+    document = os.urandom(args.size)
+    signature = sign_digest(hashlib.sha256(document).digest(), load_private_key_data(private_pem.encode()))
+    body, content_type = multipart({
+        'document': ('evidence.txt', document),
+        'signature': ('evidence.txt.sig', signature),
+        'public_key': ('public.pem', public_pem.encode()),
+    })
+
+    targets = ['wsgi', 'asgi'] if args.target == 'both' else [args.target]
+    print(f"{'server':<6} {'clients':>7} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for target in targets:
+        port = free_port()
+        proc = start_server(target, port)
+        try:
+            for concurrency in [int(c) for c in args.concurrency.split(',')]:
+                elapsed, latencies, errors = run_load(port, body, content_type, concurrency, args.requests)
+                print(f"{target:<6} {concurrency:>7} {len(latencies) / elapsed:>9.1f} "
+                      f"{percentile(latencies, 0.50) * 1000:>9.1f} {percentile(latencies, 0.99) * 1000:>9.1f} "
+                      f"{len(errors):>7}")
+        finally:
+            proc.terminate()
+            proc.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""Signing throughput: per-call key loading vs. the resident-key signing daemon.
+
+* per-call: what a pipeline script does per document today, which is
+  load_private_key on the PEM file (key cache cold) and then make_signature
+* daemon sequential: one SigningClient.sign round trip at a time
+* daemon pipelined: SigningClient.sign_many over one connection
+* daemon N clients: --clients threads, each pipelining its own share
+
+Every signature is the same as the per-call path would produce.
+
+Usage: python benchmarks/bench_signing_daemon.py [--count N] [--clients N] [--key-size BITS]
+"""
+import argparse
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+
+from common import report, timed
+
+import crypto_utils
+from crypto_utils import generate_key_pair, save_keys, load_private_key, make_signature
+from signing_daemon import SigningDaemon, SigningClient
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=2000)
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--key-size', type=int, default=2048)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp()
+    try:
+        priv_path = os.path.join(work_dir, 'private.pem')
+        save_keys(*generate_key_pair(args.key_size), priv_path, os.path.join(work_dir, 'public.pem'))
+        digests = [hashlib.sha256(str(i).encode()).digest() for i in range(args.count)]
+
+        # PEM parsing dominates here, so a tenth of the requests is plenty
+        per_call = digests[:max(1, args.count // 10)]
+
+        def sign_per_call():
+            for digest in per_call:
+                crypto_utils._key_cache.clear()
+                make_signature(digest, load_private_key(priv_path))
+
+        elapsed, _ = timed(sign_per_call)
+        report('per-call load + sign', elapsed, len(per_call))
+
+        socket_path = os.path.join(work_dir, 'sign.sock')
+        daemon = SigningDaemon(socket_path, {'bench': priv_path}, workers=args.workers)
+        daemon.start()
+        try:
+            with SigningClient(socket_path) as client:
+                def sequential():
+                    for digest in digests:
+                        client.sign('bench', digest)
+
+                elapsed, _ = timed(sequential)
+                report('daemon sequential', elapsed, len(digests))
+                elapsed, _ = timed(client.sign_many, 'bench', digests)
+                report('daemon pipelined', elapsed, len(digests))
+
+            def client_share(chunk):
+                with SigningClient(socket_path) as client:
+                    client.sign_many('bench', chunk)
+
+            def concurrent():
+                share = len(digests) // args.clients
+                threads = [threading.Thread(target=client_share, args=(digests[n * share:(n + 1) * share],))
+                           for n in range(args.clients)]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+                return share * args.clients
+
+            elapsed, total = timed(concurrent)
+            report(f'daemon {args.clients} clients', elapsed, total)
+            stats = daemon.stats()
+            print(f"mean batch size {stats['mean_batch']:.1f} over {stats['batches']} batches")
+        finally:
+            daemon.stop()
+    finally:
+        shutil.rmtree(work_dir)
+
+
+if __name__ == '__main__':
+    main()
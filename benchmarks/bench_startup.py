@@ -0,0 +1,137 @@
+"""Cold-start time: importing the app and its entry points in fresh interpreters.
+
+Every sample is a new interpreter, so nothing is cached in memory between
+runs (bytecode caches are, as on a real server; one warm-up run writes
+them first). Cases:
+
+* crypto_utils: what CLI tools and the signing daemon pay before work
+* import app: the module alone, as tests and WSGI servers load it
+* create_app(): what ``python app.py`` and asgi_app do before serving,
+  including the challenge catalog scan
+
+For each case the median over --runs of the in-process time and of the
+whole process is reported. ``-X importtime`` itself slows imports down,
+so it is only used for --profile-runs extra samples, which list the
+modules with the most import time of their own. Results can be written as
+JSON and compared the way suite.py does; the script exits with status 1
+when a case is slower than the baseline by more than --threshold.
+
+Usage: python benchmarks/bench_startup.py [--runs 15] [--profile-runs 3] [--top 8] [--output startup.json]
+       [--compare baseline.json] [--threshold 0.10]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from common import REPO_ROOT, metadata
+
+CASES = {
+    'import_crypto_utils': 'import crypto_utils',
+    'import_app': 'import app',
+    'create_app': 'import app; app.create_app()',
+}
+
+_TIMED = "import time; _start = time.perf_counter(); {stmt}; print(time.perf_counter() - _start)"
+
+
+def parse_importtime(stderr):
+    """Self time in microseconds per module from ``-X importtime`` output"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # the column header
+        modules[fields[2].strip()] = int(fields[0])
+    return modules
+
+
+def sample(stmt, importtime=False):
+    """Run stmt in a fresh interpreter; returns (in-process s, process s, {module: self us})"""
+    # Compiling sources on every start would swamp what is being measured
+    env = {name: value for name, value in os.environ.items() if name != 'PYTHONDONTWRITEBYTECODE'}
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', _TIMED.format(stmt=stmt)]
+    start = time.perf_counter()
+    proc = subprocess.run(command, cwd=REPO_ROOT, env=env, capture_output=True, text=True)
+    process_seconds = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"{stmt!r} failed:\n{proc.stderr}")
+    return float(proc.stdout.split()[-1]), process_seconds, parse_importtime(proc.stderr)
+
+
+def bench_case(stmt, runs, profile_runs, top):
+    sample(stmt)  # writes bytecode caches
+    in_process, process, self_times = [], [], {}
+    for _ in range(runs):
+        seconds, process_seconds, _ = sample(stmt)
+        in_process.append(seconds)
+        process.append(process_seconds)
+    for _ in range(profile_runs):
+        for name, us in sample(stmt, importtime=True)[2].items():
+            self_times.setdefault(name, []).append(us)
+    heaviest = sorted(((statistics.median(times) / 1000, name) for name, times in self_times.items()),
+                      reverse=True)[:top]
+    return {
+        'seconds': round(statistics.median(in_process), 6),
+        'process_seconds': round(statistics.median(process), 6),
+        'modules': len(self_times),
+        'top_modules': [[name, round(ms, 3)] for ms, name in heaviest],
+    }
+
+
+def compare(baseline, current, threshold):
+    """Return (name, baseline ms, current ms, change) for cases slower than threshold"""
+    regressions = []
+    for name, entry in current['results'].items():
+        before = baseline['results'].get(name)
+        if not before:
+            continue
+        change = entry['seconds'] / before['seconds'] - 1
+        if change > threshold:
+            regressions.append((name, before['seconds'] * 1000, entry['seconds'] * 1000, change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=15, help="fresh interpreters per case")
+    parser.add_argument('--profile-runs', type=int, default=3, help="-X importtime interpreters per case")
+    parser.add_argument('--top', type=int, default=8, help="heaviest modules listed per case")
+    parser.add_argument('--output', default=None, help="write results as JSON to this path")
+    parser.add_argument('--compare', metavar='BASELINE', default=None, help="JSON results to compare against")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="fractional slowdown reported as a regression (default 0.10)")
+    args = parser.parse_args()
+
+    results = {}
+    for name, stmt in CASES.items():
+        entry = results[name] = bench_case(stmt, args.runs, args.profile_runs, args.top)
+        print(f"{name:<24} {entry['seconds'] * 1000:8.1f} ms  process {entry['process_seconds'] * 1000:8.1f} ms"
+              f"  {entry['modules']:4d} modules")
+        for module, ms in entry['top_modules']:
+            print(f"    {module:<40} {ms:8.2f} ms")
+
+    run = {'meta': metadata(), 'results': results}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(run, f, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, run, args.threshold)
+        print(f"--- compared with {baseline['meta'].get('commit')} (threshold {args.threshold:.0%})")
+        for name, before, after, change in regressions:
+            print(f"REGRESSION {name:<24} {before:8.1f} -> {after:8.1f} ms  ({change:+.1%})")
+        if regressions:
+            sys.exit(1)
+        print("no regressions")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""Compare verify_batch against N independent single-file verifications.
+
+The single-file baseline mirrors what /verify_signature does per request: the
+public key is written to a fresh temporary directory, so every call parses it
+again. The HTTP comparison posts the same documents through the Flask test
+client, once per document and once as a single /api/verify_batch call.
+
+Usage: python benchmarks/bench_verify_batch.py [--count N] [--size BYTES]
+"""
+import argparse
+import io
+import json
+import os
+import shutil
+import tempfile
+
+from common import make_file, report, timed
+
+from crypto_utils import generate_key_pair, save_keys, sign_file, save_signature, verify_signature, verify_batch
+
+
+def single_calls(items, public_pem):
+    results = []
+    for item in items:
+        with tempfile.TemporaryDirectory() as key_dir:
+            key_path = os.path.join(key_dir, 'public.pem')
+            with open(key_path, 'w') as f:
+                f.write(public_pem)
+            with open(item['signature'], 'rb') as f:
+                signature = f.read()
+            results.append(verify_signature(item['document'], signature, key_path))
+    return results
+
+
+def http_single(client, items):
+    for item in items:
+        with open(item['document'], 'rb') as d, open(item['signature'], 'rb') as s, \
+                open(item['public_key'], 'rb') as k:
+            client.post('/verify_signature', data={
+                'document': (io.BytesIO(d.read()), os.path.basename(item['document'])),
+                'signature': (io.BytesIO(s.read()), os.path.basename(item['signature'])),
+                'public_key': (io.BytesIO(k.read()), 'public.pem'),
+            }, content_type='multipart/form-data')
+
+
+def http_batch(client, items):
+    files = []
+    manifest = []
+    for item in items:
+        for field in ('document', 'signature'):
+            with open(item[field], 'rb') as f:
+                files.append((io.BytesIO(f.read()), os.path.basename(item[field])))
+        manifest.append({
+            'document': os.path.basename(item['document']),
+            'signature': os.path.basename(item['signature']),
+            'public_key': 'public.pem',
+        })
+    with open(items[0]['public_key'], 'rb') as f:
+        files.append((io.BytesIO(f.read()), 'public.pem'))
+    response = client.post('/api/verify_batch', data={
+        'files': files,
+        'manifest': json.dumps(manifest),
+    }, content_type='multipart/form-data')
+    return response.get_json()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=200)
+    parser.add_argument('--size', type=int, default=16 * 1024)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp()
+    try:
+        private_pem, public_pem = generate_key_pair()
+        priv_path = os.path.join(work_dir, 'private.pem')
+        pub_path = os.path.join(work_dir, 'public.pem')
+        save_keys(private_pem, public_pem, priv_path, pub_path)
+
+        items = []
+        for i in range(args.count):
+            doc_path = make_file(os.path.join(work_dir, f'doc_{i}.txt'), args.size)
+            sig_path = doc_path + '.sig'
+            save_signature(sign_file(doc_path, priv_path), sig_path)
+            items.append({'document': doc_path, 'signature': sig_path, 'public_key': pub_path})
+        total_bytes = args.count * args.size
+
+        print(f"{args.count} documents x {args.size} bytes")
+        elapsed, _ = timed(single_calls, items, public_pem)
+        report('verify_signature x N (fresh key path)', elapsed, args.count, total_bytes)
+        elapsed, results = timed(verify_batch, items)
+        assert all(r['valid'] for r in results)
+        report('verify_batch', elapsed, args.count, total_bytes)
+
+        from app import app
+        app.config['TESTING'] = True
+        client = app.test_client()
+        elapsed, _ = timed(http_single, client, items)
+        report('POST /verify_signature x N', elapsed, args.count, total_bytes)
+        elapsed, body = timed(http_batch, client, items)
+        assert body['valid'] == args.count, body
+        report('POST /api/verify_batch x 1', elapsed, args.count, total_bytes)
+    finally:
+        shutil.rmtree(work_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""Shared helpers for the benchmark scripts in this directory."""
+import os
+import platform
+import subprocess
+import sys
+import time
+
+# Benchmarks are run as plain scripts (python benchmarks/bench_x.py), so make
+# the project modules importable.
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+
+def make_file(path, size):
+    """Write `size` pseudo-random bytes to `path`"""
+    with open(path, 'wb') as f:
+        remaining = size
+        while remaining:
+            block = os.urandom(min(remaining, 1024 * 1024))
+            f.write(block)
+            remaining -= len(block)
+    return path
+
+
+def timed(fn, *args, **kwargs):
+    """Run fn once and return (elapsed_seconds, result)"""
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def report(label, elapsed, count, nbytes=None):
+    """Print one benchmark line with ops/sec and optional MB/sec"""
+    line = f"{label:<40} {elapsed * 1000:10.1f} ms  {count / elapsed:10.1f} ops/s"
+    if nbytes is not None:
+        line += f"  {nbytes / elapsed / (1024 * 1024):10.1f} MB/s"
+    print(line)
+
+
+def metadata():
+    """Commit and machine details stored alongside JSON results"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
@@ -0,0 +1,237 @@
+"""Reproducible benchmark suite for the crypto core and the HTTP routes.
+
+Runs a fixed set of cases and writes the numbers as JSON, so runs on two
+commits can be compared automatically:
+
+* hash_file across file sizes
+* generate_key_pair across RSA key sizes
+* sign_file / verify_signature ops/sec
+* public/private key loading with a cold and a warm key cache
+* end-to-end latency of POST /sign_document and POST /verify_signature
+  through the Flask test client, with the verification cache disabled so
+  every request really verifies
+
+Every case is timed best-of --repeat. Compare a run against a stored
+baseline with --compare; the script exits with status 1 when any case is
+slower than the baseline by more than --threshold.
+
+Usage: python benchmarks/suite.py [--quick] [--output results.json]
+       [--compare baseline.json] [--threshold 0.10]
+"""
+import argparse
+import io
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+from common import REPO_ROOT, make_file, metadata, timed
+
+import crypto_utils
+import app as app_module
+from app import app, parse_size
+from artifact_store import ArtifactStore
+from crypto_utils import (generate_key_pair, save_keys, hash_file, sign_file, verify_signature,
+                          load_public_key_data, load_private_key_data)
+
+HASH_SIZES = ['1K', '64K', '1M', '16M', '128M']
+QUICK_HASH_SIZES = ['1K', '64K', '1M']
+KEY_SIZES = [2048, 3072, 4096]
+QUICK_KEY_SIZES = [2048]
+ROUTE_DOCUMENT_SIZE = 64 * 1024
+
+
+def best_of(repeat, fn, *args):
+    return min(timed(fn, *args)[0] for _ in range(repeat))
+
+
+def loop(count, fn, *args):
+    for _ in range(count):
+        fn(*args)
+
+
+def result(elapsed, count, nbytes=None, **extra):
+    entry = {'seconds': round(elapsed, 6), 'count': count, 'ops_per_sec': round(count / elapsed, 3)}
+    if nbytes is not None:
+        entry['mb_per_sec'] = round(nbytes / elapsed / (1024 * 1024), 3)
+    entry.update(extra)
+    return entry
+
+
+def bench_hashing(work_dir, args, sizes):
+    for label in sizes:
+        size = parse_size(label)
+        path = make_file(os.path.join(work_dir, f'hash_{label}.bin'), size)
+        # Small files are timed over many iterations to get stable numbers
+        count = max(1, (16 * 1024 * 1024) // size)
+        elapsed = best_of(args.repeat, loop, count, hash_file, path)
+        yield f'hash_file/{label}', result(elapsed, count, size * count)
+        os.unlink(path)
+
+
+def bench_keygen(args, key_sizes):
+    for key_size in key_sizes:
+        count = args.keygen_count
+        elapsed = best_of(args.repeat, loop, count, generate_key_pair, key_size)
+        yield f'generate_key_pair/{key_size}', result(elapsed, count)
+
+
+def bench_sign_verify(work_dir, args):
+    doc_path = make_file(os.path.join(work_dir, 'doc.bin'), 4096)
+    priv_path = os.path.join(work_dir, 'private.pem')
+    pub_path = os.path.join(work_dir, 'public.pem')
+    save_keys(*generate_key_pair(2048), priv_path, pub_path)
+    signature = sign_file(doc_path, priv_path)
+    assert verify_signature(doc_path, signature, pub_path)
+
+    count = args.ops
+    elapsed = best_of(args.repeat, loop, count, sign_file, doc_path, priv_path)
+    yield 'sign_file/2048', result(elapsed, count)
+    elapsed = best_of(args.repeat, loop, count, verify_signature, doc_path, signature, pub_path)
+    yield 'verify_signature/2048', result(elapsed, count)
+
+
+def bench_key_loading(args):
+    private_pem, public_pem = (pem.encode() for pem in generate_key_pair(2048))
+    for kind, load, pem in (('public', load_public_key_data, public_pem),
+                            ('private', load_private_key_data, private_pem)):
+        def cold():
+            crypto_utils._key_cache.clear()
+            load(pem)
+
+        count = args.ops
+        elapsed = best_of(args.repeat, loop, count, cold)
+        yield f'load_{kind}_key/cold', result(elapsed, count)
+        load(pem)
+        elapsed = best_of(args.repeat, loop, count, load, pem)
+        yield f'load_{kind}_key/cached', result(elapsed, count)
+    crypto_utils._key_cache.clear()
+
+
+def bench_routes(work_dir, args):
+    """Per-request latency of the HTML form routes via the Flask test client.
+
+    Every verify request posts the same document, signature and key, so with
+    the verdict cache on the case would time cache hits. It is turned off
+    (VERIFY_CACHE_SIZE=0) to keep the numbers comparable to runs before it.
+    """
+    app.config['VERIFY_CACHE_SIZE'] = 0
+    app_module.init_app()
+    assert app_module.verification_cache is None, "set up before the cache could be disabled"
+    # /sign_document stores the .sig in the signature store; keep it out of the tree
+    app_module.signature_store = ArtifactStore(os.path.join(work_dir, 'signatures'))
+    client = app.test_client()
+    document = os.urandom(ROUTE_DOCUMENT_SIZE)
+    private_pem, public_pem = (pem.encode() for pem in generate_key_pair(2048))
+    doc_path = os.path.join(work_dir, 'route.txt')
+    with open(doc_path, 'wb') as f:
+        f.write(document)
+    priv_path = os.path.join(work_dir, 'route_private.pem')
+    with open(priv_path, 'wb') as f:
+        f.write(private_pem)
+    signature = sign_file(doc_path, priv_path)
+
+    def sign_request():
+        response = client.post('/sign_document', data={
+            'document': (io.BytesIO(document), 'route.txt'),
+            'private_key': (io.BytesIO(private_pem), 'private.pem'),
+        }, content_type='multipart/form-data')
+        assert response.status_code == 302, response.status_code
+
+    def verify_request():
+        response = client.post('/verify_signature', data={
+            'document': (io.BytesIO(document), 'route.txt'),
+            'signature': (io.BytesIO(signature), 'route.sig'),
+            'public_key': (io.BytesIO(public_pem), 'public.pem'),
+        }, content_type='multipart/form-data')
+        assert response.status_code == 302, response.status_code
+
+    for name, request in (('route/sign_document', sign_request), ('route/verify_signature', verify_request)):
+        request()  # warm-up
+        best = None
+        for _ in range(args.repeat):
+            latencies = []
+            for _ in range(args.requests):
+                start = time.perf_counter()
+                request()
+                latencies.append(time.perf_counter() - start)
+            if best is None or sum(latencies) < sum(best):
+                best = latencies
+        best.sort()
+        yield name, result(sum(best), len(best), ROUTE_DOCUMENT_SIZE * len(best),
+                           p50_ms=round(statistics.median(best) * 1000, 3),
+                           p99_ms=round(best[min(len(best) - 1, int(len(best) * 0.99))] * 1000, 3))
+
+
+def compare(baseline, current, threshold):
+    """Return (name, baseline ops/s, current ops/s, change) for cases slower than threshold"""
+    regressions = []
+    for name, entry in current['results'].items():
+        before = baseline['results'].get(name)
+        if not before:
+            continue
+        change = entry['ops_per_sec'] / before['ops_per_sec'] - 1
+        if change < -threshold:
+            regressions.append((name, before['ops_per_sec'], entry['ops_per_sec'], change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--quick', action='store_true', help="smaller sizes and counts for a fast smoke run")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--ops', type=int, default=200, help="operations per sign/verify/key-load case")
+    parser.add_argument('--keygen-count', type=int, default=3)
+    parser.add_argument('--requests', type=int, default=50, help="requests per route case")
+    parser.add_argument('--output', default=None, help="write results as JSON to this path")
+    parser.add_argument('--compare', metavar='BASELINE', default=None, help="JSON results to compare against")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="fractional slowdown reported as a regression (default 0.10)")
+    args = parser.parse_args()
+    if args.quick:
+        args.repeat, args.ops, args.keygen_count, args.requests = 1, 20, 1, 10
+
+    work_dir = tempfile.mkdtemp()
+    results = {}
+    try:
+        cases = [
+            bench_hashing(work_dir, args, QUICK_HASH_SIZES if args.quick else HASH_SIZES),
+            bench_keygen(args, QUICK_KEY_SIZES if args.quick else KEY_SIZES),
+            bench_sign_verify(work_dir, args),
+            bench_key_loading(args),
+            bench_routes(work_dir, args),
+        ]
+        for case in cases:
+            for name, entry in case:
+                results[name] = entry
+                line = f"{name:<32} {entry['ops_per_sec']:12.1f} ops/s"
+                if 'mb_per_sec' in entry:
+                    line += f"  {entry['mb_per_sec']:10.1f} MB/s"
+                if 'p50_ms' in entry:
+                    line += f"  p50 {entry['p50_ms']:.2f} ms  p99 {entry['p99_ms']:.2f} ms"
+                print(line)
+    finally:
+        shutil.rmtree(work_dir)
+
+    run = {'meta': metadata(), 'results': results}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(run, f, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, run, args.threshold)
+        print(f"--- compared with {baseline['meta'].get('commit')} (threshold {args.threshold:.0%})")
+        for name, before, after, change in regressions:
+            print(f"REGRESSION {name:<32} {before:12.1f} -> {after:12.1f} ops/s  ({change:+.1%})")
+        if regressions:
+            sys.exit(1)
+        print("no regressions")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+"""In-memory index of the forensic challenges directory.
+
+Every subdirectory of ``root`` is a challenge: an optional ``description.txt``
+plus the files handed out to participants. The catalog scans the tree once
+when it is created and then serves listings, single challenges and file
+lookups from memory, including each file's size and digest.
+
+Changes are picked up by polling: at most every ``check_interval`` seconds a
+request triggers a rescan that compares directory and file stat metadata
+against the index. Unchanged files keep their digests, so a rescan only
+rehashes what was added or modified. A request arriving while another thread
+is rescanning is served from the previous snapshot instead of waiting.
+
+A challenge that ships exactly one document, one ``.sig`` signature and one
+``.pem`` public key is gradable: the signature is verified while the
+challenge is indexed and the verdict ("authentic" or "tampered") is stored
+with it, so ``grade`` compares a submitted answer against the index without
+hashing or public-key operations.
+"""
+import os
+import threading
+import time
+import logging
+from crypto_utils import (digest_file, DEFAULT_DIGEST_ALGORITHM, load_signature, load_public_key,
+                          verify_signature, verify_digest, is_merkle, signature_digest_algorithm)
+
+logger = logging.getLogger(__name__)
+
+DESCRIPTION_FILE = 'description.txt'
+NO_DESCRIPTION = "No description available."
+ANSWERS = ('authentic', 'tampered')
+
+
+def _stamp(stat_result):
+    return (stat_result.st_size, stat_result.st_mtime_ns, stat_result.st_ino, stat_result.st_ctime_ns)
+
+
+class ChallengeCatalog:
+    def __init__(self, root, check_interval=5.0, algorithm=DEFAULT_DIGEST_ALGORITHM):
+        self.root = root
+        self.check_interval = check_interval
+        self.algorithm = algorithm
+        self.scans = 0
+        self.digests_computed = 0
+        self.verifications = 0
+        self._lock = threading.Lock()
+        self._challenges = {}
+        self._order = ()
+        self._stamps = {}
+        self._checked = None
+        self.refresh(force=True)
+
+    def refresh(self, force=False):
+        """Rescan the tree if the check interval has elapsed (or always with force)"""
+        if not force and self._checked is not None and time.monotonic() - self._checked < self.check_interval:
+            return False
+        if not self._lock.acquire(blocking=force):
+            return False
+        try:
+            if not force and self._checked is not None and time.monotonic() - self._checked < self.check_interval:
+                return False
+            self._scan()
+            self._checked = time.monotonic()
+            return True
+        finally:
+            self._lock.release()
+
+    def _scan(self):
+        challenges = {}
+        stamps = {}
+        try:
+            entries = sorted((e for e in os.scandir(self.root) if e.is_dir()), key=lambda e: e.name)
+        except FileNotFoundError:
+            entries = []
+        for entry in entries:
+            try:
+                challenge, files = self._load(entry.name, entry.path)
+            except OSError as e:
+                logger.error(f"Failed to index challenge {entry.name}: {str(e)}")
+                continue
+            challenges[entry.name] = challenge
+            stamps[entry.name] = files
+        # Swap in the new snapshot in one step; readers never see a partial index
+        self._challenges, self._order, self._stamps = challenges, tuple(challenges), stamps
+        self.scans += 1
+
+    def _load(self, challenge_id, path):
+        previous = self._challenges.get(challenge_id)
+        previous_files = {f['name']: f for f in previous['files']} if previous else {}
+        previous_stamps = self._stamps.get(challenge_id, {})
+
+        description = NO_DESCRIPTION
+        files = []
+        stamps = {}
+        for entry in sorted(os.scandir(path), key=lambda e: e.name):
+            if not entry.is_file():
+                continue
+            if entry.name == DESCRIPTION_FILE:
+                with open(entry.path, 'r', errors='replace') as f:
+                    description = f.read()
+                continue
+            stamp = _stamp(entry.stat())
+            known = previous_files.get(entry.name)
+            if known is not None and previous_stamps.get(entry.name) == stamp:
+                digest = known['digest']
+            else:
+                digest = digest_file(entry.path, algorithm=self.algorithm).hex()
+                self.digests_computed += 1
+            stamps[entry.name] = stamp
+            files.append({'name': entry.name, 'size': stamp[0], 'digest': digest})
+
+        if previous is not None and stamps == previous_stamps:
+            expected = previous['expected']
+        else:
+            expected = self._expected_outcome(path, files)
+
+        challenge = {
+            'id': challenge_id,
+            'name': challenge_id.replace('_', ' ').title(),
+            'description': description,
+            'files': files,
+            'total_size': sum(f['size'] for f in files),
+            'expected': expected,
+        }
+        return challenge, stamps
+
+    def _expected_outcome(self, path, files):
+        """Verify the challenge's signature once; None when the challenge is not gradable"""
+        signatures = [f for f in files if f['name'].endswith('.sig')]
+        keys = [f for f in files if f['name'].endswith('.pem')]
+        documents = [f for f in files if f not in signatures and f not in keys]
+        if len(signatures) != 1 or len(keys) != 1 or len(documents) != 1:
+            return None
+        document, key_path = documents[0], os.path.join(path, keys[0]['name'])
+        document_path = os.path.join(path, document['name'])
+        try:
+            signature = load_signature(os.path.join(path, signatures[0]['name']))
+            if not is_merkle(signature) and signature_digest_algorithm(signature) == self.algorithm:
+                # The index already holds the document digest
+                valid = verify_digest(bytes.fromhex(document['digest']), signature, load_public_key(key_path))
+            else:
+                valid = verify_signature(document_path, signature, key_path)
+        except (OSError, ValueError) as e:
+            logger.error(f"Failed to precompute verdict for {path}: {str(e)}")
+            return None
+        self.verifications += 1
+        return ANSWERS[0] if valid else ANSWERS[1]
+
+    def __len__(self):
+        self.refresh()
+        return len(self._order)
+
+    def page(self, page=1, per_page=20):
+        """Return (challenges on the page, total number of challenges)"""
+        self.refresh()
+        order, challenges = self._order, self._challenges
+        start = (max(1, page) - 1) * per_page
+        return [challenges[cid] for cid in order[start:start + per_page]], len(order)
+
+    def get(self, challenge_id):
+        """Return the indexed challenge, or None if there is no such challenge"""
+        self.refresh()
+        return self._challenges.get(challenge_id)
+
+    def grade(self, challenge_id, answer):
+        """Return whether ``answer`` is correct for the challenge.
+
+        Raises KeyError for an unknown challenge and ValueError when the
+        challenge is not gradable or the answer is not one of ANSWERS.
+        """
+        challenge = self.get(challenge_id)
+        if challenge is None:
+            raise KeyError(challenge_id)
+        if challenge['expected'] is None:
+            raise ValueError("Challenge is not gradable")
+        answer = str(answer).strip().lower()
+        if answer not in ANSWERS:
+            raise ValueError(f"Answer must be one of: {', '.join(ANSWERS)}")
+        return answer == challenge['expected']
+
+    def file_path(self, challenge_id, filename):
+        """Path of an indexed challenge file, or None if it is not part of the challenge"""
+        challenge = self.get(challenge_id)
+        if challenge is None or not any(f['name'] == filename for f in challenge['files']):
+            return None
+        return os.path.join(self.root, challenge_id, filename)
@@ -0,0 +1,298 @@
+"""Command-line interface for bulk hashing, signing and verification.
+
+Walks files and directories recursively and streams one JSON object per
+file to stdout. Work is done in batches on the parallel engine, and a
+summary (files, bytes, elapsed time, throughput) is written to stderr at
+the end. With ``--resume STATE`` every result is also appended to STATE,
+and files already recorded there are skipped on the next run, so an
+interrupted sweep can continue where it stopped.
+
+Examples::
+
+    python cli.py keygen --out-dir keys/
+    python cli.py sign evidence/ --key keys/private.pem
+    python cli.py verify evidence/ --key keys/public.pem --resume verify.state
+    python cli.py hash evidence/ --digest-cache digests.db
+    python cli.py manifest release/ --key keys/private.pem --out release.manifest
+    python cli.py verify-manifest release/ --manifest release.manifest --key keys/public.pem
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import logging
+from crypto_utils import (
+    generate_key_pair,
+    save_keys,
+    load_private_key,
+    sign_merkle,
+    save_signature,
+    set_digest_cache,
+    set_verification_cache,
+    SIGNATURE_ALGORITHMS,
+    DEFAULT_SIGNATURE_ALGORITHM,
+    DIGEST_ALGORITHMS,
+    DEFAULT_DIGEST_ALGORITHM
+)
+import parallel
+import manifest
+
+logger = logging.getLogger(__name__)
+BATCH_SIZE = 256
+
+
+def iter_files(paths, skip_suffix=None):
+    """Yield files under the given paths in a stable order"""
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, filenames in os.walk(path):
+                dirs.sort()
+                for filename in sorted(filenames):
+                    if skip_suffix and filename.endswith(skip_suffix):
+                        continue
+                    yield os.path.join(root, filename)
+        else:
+            yield path
+
+
+def batched(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class Run:
+    """Tracks output, resume state and summary statistics for one command"""
+
+    def __init__(self, out, resume_path=None):
+        self.out = out
+        self.files = 0
+        self.bytes = 0
+        self.failures = 0
+        self.skipped = 0
+        self.start = time.perf_counter()
+        self.done = set()
+        self.state = None
+        if resume_path:
+            if os.path.exists(resume_path):
+                with open(resume_path) as f:
+                    for line in f:
+                        try:
+                            self.done.add(json.loads(line)['path'])
+                        except (ValueError, KeyError):
+                            continue  # Partial last line from an interrupted run
+            self.state = open(resume_path, 'a')
+
+    def pending(self, paths):
+        for path in paths:
+            if path in self.done:
+                self.skipped += 1
+            else:
+                yield path
+
+    def emit(self, record, failed=False):
+        line = json.dumps(record)
+        self.out.write(line + '\n')
+        if self.state:
+            self.state.write(line + '\n')
+        self.files += 1
+        self.failures += failed
+        try:
+            self.bytes += os.path.getsize(record['path'])
+        except (OSError, KeyError):
+            pass
+
+    def flush(self):
+        self.out.flush()
+        if self.state:
+            self.state.flush()
+
+    def summary(self):
+        elapsed = time.perf_counter() - self.start
+        if self.state:
+            self.state.close()
+        return {
+            'files': self.files,
+            'bytes': self.bytes,
+            'failures': self.failures,
+            'skipped': self.skipped,
+            'elapsed': round(elapsed, 3),
+            'files_per_sec': round(self.files / elapsed, 1) if elapsed else 0.0,
+            'mb_per_sec': round(self.bytes / elapsed / (1024 * 1024), 2) if elapsed else 0.0,
+        }
+
+
+def cmd_hash(args, run):
+    for batch in batched(run.pending(iter_files(args.paths)), BATCH_SIZE):
+        for path, (digest, error) in zip(batch, parallel.digest_files(batch, args.workers, args.digest)):
+            if error:
+                run.emit({'path': path, 'error': error}, failed=True)
+            else:
+                run.emit({'path': path, args.digest: digest.hex()})
+        run.flush()
+
+
+def cmd_sign(args, run):
+    private_key = load_private_key(args.key)
+    for batch in batched(run.pending(iter_files(args.paths, args.suffix)), BATCH_SIZE):
+        if args.merkle:
+            if args.digest != DEFAULT_DIGEST_ALGORITHM:
+                raise SystemExit("--merkle signatures use SHA-256 chunk hashes")
+            signatures = []
+            for path in batch:
+                try:
+                    signatures.append((sign_merkle(path, private_key, workers=args.workers,
+                                                   algorithm=args.algorithm), None))
+                except OSError as e:
+                    signatures.append((None, str(e)))
+        else:
+            digests = parallel.digest_files(batch, args.workers, args.digest)
+            signed = iter(parallel.sign_digests([d for d, e in digests if not e], private_key, args.workers,
+                                                args.algorithm, args.digest))
+            signatures = [(None, e) if e else (next(signed), None) for d, e in digests]
+
+        for path, (signature, error) in zip(batch, signatures):
+            if error is None:
+                try:
+                    save_signature(signature, path + args.suffix)
+                except OSError as e:
+                    error = str(e)
+            if error:
+                run.emit({'path': path, 'error': error}, failed=True)
+            else:
+                run.emit({'path': path, 'signature': path + args.suffix})
+        run.flush()
+
+
+def cmd_verify(args, run):
+    for batch in batched(run.pending(iter_files(args.paths, args.suffix)), BATCH_SIZE):
+        items = [{'document': path, 'signature': path + args.suffix, 'public_key': args.key} for path in batch]
+        for path, result in zip(batch, parallel.verify_files(items, args.workers)):
+            record = {'path': path, 'valid': result['valid']}
+            if result['error']:
+                record['error'] = result['error']
+            run.emit(record, failed=not result['valid'])
+        run.flush()
+
+
+def cmd_manifest(args, run):
+    built = manifest.sign_manifest(args.root, args.out, args.key, workers=args.workers, algorithm=args.digest)
+    for relpath, digest in sorted(built['files'].items()):
+        run.emit({'path': os.path.join(args.root, relpath), built['digest']: digest})
+    run.emit({'path': args.out, 'signature': args.out + '.sig'})
+
+
+def cmd_verify_manifest(args, run):
+    result = manifest.verify_manifest(args.root, args.manifest, args.key, workers=args.workers)
+    if not result['signature_valid']:
+        run.emit({'path': args.manifest, 'valid': False, 'error': 'Manifest signature is invalid'}, failed=True)
+        return
+    for record in result['results']:
+        run.emit({'path': os.path.join(args.root, record['path']), 'status': record['status']},
+                 failed=record['status'] != 'ok')
+
+
+def cmd_keygen(args, run):
+    os.makedirs(args.out_dir, exist_ok=True)
+    private_path = os.path.join(args.out_dir, 'private.pem')
+    public_path = os.path.join(args.out_dir, 'public.pem')
+    if os.path.exists(private_path) and not args.force:
+        raise SystemExit(f"{private_path} exists; use --force to overwrite")
+    key_size = args.key_size if args.algorithm.startswith('rsa-') else None
+    private_key, public_key = generate_key_pair(key_size, args.algorithm)
+    save_keys(private_key, public_key, private_path, public_path)
+    run.emit({'path': public_path, 'private_key': private_path, 'algorithm': args.algorithm, 'key_size': key_size})
+
+
+def build_parser():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--workers', type=int, default=None,
+                        help="parallel workers (default: CPU count)")
+    common.add_argument('--resume', metavar='STATE',
+                        help="append results to STATE and skip files already recorded there")
+    common.add_argument('--digest-cache', metavar='DB',
+                        help="reuse digests of unchanged files from this SQLite cache")
+    common.add_argument('--verify-cache', metavar='DB',
+                        help="reuse verdicts for (digest, signature, key) triples from this SQLite cache")
+
+    # Verification needs no option: the digest is recorded in the signature or manifest
+    digest = argparse.ArgumentParser(add_help=False)
+    digest.add_argument('--digest', choices=sorted(DIGEST_ALGORITHMS), default=DEFAULT_DIGEST_ALGORITHM,
+                        help="digest algorithm (default: sha256)")
+
+    parser = argparse.ArgumentParser(description="Bulk hashing, signing and verification")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('hash', parents=[common, digest], help="print file digests")
+    p.add_argument('paths', nargs='+')
+    p.set_defaults(func=cmd_hash)
+
+    p = sub.add_parser('sign', parents=[common, digest], help="write a detached signature next to each file")
+    p.add_argument('paths', nargs='+')
+    p.add_argument('--key', required=True, help="private key (PEM)")
+    p.add_argument('--suffix', default='.sig')
+    p.add_argument('--merkle', action='store_true', help="write chunked Merkle-tree signatures")
+    p.add_argument('--algorithm', choices=sorted(SIGNATURE_ALGORITHMS),
+                   help="signature algorithm (default: the key's own, PKCS#1 v1.5 for RSA)")
+    p.set_defaults(func=cmd_sign)
+
+    p = sub.add_parser('verify', parents=[common], help="check each file against its detached signature")
+    p.add_argument('paths', nargs='+')
+    p.add_argument('--key', required=True, help="public key (PEM)")
+    p.add_argument('--suffix', default='.sig')
+    p.set_defaults(func=cmd_verify)
+
+    p = sub.add_parser('manifest', parents=[common, digest], help="write and sign one manifest covering a directory")
+    p.add_argument('root')
+    p.add_argument('--key', required=True, help="private key (PEM)")
+    p.add_argument('--out', required=True, help="manifest path; the signature goes to <out>.sig")
+    p.set_defaults(func=cmd_manifest)
+
+    p = sub.add_parser('verify-manifest', parents=[common], help="check a directory against a signed manifest")
+    p.add_argument('root')
+    p.add_argument('--manifest', required=True)
+    p.add_argument('--key', required=True, help="public key (PEM)")
+    p.set_defaults(func=cmd_verify_manifest)
+
+    p = sub.add_parser('keygen', parents=[common], help="generate a key pair")
+    p.add_argument('--out-dir', default='.')
+    p.add_argument('--algorithm', choices=sorted(SIGNATURE_ALGORITHMS), default=DEFAULT_SIGNATURE_ALGORITHM)
+    p.add_argument('--key-size', type=int, default=2048, help="RSA modulus size")
+    p.add_argument('--force', action='store_true')
+    p.set_defaults(func=cmd_keygen)
+    return parser
+
+
+def main(argv=None, out=None):
+    args = build_parser().parse_args(argv)
+    if args.digest_cache:
+        from digest_cache import DigestCache
+        set_digest_cache(DigestCache(args.digest_cache))
+    if args.verify_cache:
+        from verification_cache import VerificationCache
+        set_verification_cache(VerificationCache(db_path=args.verify_cache))
+    run = Run(out or sys.stdout, args.resume)
+    try:
+        args.func(args, run)
+    except KeyboardInterrupt:
+        logger.error("Interrupted; rerun with the same --resume file to continue")
+    finally:
+        run.flush()
+        summary = run.summary()
+        parallel.shutdown()
+        if args.digest_cache:
+            set_digest_cache(None)
+        if args.verify_cache:
+            set_verification_cache(None)
+    print(json.dumps({'summary': summary}), file=sys.stderr)
+    return 1 if summary['failures'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,34 +1,480 @@
 import hashlib
+import importlib
+import io
+import mmap
 import os
+import json
+import struct
+import threading
+import time
 import logging
-from cryptography.hazmat.primitives import hashes, serialization
-from cryptography.hazmat.primitives.asymmetric import padding, rsa, utils
-from cryptography.hazmat.primitives.asymmetric.rsa import RSAPublicKey, RSAPrivateKey
-from cryptography.exceptions import InvalidSignature
-from cryptography.hazmat.backends import default_backend
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+try:
+    import blake3
+except ImportError:  # optional, pip install blake3
+    blake3 = None
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
-_key_cache = {}
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+
+class _LazyModule:
+    """Stand-in for a module that is imported on first attribute access.
+
+    Loading the cryptography backend takes tens of milliseconds, which every
+    process importing this module (the web app, the signing daemon, CLI
+    tools) would otherwise pay before doing anything, even if it never
+    touches a key.
+    """
+    def __init__(self, name):
+        self._name = name
+
+    def __getattr__(self, attr):
+        value = getattr(importlib.import_module(self._name), attr)
+        setattr(self, attr, value)
+        return value
+
+
+hashes = _LazyModule('cryptography.hazmat.primitives.hashes')
+serialization = _LazyModule('cryptography.hazmat.primitives.serialization')
+padding = _LazyModule('cryptography.hazmat.primitives.asymmetric.padding')
+rsa = _LazyModule('cryptography.hazmat.primitives.asymmetric.rsa')
+ec = _LazyModule('cryptography.hazmat.primitives.asymmetric.ec')
+ed25519 = _LazyModule('cryptography.hazmat.primitives.asymmetric.ed25519')
+utils = _LazyModule('cryptography.hazmat.primitives.asymmetric.utils')
+exceptions = _LazyModule('cryptography.exceptions')
+backends = _LazyModule('cryptography.hazmat.backends')
+
+
+class LRUCache:
+    """Thread-safe LRU cache of values keyed by ``(kind, key)``.
+
+    ``kind`` keeps unrelated entries sharing one cache apart, e.g. public and
+    private keys parsed from the same bytes. At most ``max_size`` entries
+    are held, each for at most ``ttl`` seconds.
+    """
+    def __init__(self, max_size=256, ttl=3600):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, kind, key):
+        with self._lock:
+            entry = self._entries.get((kind, key))
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires = entry
+            if expires <= time.monotonic():
+                del self._entries[(kind, key)]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end((kind, key))
+            self.hits += 1
+            return value
+
+    def put(self, kind, key, value):
+        with self._lock:
+            self._entries[(kind, key)] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end((kind, key))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def discard(self, kind, key):
+        with self._lock:
+            self._entries.pop((kind, key), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+
+def key_fingerprint(key_data):
+    """SHA-256 fingerprint (hex) of serialized key bytes"""
+    return hashlib.sha256(key_data).hexdigest()
+
+
+# Parsed keys by the SHA-256 of their PEM bytes. Keying on content rather than
+# file path means the same key uploaded into different temporary files is
+# parsed once, and a path reused for a different key never returns a stale entry.
+_key_cache = LRUCache()
+# Fingerprints of loaded public keys by id(); entries hold the key so the id
+# stays unique (key objects are not hashable, so a WeakKeyDictionary cannot hold them)
+_public_fingerprints = LRUCache()
+_digest_cache = None
+_verification_cache = None
+
+MMAP_THRESHOLD = 1024 * 1024
+
+# Document digest algorithms by name. SHA-512 and BLAKE2b are faster than
+# SHA-256 on 64-bit CPUs without SHA extensions; BLAKE3 is used when the
+# blake3 package is installed and hashes large buffers on several threads.
+DIGEST_ALGORITHMS = {
+    'sha256': hashlib.sha256,
+    'sha512': hashlib.sha512,
+    'blake2b': hashlib.blake2b,
+    'blake2s': hashlib.blake2s,
+}
+if blake3 is not None:
+    DIGEST_ALGORITHMS['blake3'] = lambda: blake3.blake3(max_threads=blake3.blake3.AUTO)
+DEFAULT_DIGEST_ALGORITHM = 'sha256'
+
+def new_hash(algorithm=None):
+    """Return a fresh hash object for a name in DIGEST_ALGORITHMS (default SHA-256)"""
+    algorithm = algorithm or DEFAULT_DIGEST_ALGORITHM
+    try:
+        return DIGEST_ALGORITHMS[algorithm]()
+    except KeyError:
+        raise ValueError(f"Unsupported digest algorithm: {algorithm}")
+
+def _hash_readinto(f, chunk_size, algorithm):
+    # Never allocate a buffer larger than the file itself
+    size = os.fstat(f.fileno()).st_size
+    return digest_stream(f, max(1, min(chunk_size, size)), algorithm=algorithm)
+
+def _hash_mmap(f, chunk_size, algorithm):
+    file_hash = new_hash(algorithm)
+    if os.fstat(f.fileno()).st_size == 0:
+        # Empty files cannot be mapped
+        return file_hash.digest()
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        with memoryview(mapped) as view:
+            for offset in range(0, len(view), chunk_size):
+                file_hash.update(view[offset:offset + chunk_size])
+    return file_hash.digest()
+
+def _hash_file_digest(f, chunk_size, algorithm):
+    # hashlib.file_digest picks its own buffer size
+    return hashlib.file_digest(f, lambda: new_hash(algorithm)).digest()
+
+def _hash_auto(f, chunk_size, algorithm):
+    if os.fstat(f.fileno()).st_size < MMAP_THRESHOLD:
+        return _hash_readinto(f, chunk_size, algorithm)
+    return _hash_mmap(f, chunk_size, algorithm)
+
+HASH_BACKENDS = {
+    'auto': _hash_auto,
+    'readinto': _hash_readinto,
+    'mmap': _hash_mmap,
+}
+if hasattr(hashlib, 'file_digest'):  # Python 3.11+
+    HASH_BACKENDS['file_digest'] = _hash_file_digest
+DEFAULT_HASH_BACKEND = 'auto'
+
+def set_digest_cache(cache):
+    """Install a digest_cache.DigestCache consulted by digest_file (None disables it)"""
+    global _digest_cache
+    _digest_cache = cache
+
+def set_verification_cache(cache):
+    """Install a verification_cache.VerificationCache consulted by verify_digest (None disables it)"""
+    global _verification_cache
+    _verification_cache = cache
+
+def digest_file(file_path, backend=None, chunk_size=STREAM_CHUNK_SIZE, algorithm=None):
+    """Return the raw digest of a file (SHA-256 unless ``algorithm`` names another).
+
+    ``backend`` selects how the file is read (see ``HASH_BACKENDS``): ``readinto``
+    into a preallocated buffer of up to ``chunk_size`` bytes, ``mmap`` of the
+    whole file, ``hashlib.file_digest`` where available, or ``auto`` (the
+    default), which uses readinto below ``MMAP_THRESHOLD`` and mmap above it.
+
+    When a digest cache is installed (see ``set_digest_cache``) unchanged
+    files are answered from it without being read.
+    """
+    backend = backend or DEFAULT_HASH_BACKEND
+    if backend not in HASH_BACKENDS:
+        raise ValueError(f"Unknown hash backend: {backend}")
+    algorithm = algorithm or DEFAULT_DIGEST_ALGORITHM
+    if algorithm not in DIGEST_ALGORITHMS:
+        raise ValueError(f"Unsupported digest algorithm: {algorithm}")
+    with open(file_path, "rb", buffering=0) as f:
+        if _digest_cache is None:
+            return HASH_BACKENDS[backend](f, chunk_size, algorithm)
+
+        # Stat before hashing so a file modified mid-read is not cached as current
+        stat_result = os.fstat(f.fileno())
+        digest = _digest_cache.lookup(file_path, stat_result, algorithm)
+        if digest is None:
+            digest = HASH_BACKENDS[backend](f, chunk_size, algorithm)
+            _digest_cache.store(file_path, stat_result, digest, algorithm)
+        return digest
+
+def hash_file(file_path, backend=None, chunk_size=STREAM_CHUNK_SIZE, algorithm=None):
+    return digest_file(file_path, backend, chunk_size, algorithm).hex()
+
+class DigestingBuffer(io.BytesIO):
+    """In-memory upload buffer that hashes bytes as they are written.
+
+    Werkzeug writes multipart file parts sequentially, so by the time a request
+    has been parsed the SHA-256 of each upload is already known and the
+    document never has to be read back or written to disk.
+    """
+    def __init__(self):
+        super().__init__()
+        self._hash = hashlib.sha256()
+        self._hashed = 0
+
+    def write(self, data):
+        position = self.tell()
+        written = super().write(data)
+        if position == self._hashed:
+            self._hash.update(data)
+            self._hashed += written
+        else:
+            # Out-of-order write: fall back to hashing the buffer on demand
+            self._hashed = -1
+        return written
+
+    def digest(self, algorithm=None):
+        """SHA-256 is precomputed; other algorithms hash the buffer in place"""
+        with self.getbuffer() as view:
+            if algorithm not in (None, DEFAULT_DIGEST_ALGORITHM):
+                digest = new_hash(algorithm)
+                digest.update(view)
+                return digest.digest()
+            if self._hashed != view.nbytes:
+                return hashlib.sha256(view).digest()
+        return self._hash.copy().digest()
+
+def digest_stream(stream, chunk_size=STREAM_CHUNK_SIZE, progress=None, algorithm=None):
+    """Return the raw digest of a binary stream from its current position.
+
+    In-memory buffers are hashed in place without copying; other streams are
+    read with readinto() into one reused buffer. ``progress``, if given, is
+    called with the number of bytes hashed so far after each chunk.
+    ``algorithm`` names an entry of ``DIGEST_ALGORITHMS`` (default SHA-256).
+    """
+    if isinstance(stream, DigestingBuffer) and stream.tell() == 0:
+        digest = stream.digest(algorithm)
+        if progress:
+            progress(stream.seek(0, io.SEEK_END))
+        return digest
+
+    stream_hash = new_hash(algorithm)
+    if isinstance(stream, io.BytesIO):
+        with stream.getbuffer() as view:
+            stream_hash.update(view[stream.tell():])
+        total = stream.seek(0, io.SEEK_END)
+        if progress:
+            progress(total)
+        return stream_hash.digest()
 
-def hash_file(file_path):
-    sha256_hash = hashlib.sha256()
-    with open(file_path, "rb") as f:
-        for chunk in iter(lambda: f.read(4096), b""):
-            sha256_hash.update(chunk)
-    return sha256_hash.hexdigest()
+    total = 0
+    readinto = getattr(stream, 'readinto', None)
+    if readinto is None:
+        for chunk in iter(lambda: stream.read(chunk_size), b''):
+            stream_hash.update(chunk)
+            total += len(chunk)
+            if progress:
+                progress(total)
+        return stream_hash.digest()
 
-def hash_data(data):
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    while True:
+        n = readinto(buffer)
+        if not n:
+            break
+        stream_hash.update(view[:n])
+        total += n
+        if progress:
+            progress(total)
+    return stream_hash.digest()
+
+def hash_data(data, algorithm=None):
     if not isinstance(data, bytes):
         raise TypeError("Data must be bytes")
-    return hashlib.sha256(data).hexdigest()
+    data_hash = new_hash(algorithm)
+    data_hash.update(data)
+    return data_hash.hexdigest()
 
-def generate_key_pair():
-    private_key = rsa.generate_private_key(
-        public_exponent=65537,
-        key_size=2048,
-        backend=default_backend()
-    )
+def parse_digest(value, algorithm=None):
+    """Decode a hex digest computed elsewhere (e.g. in the browser) for signing or verification.
+
+    Raises ValueError unless it is exactly one ``algorithm`` digest long.
+    """
+    digest_size = new_hash(algorithm).digest_size
+    try:
+        digest = bytes.fromhex(value.strip())
+    except (AttributeError, ValueError):
+        digest = None
+    if digest is None or len(digest) != digest_size:
+        raise ValueError(f"Digest must be {digest_size * 2} hex characters "
+                         f"({algorithm or DEFAULT_DIGEST_ALGORITHM})")
+    return digest
+
+class SignatureAlgorithm:
+    """A signature scheme usable for keys, signing and verification.
+
+    Every scheme signs a SHA-256 value: the document digest, or for other
+    digest algorithms the payload from ``_signed_payload``. Subclasses set
+    ``name``, the usual ``key_sizes`` (the first is the default) and the
+    key classes they operate on, and implement generate/sign/verify. The
+    key classes are properties so the backend is only loaded when used.
+    """
+    name = None
+    key_sizes = ()
+    private_key_type = None
+    public_key_type = None
+
+    def accepts(self, key):
+        return isinstance(key, (self.private_key_type, self.public_key_type))
+
+    def generate(self, key_size):
+        raise NotImplementedError
+
+    def sign(self, private_key, digest):
+        raise NotImplementedError
+
+    def verify(self, public_key, signature, digest):
+        """Raise InvalidSignature if the signature does not match"""
+        raise NotImplementedError
+
+
+class RSAPKCS1v15(SignatureAlgorithm):
+    name = 'rsa-pkcs1v15'
+    key_sizes = (2048, 3072, 4096)
+
+    @property
+    def private_key_type(self):
+        return rsa.RSAPrivateKey
+
+    @property
+    def public_key_type(self):
+        return rsa.RSAPublicKey
+
+    def generate(self, key_size):
+        return rsa.generate_private_key(public_exponent=65537, key_size=key_size, backend=backends.default_backend())
+
+    def sign(self, private_key, digest):
+        return private_key.sign(digest, padding.PKCS1v15(), utils.Prehashed(hashes.SHA256()))
+
+    def verify(self, public_key, signature, digest):
+        public_key.verify(signature, digest, padding.PKCS1v15(), utils.Prehashed(hashes.SHA256()))
+
+
+class RSAPSS(RSAPKCS1v15):
+    name = 'rsa-pss'
+
+    @staticmethod
+    def _padding():
+        # A fixed salt length keeps signatures verifiable with Prehashed digests
+        return padding.PSS(mgf=padding.MGF1(hashes.SHA256()), salt_length=padding.PSS.DIGEST_LENGTH)
+
+    def sign(self, private_key, digest):
+        return private_key.sign(digest, self._padding(), utils.Prehashed(hashes.SHA256()))
+
+    def verify(self, public_key, signature, digest):
+        public_key.verify(signature, digest, self._padding(), utils.Prehashed(hashes.SHA256()))
+
+
+class ECDSAP256(SignatureAlgorithm):
+    name = 'ecdsa-p256'
+    key_sizes = (256,)
+
+    @property
+    def private_key_type(self):
+        return ec.EllipticCurvePrivateKey
+
+    @property
+    def public_key_type(self):
+        return ec.EllipticCurvePublicKey
+
+    def accepts(self, key):
+        return super().accepts(key) and isinstance(key.curve, ec.SECP256R1)
+
+    def generate(self, key_size):
+        return ec.generate_private_key(ec.SECP256R1(), backend=backends.default_backend())
+
+    def sign(self, private_key, digest):
+        return private_key.sign(digest, ec.ECDSA(utils.Prehashed(hashes.SHA256())))
+
+    def verify(self, public_key, signature, digest):
+        public_key.verify(signature, digest, ec.ECDSA(utils.Prehashed(hashes.SHA256())))
+
+
+class Ed25519(SignatureAlgorithm):
+    # Ed25519 has no prehashed mode here; the 32-byte digest is signed as the message
+    name = 'ed25519'
+    key_sizes = (256,)
+
+    @property
+    def private_key_type(self):
+        return ed25519.Ed25519PrivateKey
+
+    @property
+    def public_key_type(self):
+        return ed25519.Ed25519PublicKey
+
+    def generate(self, key_size):
+        return ed25519.Ed25519PrivateKey.generate()
+
+    def sign(self, private_key, digest):
+        return private_key.sign(digest)
+
+    def verify(self, public_key, signature, digest):
+        public_key.verify(signature, digest)
+
+
+SIGNATURE_ALGORITHMS = {}
+DEFAULT_SIGNATURE_ALGORITHM = 'rsa-pkcs1v15'
+
+def register_algorithm(algorithm):
+    """Make a SignatureAlgorithm available to keys, signing and verification"""
+    SIGNATURE_ALGORITHMS[algorithm.name] = algorithm
+    return algorithm
+
+for _algorithm in (RSAPKCS1v15(), RSAPSS(), ECDSAP256(), Ed25519()):
+    register_algorithm(_algorithm)
+
+def get_algorithm(name):
+    try:
+        return SIGNATURE_ALGORITHMS[name]
+    except KeyError:
+        raise ValueError(f"Unsupported signature algorithm: {name}")
+
+def algorithm_for_key(key):
+    """Default algorithm for a loaded key (RSA keys default to PKCS#1 v1.5)"""
+    for algorithm in SIGNATURE_ALGORITHMS.values():
+        if algorithm.accepts(key):
+            return algorithm.name
+    raise ValueError(f"Unsupported key type: {type(key).__name__}")
+
+def _resolve_algorithm(key, algorithm):
+    name = algorithm or algorithm_for_key(key)
+    scheme = get_algorithm(name)
+    if not scheme.accepts(key):
+        raise ValueError(f"Key type does not match signature algorithm {name}")
+    return scheme
+
+def generate_key_pair(key_size=None, algorithm=DEFAULT_SIGNATURE_ALGORITHM):
+    scheme = get_algorithm(algorithm)
+    private_key = scheme.generate(key_size or scheme.key_sizes[0])
     public_key = private_key.public_key()
     private_pem = private_key.private_bytes(
         encoding=serialization.Encoding.PEM,
@@ -49,77 +495,452 @@ def save_keys(private_key, public_key, private_path, public_path):
         f.write(public_key)
 
 
-def load_public_key(key_path):
-    if key_path in _key_cache:
-        key = _key_cache[key_path]
-        if isinstance(key, RSAPublicKey):
-            return key
-        # If cached key is not public, reload it (or raise error, but reloading is safer if path content changed, though here it's likely wrong usage)
-        # However, if the path IS a private key, we should fall through to the file check which will raise ValueError
-        
-    with open(key_path, 'rb') as f:
-        pem_data = f.read()
+def load_public_key_data(pem_data, source="Key data"):
+    """Parse a public key of any registered algorithm from PEM bytes, reusing cached parses"""
+    fingerprint = key_fingerprint(pem_data)
+    key = _key_cache.get('public', fingerprint)
+    if key is not None:
+        return key
 
     # Strictly check PEM type
     if b"-----BEGIN PUBLIC KEY-----" not in pem_data:
-        raise ValueError(f"{key_path} does not contain a valid PUBLIC key")
+        raise ValueError(f"{source} does not contain a valid PUBLIC key")
+
+    key = serialization.load_pem_public_key(pem_data, backend=backends.default_backend())
+    if not any(isinstance(key, a.public_key_type) and a.accepts(key) for a in SIGNATURE_ALGORITHMS.values()):
+        raise ValueError("Loaded key is not a supported public key.")
+    _key_cache.put('public', fingerprint, key)
+    return key
+
+def load_private_key_data(pem_data):
+    """Parse an unencrypted private key of any registered algorithm from PEM bytes"""
+    fingerprint = key_fingerprint(pem_data)
+    key = _key_cache.get('private', fingerprint)
+    if key is not None:
+        return key
 
-    key = serialization.load_pem_public_key(pem_data, backend=default_backend())
-    if not isinstance(key, RSAPublicKey):
-        raise ValueError("Loaded key is not a valid RSA public key.")
-    
-    _key_cache[key_path] = key
+    key = serialization.load_pem_private_key(pem_data, password=None, backend=backends.default_backend())
+    if not any(isinstance(key, a.private_key_type) and a.accepts(key) for a in SIGNATURE_ALGORITHMS.values()):
+        raise ValueError("Loaded key is not a supported private key.")
+    _key_cache.put('private', fingerprint, key)
     return key
 
+def load_public_key(key_path):
+    with open(key_path, 'rb') as f:
+        return load_public_key_data(f.read(), source=key_path)
+
 def load_private_key(key_path):
-    if key_path in _key_cache:
-        key = _key_cache[key_path]
-        if isinstance(key, RSAPrivateKey):
-            return key
-            
     with open(key_path, 'rb') as f:
-        key = serialization.load_pem_private_key(f.read(), password=None, backend=default_backend())
-        if not isinstance(key, RSAPrivateKey):
-            raise ValueError("Loaded key is not a valid RSA private key.")
-        _key_cache[key_path] = key
-        return key
+        return load_private_key_data(f.read())
 
-def sign_file(file_path, private_key_path):
+def sign_file(file_path, private_key_path, algorithm=None, digest_algorithm=None):
     private_key = load_private_key(private_key_path)
-    file_hash = hashlib.sha256()
-    with open(file_path, 'rb') as f:
-        for chunk in iter(lambda: f.read(4096), b''):
-            file_hash.update(chunk)
-    return private_key.sign(
-        file_hash.digest(),
-        padding.PKCS1v15(),
-        utils.Prehashed(hashes.SHA256())
-    )
+    digest = digest_file(file_path, algorithm=digest_algorithm)
+    return make_signature(digest, private_key, algorithm, digest_algorithm)
 
 
 def verify_signature(file_path, signature, public_key_path):
     public_key = load_public_key(public_key_path)
-    file_hash = hashlib.sha256()
-    with open(file_path, 'rb') as f:
-        for chunk in iter(lambda: f.read(4096), b''):
-            file_hash.update(chunk)
+    if is_merkle(signature):
+        return verify_merkle(file_path, signature, public_key)['valid']
+    digest = digest_file(file_path, algorithm=signature_digest_algorithm(signature))
+    return verify_digest(digest, signature, public_key)
+
+
+def sign_digest(digest, private_key, algorithm=None):
+    """Sign a precomputed SHA-256 digest with a loaded private key.
+
+    Returns the raw signature bytes. ``algorithm`` defaults to the key's
+    default scheme (see ``algorithm_for_key``).
+    """
+    return _resolve_algorithm(private_key, algorithm).sign(private_key, digest)
+
+
+def _signed_payload(digest, digest_algorithm):
+    """The 32-byte value the signature algorithm actually signs for a document digest.
+
+    SHA-256 digests are signed as they are, as they always have been. Any
+    other digest is bound to its algorithm name and condensed with SHA-256,
+    so every signature scheme keeps signing a SHA-256-sized value.
+    """
+    digest_algorithm = digest_algorithm or DEFAULT_DIGEST_ALGORITHM
+    if digest_algorithm == DEFAULT_DIGEST_ALGORITHM:
+        return digest
+    if digest_algorithm not in DIGEST_ALGORITHMS:
+        raise ValueError(f"Unsupported digest algorithm: {digest_algorithm}")
+    return hashlib.sha256(b'DSV-DIGEST-v1\x00' + digest_algorithm.encode('ascii') + b'\x00' + digest).digest()
+
+
+def make_signature(digest, private_key, algorithm=None, digest_algorithm=None):
+    """Sign a digest and return it in its storable form.
+
+    ``digest`` must have been computed with ``digest_algorithm`` (SHA-256 by
+    default). RSA PKCS#1 v1.5 signatures over SHA-256 stay raw bytes for
+    compatibility; anything else is wrapped in a SignatureEnvelope recording
+    both algorithms.
+    """
+    scheme = _resolve_algorithm(private_key, algorithm)
+    digest_algorithm = digest_algorithm or DEFAULT_DIGEST_ALGORITHM
+    signature = scheme.sign(private_key, _signed_payload(digest, digest_algorithm))
+    if scheme.name == DEFAULT_SIGNATURE_ALGORITHM and digest_algorithm == DEFAULT_DIGEST_ALGORITHM:
+        return signature
+    return SignatureEnvelope(signature, 'flat', algorithm=scheme.name, digest_algorithm=digest_algorithm)
+
+
+def signature_digest_algorithm(signature):
+    """Digest algorithm the document must be hashed with to verify ``signature``"""
+    if isinstance(signature, SignatureEnvelope):
+        return signature.digest_algorithm
+    return DEFAULT_DIGEST_ALGORITHM
+
+
+def verify_digest(digest, signature, public_key):
+    """Check a signature over a precomputed document digest with a loaded public key.
+
+    ``signature`` is raw bytes (a SHA-256 digest, verified with the key's
+    default algorithm) or a flat SignatureEnvelope naming its algorithms;
+    hash the document with ``signature_digest_algorithm(signature)``.
+
+    When a verification cache is installed (see ``set_verification_cache``)
+    a triple that was verified before is answered from it.
+    """
+    cache_key = None
+    if _verification_cache is not None:
+        cache_key = verification_key(digest, signature, public_key)
+        valid = _verification_cache.lookup(cache_key)
+        if valid is not None:
+            return valid
+
+    algorithm, digest_algorithm = None, DEFAULT_DIGEST_ALGORITHM
+    if isinstance(signature, SignatureEnvelope):
+        if signature.format != 'flat':
+            raise ValueError("Merkle signatures must be verified against the document")
+        algorithm, digest_algorithm = signature.algorithm, signature.digest_algorithm
+        signature = signature.signature
+    scheme = _resolve_algorithm(public_key, algorithm)
+    try:
+        scheme.verify(public_key, signature, _signed_payload(digest, digest_algorithm))
+        valid = True
+    except exceptions.InvalidSignature:
+        valid = False
+    if cache_key is not None:
+        _verification_cache.store(cache_key, valid)
+    return valid
+
+
+def public_key_fingerprint(public_key):
+    """SHA-256 fingerprint of a loaded public key's DER SubjectPublicKeyInfo"""
+    entry = _public_fingerprints.get('public', id(public_key))
+    if entry is not None and entry[0] is public_key:
+        return entry[1]
+    spki = public_key.public_bytes(serialization.Encoding.DER, serialization.PublicFormat.SubjectPublicKeyInfo)
+    fingerprint = key_fingerprint(spki)
+    _public_fingerprints.put('public', id(public_key), (public_key, fingerprint))
+    return fingerprint
+
+
+def verification_key(digest, signature, public_key):
+    """Cache key for a verification: document digest, signature hash and key fingerprint"""
+    return ':'.join([digest.hex(), hashlib.sha256(signature_bytes(signature)).hexdigest(),
+                     public_key_fingerprint(public_key)])
+
+
+def _prepare_batch(items):
+    """Resolve keys and signatures for a batch.
+
+    Returns ``(results, pending)`` where ``results`` holds one result dict per
+    item (errors already filled in) and ``pending`` lists
+    ``(index, document, signature, public_key)`` tuples still to be verified.
+    """
+    keys = {}
+    results = []
+    pending = []
+    for index, item in enumerate(items):
+        result = {'document': item.get('document'), 'valid': False, 'error': None}
+        results.append(result)
+        try:
+            missing = [f for f in ('document', 'signature', 'public_key') if item.get(f) is None]
+            if missing:
+                raise KeyError(', '.join(missing))
+
+            key_path = item['public_key']
+            if key_path not in keys:
+                try:
+                    keys[key_path] = load_public_key(key_path)
+                except (OSError, ValueError) as e:
+                    keys[key_path] = e
+            public_key = keys[key_path]
+            if isinstance(public_key, Exception):
+                raise public_key
+
+            signature = item['signature']
+            if isinstance(signature, bytes):
+                signature = parse_signature(signature)
+            elif not isinstance(signature, SignatureEnvelope):
+                signature = load_signature(signature)
+            pending.append((index, item['document'], signature, public_key))
+        except KeyError as e:
+            result['error'] = f"Malformed batch item, missing: {e.args[0]}"
+        except (OSError, ValueError) as e:
+            result['error'] = str(e)
+    return results, pending
+
+
+def verify_batch(items):
+    """Verify many (document, signature, public key) triples in one call.
+
+    Each item is a mapping with ``document``, ``signature`` and ``public_key``
+    entries. ``document`` and ``public_key`` are file paths; ``signature`` is
+    either raw signature bytes or a path to a signature file. Every distinct
+    public key path is loaded once for the whole batch.
+
+    Returns a list of ``{'document', 'valid', 'error'}`` dicts in input order.
+    A failure on one item is reported in its ``error`` field and does not
+    abort the rest of the batch. See ``parallel.verify_files`` for the
+    multi-core variant.
+    """
+    results, pending = _prepare_batch(items)
+    for index, document, signature, public_key in pending:
+        try:
+            if is_merkle(signature):
+                results[index]['valid'] = verify_merkle(document, signature, public_key)['valid']
+            else:
+                digest = digest_file(document, algorithm=signature_digest_algorithm(signature))
+                results[index]['valid'] = verify_digest(digest, signature, public_key)
+        except (OSError, ValueError) as e:
+            results[index]['error'] = str(e)
+    return results
+
+
+SIGNATURE_MAGIC = b"DSVSIG1\n"
+MERKLE_CHUNK_SIZE = 1024 * 1024
+
+
+def _is_count(value):
+    # JSON booleans are ints in Python
+    return isinstance(value, int) and not isinstance(value, bool) and value >= 0
+
+
+class SignatureEnvelope:
+    """A signature together with the metadata needed to verify it.
+
+    Plain PKCS#1 v1.5 signatures over the SHA-256 of a whole file are stored
+    as raw bytes, as they always have been. Other formats are serialized as
+    ``SIGNATURE_MAGIC``, a 4-byte big-endian header length, a JSON header,
+    then any chunk hashes followed by the signature itself.
+
+    The ``flat`` format is a signature over the whole-file digest made with
+    a non-default signature ``algorithm`` or ``digest_algorithm``. The
+    ``merkle`` format signs the root of a
+    Merkle tree over fixed-size chunks and stores every chunk hash, so chunks
+    can be hashed in parallel and a modified region can be pinpointed without
+    rereading the file.
+    """
+    def __init__(self, signature, format='merkle', chunk_size=None, file_size=None, chunk_hashes=None,
+                 algorithm=DEFAULT_SIGNATURE_ALGORITHM, digest_algorithm=DEFAULT_DIGEST_ALGORITHM):
+        self.signature = signature
+        self.format = format
+        self.chunk_size = chunk_size
+        self.file_size = file_size
+        self.chunk_hashes = chunk_hashes or []
+        self.algorithm = algorithm
+        self.digest_algorithm = digest_algorithm
+
+    def header(self):
+        header = {'format': self.format, 'algorithm': self.algorithm, 'digest': self.digest_algorithm,
+                  'signature_length': len(self.signature)}
+        if self.format == 'merkle':
+            header.update(chunk_size=self.chunk_size, file_size=self.file_size,
+                          chunks=len(self.chunk_hashes))
+        return header
+
+    def to_bytes(self):
+        header = json.dumps(self.header(), sort_keys=True).encode('utf-8')
+        return b''.join([SIGNATURE_MAGIC, struct.pack('>I', len(header)), header]
+                        + self.chunk_hashes + [self.signature])
+
+    @classmethod
+    def from_bytes(cls, data):
+        try:
+            offset = len(SIGNATURE_MAGIC)
+            (header_length,) = struct.unpack_from('>I', data, offset)
+            offset += 4
+            header = json.loads(data[offset:offset + header_length])
+            offset += header_length
+            if not isinstance(header, dict):
+                raise ValueError("header is not an object")
+            signature_format = header.get('format')
+            algorithm = header.get('algorithm', DEFAULT_SIGNATURE_ALGORITHM)
+            digest_algorithm = header.get('digest', DEFAULT_DIGEST_ALGORITHM)
+            if not all(isinstance(value, str) for value in (signature_format, algorithm, digest_algorithm)):
+                raise ValueError("format, algorithm and digest must be strings")
+            chunks = header.get('chunks', 0)
+            signature_length = header['signature_length']
+            if not _is_count(chunks) or not _is_count(signature_length):
+                raise ValueError("bad chunk count or signature length")
+            # Check the declared sizes against the data before slicing anything
+            if chunks * 32 + signature_length != len(data) - offset:
+                raise ValueError("length mismatch")
+            chunk_hashes = [data[start:start + 32] for start in range(offset, offset + chunks * 32, 32)]
+            signature = data[offset + chunks * 32:]
+        except (struct.error, KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Malformed signature file: {str(e)}")
+        if signature_format not in ('flat', 'merkle'):
+            raise ValueError(f"Unsupported signature format: {signature_format}")
+        if signature_format == 'merkle' and not (_is_count(header.get('chunk_size')) and header['chunk_size'] > 0
+                                                 and _is_count(header.get('file_size'))):
+            raise ValueError("Malformed signature file: merkle chunk_size and file_size must be integers")
+        get_algorithm(algorithm)
+        if digest_algorithm not in DIGEST_ALGORITHMS:
+            raise ValueError(f"Unsupported digest algorithm: {digest_algorithm}")
+        if signature_format == 'merkle' and digest_algorithm != DEFAULT_DIGEST_ALGORITHM:
+            raise ValueError("Merkle signatures use SHA-256 chunk hashes")
+        return cls(signature, signature_format, header.get('chunk_size'), header.get('file_size'), chunk_hashes,
+                   algorithm, digest_algorithm)
+
+
+def parse_signature(data):
+    """Return raw signature bytes, or a SignatureEnvelope for enveloped formats"""
+    if data.startswith(SIGNATURE_MAGIC):
+        return SignatureEnvelope.from_bytes(data)
+    return data
+
+
+def signature_bytes(signature):
+    """Serialized form of a signature as returned by make_signature or sign_merkle"""
+    if isinstance(signature, SignatureEnvelope):
+        return signature.to_bytes()
+    return signature
+
+
+def is_merkle(signature):
+    return isinstance(signature, SignatureEnvelope) and signature.format == 'merkle'
+
+
+@contextmanager
+def _buffer_view(source):
+    """Yield a read-only memoryview over a file path, file object or BytesIO"""
+    if isinstance(source, io.BytesIO):
+        with source.getbuffer() as view:
+            yield view
+        return
+    f = open(source, 'rb') if isinstance(source, (str, bytes, os.PathLike)) else source
     try:
-        public_key.verify(
-            signature,
-            file_hash.digest(),
-            padding.PKCS1v15(),
-            utils.Prehashed(hashes.SHA256())
-        )
-        return True
-    except InvalidSignature:
-        return False
+        if os.fstat(f.fileno()).st_size == 0:
+            # Empty files cannot be mapped
+            yield memoryview(b'')
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            with memoryview(mapped) as view:
+                yield view
+    finally:
+        if f is not source:
+            f.close()
+
+
+def _merkle_leaf(chunk):
+    leaf = hashlib.sha256(b'\x00')
+    leaf.update(chunk)
+    return leaf.digest()
+
+
+def merkle_root(leaves):
+    """Root of a Merkle tree over leaf hashes; an odd node is promoted unchanged"""
+    level = list(leaves) or [_merkle_leaf(b'')]
+    while len(level) > 1:
+        paired = []
+        for i in range(0, len(level) - 1, 2):
+            paired.append(hashlib.sha256(b'\x01' + level[i] + level[i + 1]).digest())
+        if len(level) % 2:
+            paired.append(level[-1])
+        level = paired
+    return level[0]
+
+
+def merkle_leaves(source, chunk_size=MERKLE_CHUNK_SIZE, workers=None, indices=None):
+    """Hash a file (path, file object or BytesIO) in fixed-size chunks.
+
+    Chunks are hashed on ``workers`` threads (hashlib releases the GIL).
+    ``indices`` limits hashing to the given chunk numbers.
+    """
+    workers = workers or os.cpu_count() or 1
+    with _buffer_view(source) as view:
+        if indices is None:
+            indices = range(max(1, -(-len(view) // chunk_size)))
+        chunks = [view[i * chunk_size:(i + 1) * chunk_size] for i in indices]
+        try:
+            if workers > 1 and len(chunks) > 1:
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    leaves = list(executor.map(_merkle_leaf, chunks))
+            else:
+                leaves = [_merkle_leaf(chunk) for chunk in chunks]
+        finally:
+            # Views must be released before the underlying mapping is closed
+            for chunk in chunks:
+                chunk.release()
+        return leaves, len(view)
+
+
+def _merkle_payload(chunk_size, file_size, root):
+    # Bind the tree parameters into what is signed
+    return hashlib.sha256(b'DSV-MERKLE-v1' + struct.pack('>QQ', chunk_size, file_size) + root).digest()
+
+
+def sign_merkle(source, private_key, chunk_size=MERKLE_CHUNK_SIZE, workers=None, algorithm=None):
+    """Produce a merkle-format SignatureEnvelope for a file or stream with a loaded key"""
+    scheme = _resolve_algorithm(private_key, algorithm)
+    leaves, file_size = merkle_leaves(source, chunk_size, workers)
+    payload = _merkle_payload(chunk_size, file_size, merkle_root(leaves))
+    return SignatureEnvelope(scheme.sign(private_key, payload), 'merkle', chunk_size, file_size, leaves,
+                             scheme.name)
+
+
+def sign_file_merkle(file_path, private_key_path, chunk_size=MERKLE_CHUNK_SIZE, workers=None, algorithm=None):
+    return sign_merkle(file_path, load_private_key(private_key_path), chunk_size, workers, algorithm)
+
+
+def verify_merkle(source, envelope, public_key, indices=None, workers=None):
+    """Check a merkle-format signature and locate modified chunks.
+
+    The signature over the stored chunk list is checked first, without any
+    file I/O. If it holds, the file's chunks (or only ``indices``) are hashed
+    and compared. Returns a dict with ``valid``, ``signature_valid``,
+    ``size_matches`` and the sorted list of ``tampered_chunks``.
+    """
+    payload = _merkle_payload(envelope.chunk_size, envelope.file_size, merkle_root(envelope.chunk_hashes))
+    result = {'valid': False, 'signature_valid': False, 'size_matches': False, 'tampered_chunks': []}
+    flat = SignatureEnvelope(envelope.signature, 'flat', algorithm=envelope.algorithm)
+    if not verify_digest(payload, flat, public_key):
+        return result
+    result['signature_valid'] = True
+
+    if indices is not None:
+        indices = sorted(set(indices))
+        if any(i < 0 or i >= len(envelope.chunk_hashes) for i in indices):
+            raise ValueError("Chunk index out of range")
+    leaves, file_size = merkle_leaves(source, envelope.chunk_size, workers, indices)
+    result['size_matches'] = file_size == envelope.file_size
+    expected = envelope.chunk_hashes if indices is None else [envelope.chunk_hashes[i] for i in indices]
+    checked = range(len(leaves)) if indices is None else indices
+    tampered = [i for i, leaf, want in zip(checked, leaves, expected) if leaf != want]
+    if indices is None and len(leaves) != len(expected):
+        # Chunks added or removed at the end of the file
+        tampered.extend(range(min(len(leaves), len(expected)), max(len(leaves), len(expected))))
+    result['tampered_chunks'] = tampered
+    result['valid'] = result['size_matches'] and not tampered
+    return result
+
+
+def verify_file_merkle(file_path, envelope, public_key_path, indices=None, workers=None):
+    return verify_merkle(file_path, envelope, load_public_key(public_key_path), indices, workers)
 
 
 def save_signature(signature, signature_path):
     with open(signature_path, 'wb') as f:
-        f.write(signature)
+        f.write(signature_bytes(signature))
     os.chmod(signature_path, 0o644)
 
 def load_signature(signature_path):
+    """Load a signature file: raw bytes for plain signatures, else a SignatureEnvelope"""
     with open(signature_path, 'rb') as f:
-        return f.read()
+        return parse_signature(f.read())
@@ -0,0 +1,109 @@
+"""Persistent cache of file digests keyed by path and stat metadata.
+
+Entries are stored in SQLite and are only returned while the file's size,
+mtime, inode and ctime still match what was recorded when it was hashed, so
+a modified file is always rehashed. The ctime matters: mtime can be set back
+with ``touch -r`` after a same-size edit, but ctime cannot be set by callers.
+The least recently used entries are evicted once ``max_entries`` is exceeded.
+
+Install a cache with ``crypto_utils.set_digest_cache(DigestCache(path))`` to
+make ``digest_file`` (and everything built on it) consult it.
+"""
+import os
+import time
+import logging
+from sqlite_db import SQLiteDB, lookup_stats
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS digests (
+    path TEXT NOT NULL,
+    algorithm TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    ctime_ns INTEGER NOT NULL,
+    digest BLOB NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (path, algorithm)
+);
+CREATE INDEX IF NOT EXISTS digests_last_used ON digests (last_used);
+"""
+
+
+def _drop_unstamped(conn):
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(digests)")]
+    if columns and 'ctime_ns' not in columns:
+        # Written before ctime was recorded; entries are only a cache
+        conn.execute("DROP TABLE digests")
+
+
+def _stamp(stat_result):
+    return (stat_result.st_size, stat_result.st_mtime_ns, stat_result.st_ino, stat_result.st_ctime_ns)
+
+
+class DigestCache:
+    def __init__(self, db_path, max_entries=1_000_000):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+        self._db = SQLiteDB(db_path, _SCHEMA, prepare=_drop_unstamped,
+                            maintenance_interval=min(1000, max_entries // 10))
+
+    @staticmethod
+    def _key(file_path):
+        return os.path.realpath(file_path)
+
+    def lookup(self, file_path, stat_result, algorithm='sha256'):
+        """Return the cached digest for an unchanged file, or None"""
+        path = self._key(file_path)
+        with self._db.connect() as conn:
+            row = conn.execute(
+                "SELECT size, mtime_ns, inode, ctime_ns, digest FROM digests WHERE path = ? AND algorithm = ?",
+                (path, algorithm)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            if row[:4] != _stamp(stat_result):
+                conn.execute("DELETE FROM digests WHERE path = ? AND algorithm = ?", (path, algorithm))
+                self.invalidations += 1
+                self.misses += 1
+                return None
+            conn.execute("UPDATE digests SET last_used = ? WHERE path = ? AND algorithm = ?",
+                         (time.time(), path, algorithm))
+            self.hits += 1
+            return bytes(row[4])
+
+    def store(self, file_path, stat_result, digest, algorithm='sha256'):
+        """Record the digest of a file as of stat_result"""
+        path = self._key(file_path)
+        with self._db.connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO digests "
+                "(path, algorithm, size, mtime_ns, inode, ctime_ns, digest, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (path, algorithm) + _stamp(stat_result) + (digest, time.time())
+            )
+            if self._db.wrote():
+                self.evictions += self._db.trim(conn, 'digests', self.max_entries)
+
+    def clear(self):
+        with self._db.connect() as conn:
+            conn.execute("DELETE FROM digests")
+
+    def __len__(self):
+        with self._db.connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM digests").fetchone()[0]
+
+    def stats(self):
+        """Hit/miss counters for this process"""
+        return lookup_stats(self.hits, self.misses,
+                            invalidations=self.invalidations, evictions=self.evictions)
+
+    def close(self):
+        self._db.close()
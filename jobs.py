@@ -0,0 +1,165 @@
+"""Background job queue for long-running sign/verify work.
+
+Jobs are submitted to a bounded queue and executed by a small pool of
+worker threads (hashing and the RSA operations release the GIL). When the
+queue is full ``submit`` raises ``QueueFull`` so callers can push back on
+clients instead of piling up work. Finished jobs are kept for ``ttl``
+seconds so their status can be polled.
+"""
+import queue
+import threading
+import time
+import uuid
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFull(Exception):
+    """Raised when a job cannot be accepted because the queue is at capacity"""
+
+
+class Job:
+    def __init__(self, kind, fn, args):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = 'queued'
+        self.progress = 0.0
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self._fn = fn
+        self._args = args
+        self._changed = threading.Condition()
+
+    @property
+    def done(self):
+        return self.status in ('done', 'failed')
+
+    def set_progress(self, progress):
+        with self._changed:
+            self.progress = min(1.0, max(0.0, progress))
+            self._changed.notify_all()
+
+    def _set_status(self, status, result=None, error=None):
+        with self._changed:
+            self.status = status
+            if status == 'running':
+                self.started = time.time()
+            elif status in ('done', 'failed'):
+                self.finished = time.time()
+                self.result = result
+                self.error = error
+                if status == 'done':
+                    self.progress = 1.0
+            self._changed.notify_all()
+
+    def wait(self, timeout=None):
+        """Block until the job changes state or timeout expires; returns done"""
+        with self._changed:
+            if not self.done:
+                self._changed.wait(timeout)
+            return self.done
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'progress': round(self.progress, 4),
+            'result': self.result,
+            'error': self.error,
+            'created': self.created,
+            'started': self.started,
+            'finished': self.finished,
+        }
+
+
+class JobQueue:
+    def __init__(self, workers=2, max_queued=32, ttl=3600):
+        self.workers = workers
+        self.ttl = ttl
+        self.submitted = 0
+        self.rejected = 0
+        self._queue = queue.Queue(maxsize=max_queued)
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def _ensure_workers(self):
+        with self._lock:
+            self._threads = [t for t in self._threads if t.is_alive()]
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._work, name=f'job-worker-{len(self._threads)}',
+                                          daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, kind, fn, *args):
+        """Queue fn(job, *args) and return the Job; raises QueueFull when saturated"""
+        self._prune()
+        job = Job(kind, fn, args)
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            self.rejected += 1
+            raise QueueFull("Job queue is full, try again later")
+        with self._lock:
+            self._jobs[job.id] = job
+            self.submitted += 1
+        self._ensure_workers()
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            job._set_status('running')
+            try:
+                result = job._fn(job, *job._args)
+                job._set_status('done', result=result)
+            except Exception as e:
+                logger.error(f"Job {job.id} ({job.kind}) failed: {str(e)}")
+                job._set_status('failed', error=str(e))
+            finally:
+                job._fn = job._args = None
+                self._queue.task_done()
+
+    def _prune(self):
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items()
+                       if job.finished is not None and job.finished < cutoff]
+            for job_id in expired:
+                del self._jobs[job_id]
+
+    def stats(self):
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+        return {
+            'queued': self._queue.qsize(),
+            'capacity': self._queue.maxsize,
+            'running': statuses.count('running'),
+            'done': statuses.count('done'),
+            'failed': statuses.count('failed'),
+            'submitted': self.submitted,
+            'rejected': self.rejected,
+        }
+
+    def shutdown(self, wait=True):
+        """Stop the workers after the queued jobs have run"""
+        with self._lock:
+            threads = list(self._threads)
+            self._threads = []
+        for _ in threads:
+            self._queue.put(None)
+        if wait:
+            for thread in threads:
+                thread.join()
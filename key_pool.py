@@ -0,0 +1,121 @@
+"""Pool of pre-generated RSA key pairs.
+
+RSA key generation takes tens to hundreds of milliseconds (far more for
+4096-bit keys). A KeyPool keeps up to ``target`` key pairs ready, handing
+one out immediately on request and refilling in worker processes whenever
+the pool drops below ``low_watermark``. If the pool is empty the caller
+falls back to generating a key pair synchronously.
+
+The workers are started from a forkserver (spawned where that is not
+available), never forked from the caller: pools are started inside a
+threaded web server, and a forked child can deadlock on a lock another
+thread held at fork time.
+"""
+import multiprocessing
+import threading
+import time
+import logging
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from crypto_utils import generate_key_pair
+
+logger = logging.getLogger(__name__)
+
+
+def _worker_context():
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+class KeyPool:
+    def __init__(self, key_size=2048, target=8, low_watermark=None, workers=1):
+        self.key_size = key_size
+        self.target = target
+        self.low_watermark = target // 2 if low_watermark is None else low_watermark
+        self.workers = workers
+        self.hits = 0
+        self.misses = 0
+        self.generated = 0
+        self.generation_seconds = 0.0
+        self._keys = deque()
+        self._in_flight = 0
+        # Re-entrant: a future that is already done runs its callback in the submitting thread
+        self._lock = threading.RLock()
+        self._executor = None
+
+    def start(self):
+        """Start pre-generating key pairs up to the target depth"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=_worker_context())
+        self._refill()
+
+    def stop(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def get(self):
+        """Return a (private_pem, public_pem) pair, generating one if the pool is empty"""
+        if self._executor is None:
+            self.start()
+        with self._lock:
+            pair = self._keys.popleft() if self._keys else None
+            if pair is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        self._refill()
+        if pair is None:
+            pair = generate_key_pair(self.key_size)
+        return pair
+
+    def _refill(self):
+        with self._lock:
+            if self._executor is None:
+                return
+            available = len(self._keys) + self._in_flight
+            if available > self.low_watermark:
+                return
+            needed = self.target - available
+            for _ in range(needed):
+                future = self._executor.submit(_timed_generate, self.key_size)
+                future.add_done_callback(self._on_generated)
+                self._in_flight += 1
+
+    def _on_generated(self, future):
+        with self._lock:
+            self._in_flight -= 1
+            if future.cancelled():
+                return
+            error = future.exception()
+            if error is not None:
+                logger.error(f"Key pool generation failed: {str(error)}")
+                return
+            elapsed, pair = future.result()
+            self._keys.append(pair)
+            self.generated += 1
+            self.generation_seconds += elapsed
+
+    def stats(self):
+        with self._lock:
+            served = self.hits + self.misses
+            return {
+                'key_size': self.key_size,
+                'depth': len(self._keys),
+                'target': self.target,
+                'in_flight': self._in_flight,
+                'generated': self.generated,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / served if served else 0.0,
+                # Keys per second of worker time; multiply by workers for pool throughput
+                'refill_rate': self.generated / self.generation_seconds if self.generation_seconds else 0.0,
+            }
+
+
+def _timed_generate(key_size):
+    start = time.perf_counter()
+    pair = generate_key_pair(key_size)
+    return time.perf_counter() - start, pair
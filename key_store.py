@@ -0,0 +1,116 @@
+"""Server-side store for key pairs generated through the web UI.
+
+Generated keys are kept here under a short random handle, and only the
+handle goes into the (cookie-based) session. Without it, both PEM strings
+would travel in a several-kilobyte signed cookie on every request. Entries
+expire after ``ttl`` seconds, and at most ``max_size`` are held in memory.
+
+The parsed private key is kept next to its PEM the first time it is used,
+so signing with a stored key skips deserialization.
+
+With ``db_path`` the PEMs are also written to SQLite, so every worker
+process sharing the file can resolve a handle. The database holds private
+keys in the clear and is created readable by its owner only. Each process
+parses keys into its own memory.
+"""
+import secrets
+import time
+import logging
+from crypto_utils import LRUCache, load_private_key_data
+from sqlite_db import SQLiteDB, lookup_stats
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS key_pairs (
+    handle TEXT PRIMARY KEY,
+    private_pem TEXT NOT NULL,
+    public_pem TEXT NOT NULL,
+    expires REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS key_pairs_expires ON key_pairs (expires);
+"""
+
+
+class StoredKeyPair:
+    """PEM strings of a stored key pair; ``private_key`` is parsed on first use"""
+    def __init__(self, private_pem, public_pem, expires):
+        self.private_pem = private_pem
+        self.public_pem = public_pem
+        self.expires = expires
+        self._private_key = None
+
+    @property
+    def private_key(self):
+        if self._private_key is None:
+            self._private_key = load_private_key_data(self.private_pem.encode())
+        return self._private_key
+
+
+class KeyStore:
+    def __init__(self, max_size=10_000, ttl=1800, db_path=None):
+        self.ttl = ttl
+        self.db_path = db_path
+        self.hits = 0
+        self.misses = 0
+        self._memory = LRUCache(max_size, ttl)
+        self._db = None
+        if db_path is not None:
+            self._db = SQLiteDB(db_path, _SCHEMA, private=True, maintenance_interval=100)
+
+    def put(self, private_pem, public_pem):
+        """Store a key pair and return its opaque handle"""
+        handle = secrets.token_urlsafe(16)
+        expires = time.time() + self.ttl
+        self._memory.put('pair', handle, StoredKeyPair(private_pem, public_pem, expires))
+        if self._db is not None:
+            with self._db.connect() as conn:
+                conn.execute("INSERT INTO key_pairs (handle, private_pem, public_pem, expires) VALUES (?, ?, ?, ?)",
+                             (handle, private_pem, public_pem, expires))
+                if self._db.wrote():
+                    conn.execute("DELETE FROM key_pairs WHERE expires <= ?", (time.time(),))
+        return handle
+
+    def get(self, handle):
+        """Return the StoredKeyPair for a handle, or None if unknown or expired"""
+        if not handle:
+            return None
+        now = time.time()
+        pair = self._memory.get('pair', handle)
+        if pair is not None and pair.expires > now:
+            self.hits += 1
+            return pair
+        if self._db is None:
+            self.misses += 1
+            return None
+
+        with self._db.connect() as conn:
+            row = conn.execute(
+                "SELECT private_pem, public_pem, expires FROM key_pairs WHERE handle = ? AND expires > ?",
+                (handle, now)
+            ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        pair = StoredKeyPair(*row)
+        self._memory.put('pair', handle, pair)
+        return pair
+
+    def delete(self, handle):
+        if not handle:
+            return
+        self._memory.discard('pair', handle)
+        if self._db is not None:
+            with self._db.connect() as conn:
+                conn.execute("DELETE FROM key_pairs WHERE handle = ?", (handle,))
+
+    def __len__(self):
+        return len(self._memory)
+
+    def stats(self):
+        return lookup_stats(self.hits, self.misses, size=len(self._memory), evictions=self._memory.evictions)
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
@@ -0,0 +1,136 @@
+"""Signed manifests: one signature covering the digests of many files.
+
+A manifest is a canonical JSON document mapping each file's path (relative
+to a root directory) to its digest (SHA-256 unless the manifest's
+``digest`` field names another algorithm). Only the manifest is signed, so
+releasing N files costs one RSA private-key operation instead of N, and a
+single detached signature replaces N ``.sig`` files. Verification checks
+that one signature, then rehashes the files in parallel and compares.
+"""
+import io
+import json
+import os
+import posixpath
+import logging
+from crypto_utils import (make_signature, verify_digest, verify_merkle, is_merkle, digest_stream,
+                          signature_digest_algorithm, load_private_key, load_public_key, save_signature,
+                          load_signature, DIGEST_ALGORITHMS, DEFAULT_DIGEST_ALGORITHM)
+import parallel
+
+logger = logging.getLogger(__name__)
+MANIFEST_VERSION = 1
+
+
+def _relative_paths(root):
+    for dirpath, dirs, filenames in os.walk(root):
+        dirs.sort()
+        for filename in sorted(filenames):
+            path = os.path.join(dirpath, filename)
+            yield os.path.relpath(path, root).replace(os.sep, '/')
+
+
+def _safe_relpath(relpath):
+    normalized = posixpath.normpath(relpath)
+    if normalized.startswith(('/', '../')) or normalized in ('..', '.') or relpath != normalized:
+        raise ValueError(f"Unsafe path in manifest: {relpath}")
+    return relpath
+
+
+def build_manifest(root, relpaths=None, workers=None, exclude=(), algorithm=DEFAULT_DIGEST_ALGORITHM):
+    """Hash files under root (all of them, or just relpaths) into a manifest dict"""
+    if relpaths is None:
+        relpaths = [p for p in _relative_paths(root) if p not in exclude]
+    relpaths = sorted(_safe_relpath(p) for p in relpaths)
+    digests = parallel.digest_files([os.path.join(root, p) for p in relpaths], workers, algorithm)
+    files = {}
+    for relpath, (digest, error) in zip(relpaths, digests):
+        if error:
+            raise OSError(error)
+        files[relpath] = digest.hex()
+    return {'version': MANIFEST_VERSION, 'digest': algorithm, 'files': files}
+
+
+def manifest_bytes(manifest):
+    """Canonical serialization that is hashed and signed"""
+    return json.dumps(manifest, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+
+def write_manifest(manifest, manifest_path):
+    """Write the canonical bytes of manifest and return them"""
+    raw = manifest_bytes(manifest)
+    with open(manifest_path, 'wb') as f:
+        f.write(raw)
+    return raw
+
+
+def load_manifest(manifest_path):
+    with open(manifest_path, 'rb') as f:
+        return parse_manifest(f.read())
+
+
+def parse_manifest(raw):
+    """Validate and decode manifest bytes"""
+    manifest = json.loads(raw)
+    if not isinstance(manifest, dict) or manifest.get('version') != MANIFEST_VERSION:
+        raise ValueError("Unsupported manifest version")
+    if manifest.get('digest') not in DIGEST_ALGORITHMS or not isinstance(manifest.get('files'), dict):
+        raise ValueError("Malformed manifest")
+    for relpath in manifest['files']:
+        _safe_relpath(relpath)
+    return manifest
+
+
+def sign_manifest(root, manifest_path, private_key_path, signature_path=None, workers=None,
+                  algorithm=DEFAULT_DIGEST_ALGORITHM):
+    """Build, write and sign a manifest for root; returns the manifest dict"""
+    signature_path = signature_path or manifest_path + '.sig'
+    # Never list the manifest or its signature when they live inside root
+    exclude = set()
+    for path in (manifest_path, signature_path):
+        relpath = os.path.relpath(os.path.abspath(path), os.path.abspath(root))
+        if not relpath.startswith('..'):
+            exclude.add(relpath.replace(os.sep, '/'))
+    manifest = build_manifest(root, workers=workers, exclude=exclude, algorithm=algorithm)
+    # Sign the bytes that are written, not whatever is at manifest_path afterwards
+    raw = write_manifest(manifest, manifest_path)
+    signature = make_signature(digest_stream(io.BytesIO(raw)), load_private_key(private_key_path))
+    save_signature(signature, signature_path)
+    return manifest
+
+
+def verify_manifest(root, manifest_path, public_key_path, signature_path=None, workers=None):
+    """Check the manifest signature, then every listed file under root.
+
+    Returns a dict with ``signature_valid``, ``valid`` and per-file
+    ``results`` (``{'path', 'status'}`` with status ``ok``, ``mismatch`` or
+    ``missing``). Files are only checked if the signature is valid.
+    """
+    signature_path = signature_path or manifest_path + '.sig'
+    result = {'signature_valid': False, 'valid': False, 'results': []}
+    # Read once: the bytes that are verified are the bytes that are parsed
+    with open(manifest_path, 'rb') as f:
+        raw = f.read()
+    signature = load_signature(signature_path)
+    public_key = load_public_key(public_key_path)
+    if is_merkle(signature):
+        signature_valid = verify_merkle(io.BytesIO(raw), signature, public_key)['valid']
+    else:
+        digest = digest_stream(io.BytesIO(raw), algorithm=signature_digest_algorithm(signature))
+        signature_valid = verify_digest(digest, signature, public_key)
+    if not signature_valid:
+        return result
+    result['signature_valid'] = True
+
+    manifest = parse_manifest(raw)
+    relpaths = sorted(manifest['files'])
+    digests = parallel.digest_files([os.path.join(root, p) for p in relpaths], workers, manifest['digest'])
+    for relpath, (digest, error) in zip(relpaths, digests):
+        if error:
+            status = 'missing'
+        elif digest.hex() == manifest['files'][relpath]:
+            status = 'ok'
+        else:
+            status = 'mismatch'
+        result['results'].append({'path': relpath, 'status': status})
+    result['valid'] = all(r['status'] == 'ok' for r in result['results'])
+    return result
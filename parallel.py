@@ -0,0 +1,169 @@
+"""Parallel hashing, signing and verification for bulk jobs.
+
+Hashing runs in a process pool so large files are digested on every core.
+The RSA operations themselves run inside OpenSSL with the GIL released, so
+they are spread over a thread pool instead. Pools are created on first use
+and reused across calls; ``workers=1`` runs everything inline.
+
+``processes=False`` hashes on threads as well (hashlib releases the GIL for
+large buffers). Servers must use it: forking a process that already runs
+threads can deadlock the child on a lock held at fork time.
+"""
+import os
+import threading
+import logging
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from crypto_utils import (
+    digest_file,
+    load_private_key,
+    make_signature,
+    verify_digest,
+    verify_merkle,
+    is_merkle,
+    signature_digest_algorithm,
+    _prepare_batch
+)
+
+logger = logging.getLogger(__name__)
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def default_workers():
+    """Number of workers used when none is configured"""
+    return os.cpu_count() or 1
+
+
+def _get_pool(kind, workers):
+    with _pools_lock:
+        pool = _pools.get((kind, workers))
+        if pool is None:
+            executor = ProcessPoolExecutor if kind == 'process' else ThreadPoolExecutor
+            pool = executor(max_workers=workers)
+            _pools[(kind, workers)] = pool
+        return pool
+
+
+def shutdown():
+    """Shut down all cached worker pools"""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.shutdown(wait=True)
+        _pools.clear()
+
+
+def _safe_digest(file_path, algorithm=None):
+    try:
+        return digest_file(file_path, algorithm=algorithm), None
+    except OSError as e:
+        return None, str(e)
+
+
+def _map(kind, fn, iterable, workers):
+    items = list(iterable)
+    if workers <= 1 or len(items) <= 1:
+        return [fn(item) for item in items]
+    chunksize = max(1, len(items) // (workers * 4)) if kind == 'process' else 1
+    return list(_get_pool(kind, workers).map(fn, items, chunksize=chunksize))
+
+
+def digest_files(paths, workers=None, algorithm=None, processes=True):
+    """Return ``(digest, error)`` pairs for each path, hashed in a process (or thread) pool"""
+    workers = workers or default_workers()
+    kind = 'process' if processes else 'thread'
+    return _map(kind, partial(_safe_digest, algorithm=algorithm), paths, workers)
+
+
+def hash_files(paths, workers=None, algorithm=None, processes=True):
+    """Hex digests (SHA-256 by default) of many files, computed in parallel"""
+    hexdigests = []
+    for path, (digest, error) in zip(paths, digest_files(paths, workers, algorithm, processes)):
+        if error:
+            raise OSError(error)
+        hexdigests.append(digest.hex())
+    return hexdigests
+
+
+def sign_digests(digests, private_key, workers=None, algorithm=None, digest_algorithm=None):
+    """Sign precomputed digests with a loaded private key on a thread pool.
+
+    Returns signatures as ``crypto_utils.make_signature`` does: raw bytes for
+    RSA PKCS#1 v1.5 over SHA-256, a flat SignatureEnvelope otherwise.
+    """
+    workers = workers or default_workers()
+    sign = partial(make_signature, private_key=private_key, algorithm=algorithm, digest_algorithm=digest_algorithm)
+    return _map('thread', sign, digests, workers)
+
+
+def sign_files(paths, private_key_path, workers=None, algorithm=None, digest_algorithm=None, processes=True):
+    """Sign many files with one private key, returning signatures in input order"""
+    workers = workers or default_workers()
+    private_key = load_private_key(private_key_path)
+    digests = []
+    for digest, error in digest_files(paths, workers, digest_algorithm, processes):
+        if error:
+            raise OSError(error)
+        digests.append(digest)
+    return sign_digests(digests, private_key, workers, algorithm, digest_algorithm)
+
+
+def verify_files(items, workers=None, processes=True):
+    """Parallel equivalent of ``crypto_utils.verify_batch``"""
+    workers = workers or default_workers()
+    results, pending = _prepare_batch(items)
+
+    # Merkle signatures hash their own chunks in parallel; verify them one by one
+    merkle = [entry for entry in pending if is_merkle(entry[2])]
+    pending = [entry for entry in pending if not is_merkle(entry[2])]
+    for index, document, envelope, public_key in merkle:
+        try:
+            results[index]['valid'] = verify_merkle(document, envelope, public_key, workers=workers)['valid']
+        except (OSError, ValueError) as e:
+            results[index]['error'] = str(e)
+
+    # Hash each group of documents with the digest algorithm its signatures need
+    digests = [None] * len(pending)
+    groups = {}
+    for position, (_, _, signature, _) in enumerate(pending):
+        groups.setdefault(signature_digest_algorithm(signature), []).append(position)
+    for algorithm, positions in groups.items():
+        hashed = digest_files([pending[position][1] for position in positions], workers, algorithm, processes)
+        for position, outcome in zip(positions, hashed):
+            digests[position] = outcome
+
+    checks = []
+    for (index, _, signature, public_key), (digest, error) in zip(pending, digests):
+        if error:
+            results[index]['error'] = error
+        else:
+            checks.append((index, digest, signature, public_key))
+
+    verdicts = _map('thread', lambda check: _safe_verify(*check[1:]), checks, workers)
+    for (index, _, _, _), (valid, error) in zip(checks, verdicts):
+        results[index]['valid'] = valid
+        results[index]['error'] = error
+    return results
+
+
+def _safe_verify(digest, signature, public_key):
+    """verify_digest returning (valid, error) so a key/algorithm mismatch fails one item"""
+    try:
+        return verify_digest(digest, signature, public_key), None
+    except ValueError as e:
+        return False, str(e)
+
+
+def verify_directory(directory, public_key_path, workers=None, suffix='.sig', processes=True):
+    """Verify every ``<file><suffix>`` under directory against its document"""
+    items = []
+    for root, dirs, filenames in os.walk(directory):
+        dirs.sort()
+        for filename in sorted(filenames):
+            if filename.endswith(suffix):
+                continue
+            document = os.path.join(root, filename)
+            signature = document + suffix
+            if os.path.isfile(signature):
+                items.append({'document': document, 'signature': signature, 'public_key': public_key_path})
+    return verify_files(items, workers, processes)
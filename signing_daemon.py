@@ -0,0 +1,351 @@
+"""Local signing daemon that keeps parsed private keys resident.
+
+Parsing a PEM private key costs far more than signing a digest with it, so
+automated pipelines that sign many documents can run this daemon once and
+send it digests. It loads named keys at start-up and listens on a Unix
+domain socket (mode 0600).
+
+The protocol is pipelined. Each frame is a 4-byte big-endian length
+followed by a JSON object. Requests carry an ``id`` that is echoed in the
+response, and a client may send many requests before reading any replies:
+
+    {"id": 1, "op": "sign", "key": "release", "digest": "<hex>",
+     "algorithm": null, "digest_algorithm": null}
+    -> {"id": 1, "signature": "<base64 signature file bytes>"}
+    {"id": 2, "op": "keys"}  -> {"id": 2, "keys": {"release": "rsa-pkcs1v15"}}
+    errors                   -> {"id": n, "error": "..."}
+
+Requests from all connections go into one queue of at most ``max_pending``
+entries (a full queue stops reading from clients until it drains) and are
+signed in batches of up to ``max_batch``. Each batch is a single task on the worker pool,
+which amortizes the event-loop/thread handoff across many signatures.
+
+Usage: python signing_daemon.py --socket /run/dsv/sign.sock --key release=keys/private.pem
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import socket
+import stat
+import struct
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from crypto_utils import (load_private_key, make_signature, signature_bytes, parse_digest,
+                          algorithm_for_key)
+from parallel import default_workers
+
+logger = logging.getLogger(__name__)
+
+_LENGTH = struct.Struct('>I')
+MAX_FRAME = 1024 * 1024
+
+
+def encode_frame(message):
+    payload = json.dumps(message, separators=(',', ':')).encode()
+    return _LENGTH.pack(len(payload)) + payload
+
+
+class SigningDaemon:
+    def __init__(self, socket_path, keys, workers=None, max_batch=64, max_pending=1024):
+        self.socket_path = socket_path
+        # name -> parsed private key; parsed once, here
+        self.keys = {name: load_private_key(path) for name, path in keys.items()}
+        self.workers = workers or default_workers()
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self.requests = 0
+        self.batches = 0
+        self.errors = 0
+        self._executor = ThreadPoolExecutor(max_workers=self.workers)
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._queue = None
+        self._writers = set()
+        self._start_error = None
+        self._socket_id = None
+
+    def _sign(self, request):
+        key = self.keys.get(request.get('key'))
+        if key is None:
+            raise ValueError(f"Unknown key: {request.get('key')}")
+        digest_algorithm = request.get('digest_algorithm')
+        digest = parse_digest(request.get('digest', ''), digest_algorithm)
+        signature = make_signature(digest, key, request.get('algorithm'), digest_algorithm)
+        return base64.b64encode(signature_bytes(signature)).decode('ascii')
+
+    def _run_batch(self, requests):
+        responses = []
+        for request in requests:
+            try:
+                if request.get('op') == 'sign':
+                    responses.append({'id': request.get('id'), 'signature': self._sign(request)})
+                elif request.get('op') == 'keys':
+                    responses.append({'id': request.get('id'), 'keys': {
+                        name: algorithm_for_key(key) for name, key in self.keys.items()}})
+                else:
+                    raise ValueError(f"Unsupported operation: {request.get('op')}")
+            except ValueError as e:
+                self.errors += 1
+                responses.append({'id': request.get('id'), 'error': str(e)})
+            except Exception as e:
+                logger.error(f"Signing daemon error: {str(e)}")
+                self.errors += 1
+                responses.append({'id': request.get('id'), 'error': 'Internal error'})
+        return responses
+
+    async def _batcher(self):
+        slots = asyncio.Semaphore(self.workers)
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            await slots.acquire()
+            task = asyncio.ensure_future(self._dispatch(batch))
+            task.add_done_callback(lambda _: slots.release())
+
+    async def _dispatch(self, batch):
+        self.batches += 1
+        self.requests += len(batch)
+        responses = await self._loop.run_in_executor(self._executor, self._run_batch,
+                                                     [request for request, _ in batch])
+        writers = set()
+        for (_, writer), response in zip(batch, responses):
+            if not writer.is_closing():
+                writer.write(encode_frame(response))
+                writers.add(writer)
+        for writer in writers:
+            try:
+                await writer.drain()
+            except ConnectionError:
+                pass
+
+    async def _handle(self, reader, writer):
+        self._writers.add(writer)
+        try:
+            while True:
+                header = await reader.readexactly(_LENGTH.size)
+                (length,) = _LENGTH.unpack(header)
+                if length > MAX_FRAME:
+                    writer.write(encode_frame({'id': None, 'error': 'Frame too large'}))
+                    break
+                try:
+                    request = json.loads(await reader.readexactly(length))
+                    if not isinstance(request, dict):
+                        raise ValueError("Request must be a JSON object")
+                except ValueError as e:
+                    writer.write(encode_frame({'id': None, 'error': f"Malformed request: {str(e)}"}))
+                    continue
+                await self._queue.put((request, writer))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    def _remove_stale_socket(self):
+        try:
+            mode = os.lstat(self.socket_path).st_mode
+        except FileNotFoundError:
+            return
+        if not stat.S_ISSOCK(mode):
+            raise ValueError(f"{self.socket_path} exists and is not a socket")
+        # Only a socket nobody listens on is stale; never take over a running daemon's path
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.socket_path)
+        except ConnectionRefusedError:
+            os.unlink(self.socket_path)
+            return
+        except OSError as e:
+            raise ValueError(f"{self.socket_path} could not be checked: {str(e)}")
+        finally:
+            probe.close()
+        raise ValueError(f"{self.socket_path} is in use by another process")
+
+    def _remove_own_socket(self):
+        """Unlink the socket path only if it is still the socket this daemon bound"""
+        try:
+            st = os.lstat(self.socket_path)
+        except FileNotFoundError:
+            return
+        if (st.st_dev, st.st_ino) == self._socket_id:
+            os.unlink(self.socket_path)
+
+    async def _serve(self, ready):
+        try:
+            self._queue = asyncio.Queue(maxsize=self.max_pending)
+            self._remove_stale_socket()
+            # Created 0600 from the start; chmod after bind would leave a window
+            umask = os.umask(0o177)
+            try:
+                self._server = await asyncio.start_unix_server(self._handle, path=self.socket_path)
+                st = os.stat(self.socket_path)
+                self._socket_id = (st.st_dev, st.st_ino)
+            finally:
+                os.umask(umask)
+        except Exception as e:
+            self._start_error = e
+            ready.set()
+            return
+        batcher = asyncio.ensure_future(self._batcher())
+        ready.set()
+        try:
+            async with self._server:
+                await self._server.serve_forever()
+        except asyncio.CancelledError:
+            pass
+        finally:
+            batcher.cancel()
+
+    def serve_forever(self):
+        """Run the daemon in the calling thread until interrupted"""
+        self._loop = asyncio.new_event_loop()
+        try:
+            self._loop.run_until_complete(self._serve(threading.Event()))
+        finally:
+            self._loop.close()
+            self._executor.shutdown()
+            self._remove_own_socket()
+        if self._start_error is not None:
+            raise self._start_error
+
+    def start(self):
+        """Serve from a background thread; returns once the socket is listening"""
+        ready = threading.Event()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_until_complete, args=(self._serve(ready),),
+                                        name='signing-daemon', daemon=True)
+        self._thread.start()
+        ready.wait()
+        if self._start_error is not None:
+            self._thread.join()
+            self._thread = None
+            self._loop.close()
+            self._executor.shutdown()
+            raise self._start_error
+
+    def _shutdown(self):
+        self._server.close()
+        for writer in list(self._writers):
+            writer.close()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._loop.call_soon_threadsafe(self._shutdown)
+        self._thread.join()
+        self._thread = None
+        self._loop.close()
+        self._executor.shutdown()
+        self._remove_own_socket()
+
+    def stats(self):
+        return {'keys': len(self.keys), 'requests': self.requests, 'batches': self.batches,
+                'errors': self.errors,
+                'mean_batch': self.requests / self.batches if self.batches else 0.0}
+
+
+class SigningClient:
+    """Blocking client for SigningDaemon. One connection; use one client per thread."""
+    def __init__(self, socket_path, timeout=30):
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.settimeout(timeout)
+        self._sock.connect(socket_path)
+        self._reader = self._sock.makefile('rb')
+        self._next_id = 0
+
+    def _send(self, message):
+        self._next_id += 1
+        message['id'] = self._next_id
+        self._sock.sendall(encode_frame(message))
+        return self._next_id
+
+    def _receive(self):
+        header = self._reader.read(_LENGTH.size)
+        if len(header) < _LENGTH.size:
+            raise ConnectionError("Signing daemon closed the connection")
+        (length,) = _LENGTH.unpack(header)
+        return json.loads(self._reader.read(length))
+
+    def _call(self, messages, window):
+        """Pipeline messages with at most ``window`` in flight; returns responses in order"""
+        results = {}
+        order = []
+        pending = 0
+        for message in messages:
+            if pending >= window:
+                response = self._receive()
+                results[response['id']] = response
+                pending -= 1
+            order.append(self._send(message))
+            pending += 1
+        while pending:
+            response = self._receive()
+            results[response['id']] = response
+            pending -= 1
+        responses = [results[request_id] for request_id in order]
+        for response in responses:
+            if 'error' in response:
+                raise ValueError(f"Signing daemon: {response['error']}")
+        return responses
+
+    def sign(self, key, digest, algorithm=None, digest_algorithm=None):
+        """Sign one digest (bytes) with a named key; returns the signature file bytes"""
+        return self.sign_many(key, [digest], algorithm, digest_algorithm)[0]
+
+    def sign_many(self, key, digests, algorithm=None, digest_algorithm=None, window=256):
+        """Sign digests over one pipelined connection; returns signatures in the same order"""
+        messages = ({'op': 'sign', 'key': key, 'digest': digest.hex(), 'algorithm': algorithm,
+                     'digest_algorithm': digest_algorithm} for digest in digests)
+        return [base64.b64decode(r['signature']) for r in self._call(messages, window)]
+
+    def keys(self):
+        """Names of the resident keys and their default signature algorithms"""
+        return self._call([{'op': 'keys'}], 1)[0]['keys']
+
+    def close(self):
+        self._reader.close()
+        self._sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve signatures from resident private keys")
+    parser.add_argument('--socket', required=True, help="Unix socket path to listen on")
+    parser.add_argument('--key', action='append', required=True, metavar='NAME=PEM',
+                        help="named private key to load (repeatable)")
+    parser.add_argument('--workers', type=int, default=None, help="signing threads (default: CPU count)")
+    parser.add_argument('--max-batch', type=int, default=64, help="requests signed per worker task")
+    parser.add_argument('--max-pending', type=int, default=1024,
+                        help="queued requests before clients are no longer read")
+    args = parser.parse_args()
+
+    keys = {}
+    for spec in args.key:
+        name, sep, path = spec.partition('=')
+        if not sep or not name or not path:
+            parser.error(f"--key expects NAME=PEM, got {spec!r}")
+        keys[name] = path
+    logging.basicConfig(level=logging.INFO)
+    daemon = SigningDaemon(args.socket, keys, workers=args.workers, max_batch=args.max_batch,
+                           max_pending=args.max_pending)
+    logger.info(f"Serving {len(keys)} key(s) on {args.socket}")
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    except ValueError as e:
+        parser.error(str(e))
+
+
+if __name__ == '__main__':
+    main()
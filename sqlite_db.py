@@ -0,0 +1,88 @@
+"""SQLite plumbing shared by the persistent caches and stores.
+
+DigestCache, VerificationCache and KeyStore each keep their rows in a
+SQLite file that several worker processes may share. This module holds
+what they have in common: one connection per process (SQLite connections
+must not be shared across fork(), so each worker of a pool opens its own),
+WAL journaling for concurrent readers, periodic trimming of old rows and
+the hit/miss summary their ``stats()`` report.
+"""
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+
+class SQLiteDB:
+    """A lazily opened, lock-guarded connection to one database file.
+
+    ``schema`` is run on every new connection. ``prepare(conn)``, if given,
+    runs before it, e.g. to drop a table written by an older version.
+    ``private`` creates the file readable by its owner only before SQLite
+    opens it. ``wrote()`` returns True once every ``maintenance_interval``
+    writes, so callers can trim rows periodically instead of counting them
+    on every insert.
+    """
+    def __init__(self, path, schema, private=False, prepare=None, maintenance_interval=1000):
+        self.path = path
+        self.schema = schema
+        self.private = private
+        self.prepare = prepare
+        self.maintenance_interval = max(1, maintenance_interval)
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        self._pending_writes = 0
+
+    def _connection(self):
+        if self._conn is None or self._pid != os.getpid():
+            if self.private and self.path != ':memory:':
+                os.close(os.open(self.path, os.O_CREAT | os.O_WRONLY, 0o600))
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False,
+                                         isolation_level=None)
+            if self.path != ':memory:':
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            if self.prepare is not None:
+                self.prepare(self._conn)
+            self._conn.executescript(self.schema)
+            self._pid = os.getpid()
+        return self._conn
+
+    @contextmanager
+    def connect(self):
+        """This process's connection, used under the database lock"""
+        with self._lock:
+            yield self._connection()
+
+    def wrote(self):
+        """Count one write; True when periodic maintenance is due. Call under connect()"""
+        self._pending_writes += 1
+        if self._pending_writes < self.maintenance_interval:
+            return False
+        self._pending_writes = 0
+        return True
+
+    @staticmethod
+    def trim(conn, table, max_entries):
+        """Delete the least recently used rows beyond max_entries; returns how many"""
+        excess = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] - max_entries
+        if excess <= 0:
+            return 0
+        conn.execute(f"DELETE FROM {table} WHERE rowid IN "
+                     f"(SELECT rowid FROM {table} ORDER BY last_used LIMIT ?)", (excess,))
+        return excess
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+
+def lookup_stats(hits, misses, **extra):
+    """The hits/misses/hit_rate summary shared by the caches' stats()"""
+    lookups = hits + misses
+    stats = dict(extra)
+    stats.update(hits=hits, misses=misses, hit_rate=hits / lookups if lookups else 0.0)
+    return stats
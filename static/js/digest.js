@@ -0,0 +1,28 @@
+// In-browser document hashing, so only the 32-byte digest is sent to the server.
+//
+// WebCrypto is native and fast but can only hash a whole buffer at once, so
+// files up to WEBCRYPTO_MAX_SIZE are read in one go. Larger files, and pages
+// served without a secure context (no crypto.subtle), are streamed slice by
+// slice through CryptoJS's incremental SHA-256 to keep memory bounded.
+const DIGEST_SLICE_SIZE = 8 * 1024 * 1024;
+const WEBCRYPTO_MAX_SIZE = 256 * 1024 * 1024;
+
+function bytesToHex(bytes) {
+    return Array.from(bytes, (b) => b.toString(16).padStart(2, "0")).join("");
+}
+
+async function digestFile(file, onProgress) {
+    if (globalThis.crypto && crypto.subtle && file.size <= WEBCRYPTO_MAX_SIZE) {
+        const digest = await crypto.subtle.digest("SHA-256", await file.arrayBuffer());
+        if (onProgress) onProgress(1);
+        return bytesToHex(new Uint8Array(digest));
+    }
+
+    const sha256 = CryptoJS.algo.SHA256.create();
+    for (let offset = 0; offset < file.size; offset += DIGEST_SLICE_SIZE) {
+        const slice = await file.slice(offset, offset + DIGEST_SLICE_SIZE).arrayBuffer();
+        sha256.update(CryptoJS.lib.WordArray.create(slice));
+        if (onProgress) onProgress(Math.min(1, (offset + DIGEST_SLICE_SIZE) / file.size));
+    }
+    return sha256.finalize().toString(CryptoJS.enc.Hex);
+}
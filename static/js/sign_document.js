@@ -33,23 +33,26 @@ document.addEventListener("DOMContentLoaded", () => {
         signBtn.innerHTML = "Signing...";
         
         try {
-            // Read private key
-            const privateKey = await readFileAsText(privateKeyFile);
-            
-            // Read document
-            const documentData = await readFileAsArrayBuffer(documentFile);
-            
-            // Hash the document (simplified example)
-            const documentHash = CryptoJS.SHA256(CryptoJS.lib.WordArray.create(documentData)).toString();
-            
-            // Sign the hash (using JSEncrypt)
-            const crypt = new JSEncrypt();
-            crypt.setPrivateKey(privateKey);
-            generatedSignature = crypt.sign(documentHash, CryptoJS.SHA256, "sha256");
-            
-            if (!generatedSignature) {
-                throw new Error("Failed to generate signature");
+            // Hash the document locally; only the digest and the key are uploaded
+            signBtn.innerHTML = "Hashing...";
+            const digest = await digestFile(documentFile, (fraction) => {
+                signBtn.innerHTML = `Hashing... ${Math.round(fraction * 100)}%`;
+            });
+            signBtn.innerHTML = "Signing...";
+
+            const formData = new FormData();
+            formData.append("digest", digest);
+            formData.append("private_key", privateKeyFile);
+            const response = await fetch("/api/sign_digest", {
+                method: "POST",
+                body: formData
+            });
+            const result = await response.json();
+            if (!response.ok || result.error) {
+                throw new Error(result.error || `HTTP error! status: ${response.status}`);
             }
+            // Base64 of the signature file's bytes
+            generatedSignature = result.signature;
             
             // Display results
             signatureDisplay.textContent = generatedSignature;
@@ -64,7 +67,7 @@ document.addEventListener("DOMContentLoaded", () => {
             
         } catch (error) {
             console.error("Signing error:", error);
-            alert("Failed to sign document. Please try again.");
+            alert(`Failed to sign document: ${error.message}`);
         } finally {
             signBtn.disabled = false;
             signSpinner.classList.add("d-none");
@@ -82,7 +85,8 @@ document.addEventListener("DOMContentLoaded", () => {
     // Download signature
     downloadSignature.addEventListener("click", () => {
         const docName = document.getElementById("document").files[0]?.name || "document";
-        downloadFile(`${docName}.sig`, generatedSignature);
+        const bytes = Uint8Array.from(atob(generatedSignature), (c) => c.charCodeAt(0));
+        downloadFile(`${docName}.sig`, new Blob([bytes], { type: "application/octet-stream" }));
     });
 
     // Sign another document
@@ -93,32 +97,16 @@ document.addEventListener("DOMContentLoaded", () => {
     });
 
     // Helper functions
-    function readFileAsText(file) {
-        return new Promise((resolve, reject) => {
-            const reader = new FileReader();
-            reader.onload = () => resolve(reader.result);
-            reader.onerror = reject;
-            reader.readAsText(file);
-        });
-    }
-
-    function readFileAsArrayBuffer(file) {
-        return new Promise((resolve, reject) => {
-            const reader = new FileReader();
-            reader.onload = () => resolve(reader.result);
-            reader.onerror = reject;
-            reader.readAsArrayBuffer(file);
-        });
-    }
-
-    function downloadFile(filename, content) {
+    function downloadFile(filename, blob) {
+        const url = URL.createObjectURL(blob);
         const element = document.createElement("a");
-        element.setAttribute("href", "data:text/plain;charset=utf-8," + encodeURIComponent(content));
+        element.setAttribute("href", url);
         element.setAttribute("download", filename);
         element.style.display = "none";
         document.body.appendChild(element);
         element.click();
         document.body.removeChild(element);
+        URL.revokeObjectURL(url);
     }
 
     // Load signature from localStorage if available
@@ -51,27 +51,31 @@ document.addEventListener("DOMContentLoaded", () => {
         verifyBtn.innerHTML = "Verifying...";
         
         try {
+            // Hash the document locally; only the digest, signature and key are uploaded
+            const digest = await digestFile(documentFile, (fraction) => {
+                verifyBtn.innerHTML = `Hashing... ${Math.round(fraction * 100)}%`;
+            });
+            verifyBtn.innerHTML = "Verifying...";
+
             const formData = new FormData();
-            formData.append("document", documentFile);
+            formData.append("digest", digest);
             formData.append("signature", signatureFile);
             formData.append("public_key", publicKeyFile);
 
-            const response = await fetch("http://127.0.0.1:5500/verify_signature", {
+            const response = await fetch("/api/verify_digest", {
                 method: "POST",
                 body: formData
             });
-
-            if (!response.ok) {
-                throw new Error(`HTTP error! status: ${response.status}`);
-            }
-
             const result = await response.json();
 
-            if (result.error) {
-                showAlert(result.message, "danger");
+            if (!response.ok || result.error) {
+                showAlert(result.error || `HTTP error! status: ${response.status}`, "danger");
                 resetForm();
                 return;
             }
+            result.message = result.valid
+                ? "The signature matches this document and public key."
+                : "The signature does not match this document and public key.";
 
             // Display results
             verifyForm.style.display = "none";
@@ -83,16 +87,16 @@ document.addEventListener("DOMContentLoaded", () => {
             documentType.textContent = documentFile.type || "application/octet-stream";
 
             // Update verification status
-            const statusClass = result.is_valid ? "signature-valid" : "signature-invalid";
-            const statusIcon = result.is_valid ? "✓" : "✗";
+            const statusClass = result.valid ? "signature-valid" : "signature-invalid";
+            const statusIcon = result.valid ? "✓" : "✗";
             verificationStatus.className = statusClass;
-            verificationStatus.innerHTML = `${statusIcon} ${result.is_valid ? "Valid Signature" : "Invalid Signature"}`;
+            verificationStatus.innerHTML = `${statusIcon} ${result.valid ? "Valid Signature" : "Invalid Signature"}`;
             
             // Update verification details
             verificationDetails.textContent = result.message;
             
             // Update alert
-            showAlert(result.message, result.is_valid ? "success" : "danger");
+            showAlert(result.message, result.valid ? "success" : "danger");
             
         } catch (error) {
             console.error("Verification error:", error);
@@ -0,0 +1,86 @@
+import unittest
+import tempfile
+import os
+from crypto_utils import (generate_key_pair, save_keys, sign_file, verify_signature, save_signature, load_signature,
+                          sign_file_merkle, verify_file_merkle, verify_batch, SignatureEnvelope, SIGNATURE_ALGORITHMS)
+
+class TestSignatureAlgorithms(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.doc_path = os.path.join(self.temp_dir.name, "doc.txt")
+        with open(self.doc_path, 'w') as f:
+            f.write("Test file for signing.")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _keys(self, algorithm, name='key'):
+        key_size = 1024 if algorithm.startswith('rsa-') else None
+        private_pem, public_pem = generate_key_pair(key_size, algorithm)
+        priv_path = os.path.join(self.temp_dir.name, f"{name}_private.pem")
+        pub_path = os.path.join(self.temp_dir.name, f"{name}_public.pem")
+        save_keys(private_pem, public_pem, priv_path, pub_path)
+        return priv_path, pub_path
+
+    def test_round_trip_every_algorithm(self):
+        for algorithm in SIGNATURE_ALGORITHMS:
+            with self.subTest(algorithm=algorithm):
+                priv_path, pub_path = self._keys(algorithm, algorithm)
+                sig_path = self.doc_path + f".{algorithm}.sig"
+                save_signature(sign_file(self.doc_path, priv_path, algorithm), sig_path)
+                self.assertTrue(verify_signature(self.doc_path, load_signature(sig_path), pub_path))
+                with open(self.doc_path, 'a') as f:
+                    f.write("x")
+                self.assertFalse(verify_signature(self.doc_path, load_signature(sig_path), pub_path))
+
+    def test_default_rsa_signature_stays_raw(self):
+        priv_path, _ = self._keys('rsa-pkcs1v15')
+        self.assertIsInstance(sign_file(self.doc_path, priv_path), bytes)
+
+    def test_non_default_signature_records_algorithm(self):
+        priv_path, _ = self._keys('rsa-pss')
+        envelope = SignatureEnvelope.from_bytes(sign_file(self.doc_path, priv_path, 'rsa-pss').to_bytes())
+        self.assertEqual((envelope.format, envelope.algorithm), ('flat', 'rsa-pss'))
+
+    def test_pss_signature_fails_as_pkcs1v15(self):
+        priv_path, pub_path = self._keys('rsa-pss')
+        envelope = sign_file(self.doc_path, priv_path, 'rsa-pss')
+        self.assertFalse(verify_signature(self.doc_path, envelope.signature, pub_path))
+
+    def test_algorithm_key_mismatch(self):
+        priv_path, _ = self._keys('ed25519')
+        with self.assertRaises(ValueError):
+            sign_file(self.doc_path, priv_path, 'ecdsa-p256')
+
+    def test_unknown_algorithm(self):
+        with self.assertRaises(ValueError):
+            generate_key_pair(algorithm='dsa')
+
+    def test_digest_algorithm_recorded_in_signature(self):
+        priv_path, pub_path = self._keys('rsa-pkcs1v15')
+        sig_path = self.doc_path + ".sig"
+        save_signature(sign_file(self.doc_path, priv_path, digest_algorithm='blake2b'), sig_path)
+        signature = load_signature(sig_path)
+        self.assertEqual((signature.algorithm, signature.digest_algorithm), ('rsa-pkcs1v15', 'blake2b'))
+        self.assertTrue(verify_signature(self.doc_path, signature, pub_path))
+        results = verify_batch([{'document': self.doc_path, 'signature': sig_path, 'public_key': pub_path}])
+        self.assertTrue(results[0]['valid'])
+        # The digest algorithm is bound into what was signed
+        signature.digest_algorithm = 'sha512'
+        self.assertFalse(verify_signature(self.doc_path, signature, pub_path))
+
+    def test_merkle_with_ed25519(self):
+        priv_path, pub_path = self._keys('ed25519')
+        envelope = sign_file_merkle(self.doc_path, priv_path)
+        self.assertEqual(envelope.algorithm, 'ed25519')
+        self.assertTrue(verify_file_merkle(self.doc_path, envelope, pub_path)['valid'])
+
+    def test_batch_reports_wrong_key_type(self):
+        priv_path, _ = self._keys('ed25519', 'ed')
+        _, other_pub = self._keys('ecdsa-p256', 'ec')
+        sig = sign_file(self.doc_path, priv_path)
+        results = verify_batch([{'document': self.doc_path, 'signature': sig, 'public_key': other_pub}])
+        self.assertFalse(results[0]['valid'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+import tempfile
+import hashlib
+import io
+import os
+import time
+import app as app_module
+from app import app
+from artifact_store import ArtifactStore
+from crypto_utils import generate_key_pair
+
+class TestArtifactStore(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.store = ArtifactStore(self.temp_dir.name, max_bytes=1000, max_age=60)
+
+    def tearDown(self):
+        self.store.stop()
+        self.temp_dir.cleanup()
+
+    def test_content_addressed_and_deduplicated(self):
+        artifact_id = self.store.put(b"signature bytes")
+        self.assertEqual(artifact_id, hashlib.sha256(b"signature bytes").hexdigest())
+        self.assertEqual(self.store.path(artifact_id),
+                         os.path.join(self.temp_dir.name, artifact_id[:2], artifact_id[2:4], artifact_id))
+        self.assertEqual(self.store.put(b"signature bytes"), artifact_id)
+        stats = self.store.stats()
+        self.assertEqual((stats['artifacts'], stats['stored'], stats['deduplicated']), (1, 1, 1))
+
+        self.assertIsNone(self.store.path('0' * 64))
+        self.assertIsNone(self.store.path('../' + artifact_id[3:]))
+        self.assertIsNone(self.store.path(None))
+
+    def test_gc_enforces_age_and_size(self):
+        old = self.store.put(b"o" * 100)
+        past = time.time() - 120
+        os.utime(self.store.path(old), (past, past))
+        blobs = [self.store.put(bytes([i]) * 400) for i in range(3)]
+        for offset, artifact_id in enumerate(blobs):
+            stamp = time.time() - 30 + offset
+            os.utime(self.store.path(artifact_id), (stamp, stamp))
+
+        # The expired blob goes first, then the oldest until under 1000 bytes
+        self.assertEqual(self.store.gc(), 2)
+        self.assertIsNone(self.store.path(old))
+        self.assertIsNone(self.store.path(blobs[0]))
+        self.assertIsNotNone(self.store.path(blobs[1]))
+        self.assertIsNotNone(self.store.path(blobs[2]))
+
+    def test_unlimited_size_still_expires_by_age(self):
+        store = ArtifactStore(self.temp_dir.name, max_bytes=None, max_age=60)
+        old = store.put(b"o" * 100)
+        past = time.time() - 120
+        os.utime(store.path(old), (past, past))
+        kept = [store.put(bytes([i]) * 4000) for i in range(3)]
+        self.assertEqual(store.gc(), 1)
+        self.assertIsNone(store.path(old))
+        self.assertTrue(all(store.path(artifact_id) for artifact_id in kept))
+
+class TestSignatureDownload(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.previous = app_module.signature_store
+        app_module.signature_store = ArtifactStore(self.temp_dir.name)
+        self.private_pem = generate_key_pair(1024)[0].encode()
+
+    def tearDown(self):
+        app_module.signature_store.stop()
+        app_module.signature_store = self.previous
+        self.temp_dir.cleanup()
+
+    def sign(self, client, document):
+        response = client.post('/sign_document', data={
+            'document': (io.BytesIO(document), 'report.txt'),
+            'private_key': (io.BytesIO(self.private_pem), 'private.pem'),
+        }, content_type='multipart/form-data')
+        self.assertTrue(response.headers['Location'].endswith('/signature_result'))
+
+    def test_same_filename_does_not_collide(self):
+        alice, bob = app.test_client(), app.test_client()
+        self.sign(alice, b"Alice's report")
+        self.sign(bob, b"Bob's report")
+        alice_sig = alice.get('/download_signature')
+        bob_sig = bob.get('/download_signature')
+        self.assertNotEqual(alice_sig.data, bob_sig.data)
+        self.assertIn('report.txt.sig', alice_sig.headers['Content-Disposition'])
+        alice_sig.close()
+        bob_sig.close()
+
+    def test_conditional_get(self):
+        client = app.test_client()
+        self.sign(client, b"Conditional download")
+        response = client.get('/download_signature')
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers['ETag']
+        self.assertEqual(etag.strip('"'), hashlib.sha256(response.data).hexdigest())
+        self.assertIn('no-cache', response.headers['Cache-Control'])
+        response.close()
+
+        response = client.get('/download_signature', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b"")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+import asyncio
+import json
+from asgi_app import WSGIBridge
+from app import app
+
+def call(bridge, method, path, body=b'', headers=()):
+    messages = [{'type': 'http.request', 'body': body[:10], 'more_body': True},
+                {'type': 'http.request', 'body': body[10:], 'more_body': False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        'type': 'http', 'method': method, 'path': path, 'query_string': b'',
+        'headers': [(k.encode(), v.encode()) for k, v in headers],
+        'server': ('testserver', 80), 'client': ('127.0.0.1', 1234),
+    }
+    asyncio.run(bridge(scope, receive, send))
+    call.sent = sent
+    return sent[0]['status'], b''.join(m.get('body', b'') for m in sent[1:])
+
+class TestASGIBridge(unittest.TestCase):
+    def setUp(self):
+        self.bridge = WSGIBridge(app, workers=2, max_body=1024)
+
+    def tearDown(self):
+        self.bridge.executor.shutdown()
+
+    def test_routes_are_served(self):
+        status, body = call(self.bridge, 'GET', '/')
+        self.assertEqual(status, 200)
+        self.assertIn(b'<html', body.lower())
+        status, _ = call(self.bridge, 'GET', '/api/jobs/missing')
+        self.assertEqual(status, 404)
+
+    def test_body_is_forwarded(self):
+        manifest = json.dumps([{'document': 'a.txt', 'signature': 'a.sig', 'public_key': 'k.pem'}])
+        body = f'manifest={manifest}'.encode()
+        status, body = call(self.bridge, 'POST', '/api/verify_batch', body,
+                            [('content-type', 'application/x-www-form-urlencoded')])
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body)['total'], 1)
+
+    def test_oversized_body_rejected(self):
+        status, _ = call(self.bridge, 'POST', '/api/verify', b'x' * 2048,
+                         [('content-length', '2048')])
+        self.assertEqual(status, 413)
+
+def echo_app(environ, start_response):
+    """Echoes the combined Cookie and Accept headers in separate body chunks"""
+    start_response('200 OK', [('Content-Type', 'text/plain')])
+    yield environ.get('HTTP_COOKIE', '').encode()
+    yield b'|'
+    yield environ.get('HTTP_ACCEPT', '').encode()
+
+class TestBridgeProtocol(unittest.TestCase):
+    def setUp(self):
+        self.bridge = WSGIBridge(echo_app, workers=1)
+
+    def tearDown(self):
+        self.bridge.executor.shutdown()
+
+    def test_repeated_headers_are_combined(self):
+        status, body = call(self.bridge, 'GET', '/', headers=[
+            ('cookie', 'a=1'), ('cookie', 'session=xyz'), ('accept', 'text/html'), ('accept', '*/*')])
+        self.assertEqual(status, 200)
+        self.assertEqual(body, b'a=1; session=xyz|text/html, */*')
+
+    def test_body_is_streamed_per_chunk(self):
+        call(self.bridge, 'GET', '/', headers=[('cookie', 'a=1')])
+        bodies = [m for m in call.sent if m['type'] == 'http.response.body']
+        self.assertEqual([m['body'] for m in bodies], [b'a=1', b'|', b''])
+        self.assertEqual([m.get('more_body', False) for m in bodies], [True, True, False])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+import unittest
+import tempfile
+import hashlib
+import os
+import app as app_module
+from app import app
+from challenge_catalog import ChallengeCatalog, NO_DESCRIPTION
+from crypto_utils import generate_key_pair, load_private_key_data, make_signature
+
+def make_signed_challenge(root, name, tamper=False):
+    private_pem, public_pem = generate_key_pair(1024)
+    document = b"Quarterly figures, final."
+    signature = make_signature(hashlib.sha256(document).digest(), load_private_key_data(private_pem.encode()))
+    path = os.path.join(root, name)
+    os.makedirs(path)
+    for filename, data in (('suspect.txt', document + (b"!" if tamper else b"")),
+                           ('suspect.txt.sig', signature), ('public.pem', public_pem.encode())):
+        with open(os.path.join(path, filename), 'wb') as f:
+            f.write(data)
+
+class TestChallengeCatalog(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = self.temp_dir.name
+        for i in range(3):
+            self.make_challenge(f"challenge_{i:02d}", {'evidence.txt': f"evidence {i}".encode()})
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def make_challenge(self, name, files, description="Find the forgery."):
+        path = os.path.join(self.root, name)
+        os.makedirs(path, exist_ok=True)
+        if description is not None:
+            with open(os.path.join(path, 'description.txt'), 'w') as f:
+                f.write(description)
+        for filename, data in files.items():
+            with open(os.path.join(path, filename), 'wb') as f:
+                f.write(data)
+
+    def test_index_holds_metadata_and_digests(self):
+        catalog = ChallengeCatalog(self.root)
+        entry = catalog.get('challenge_01')
+        self.assertEqual(entry['name'], 'Challenge 01')
+        self.assertEqual(entry['description'], "Find the forgery.")
+        self.assertEqual(entry['files'], [{'name': 'evidence.txt', 'size': 10,
+                                           'digest': hashlib.sha256(b"evidence 1").hexdigest()}])
+        self.assertIsNone(catalog.get('missing'))
+        self.assertIsNone(catalog.file_path('challenge_01', 'description.txt'))
+        self.assertIsNone(catalog.file_path('challenge_01', '../challenge_02/evidence.txt'))
+        self.assertEqual(catalog.file_path('challenge_01', 'evidence.txt'),
+                         os.path.join(self.root, 'challenge_01', 'evidence.txt'))
+
+    def test_pagination(self):
+        catalog = ChallengeCatalog(self.root)
+        challenges, total = catalog.page(1, per_page=2)
+        self.assertEqual(total, 3)
+        self.assertEqual([c['id'] for c in challenges], ['challenge_00', 'challenge_01'])
+        challenges, _ = catalog.page(2, per_page=2)
+        self.assertEqual([c['id'] for c in challenges], ['challenge_02'])
+
+    def test_served_from_memory_until_interval_elapses(self):
+        catalog = ChallengeCatalog(self.root, check_interval=3600)
+        self.make_challenge('challenge_03', {'new.txt': b"new"})
+        self.assertIsNone(catalog.get('challenge_03'))
+        self.assertEqual(catalog.scans, 1)
+
+    def test_rescan_only_rehashes_changed_files(self):
+        catalog = ChallengeCatalog(self.root, check_interval=0)
+        self.assertEqual(catalog.digests_computed, 3)
+        self.make_challenge('challenge_03', {'new.txt': b"new"}, description=None)
+        with open(os.path.join(self.root, 'challenge_00', 'evidence.txt'), 'ab') as f:
+            f.write(b" tampered")
+
+        self.assertEqual(catalog.get('challenge_03')['description'], NO_DESCRIPTION)
+        self.assertEqual(catalog.get('challenge_00')['files'][0]['digest'],
+                         hashlib.sha256(b"evidence 0 tampered").hexdigest())
+        self.assertEqual(catalog.digests_computed, 5)
+
+    def test_grading_uses_precomputed_verdicts(self):
+        make_signed_challenge(self.root, 'signed_ok')
+        make_signed_challenge(self.root, 'signed_bad', tamper=True)
+        catalog = ChallengeCatalog(self.root, check_interval=0)
+        self.assertEqual(catalog.get('signed_ok')['expected'], 'authentic')
+        self.assertEqual(catalog.get('signed_bad')['expected'], 'tampered')
+        self.assertIsNone(catalog.get('challenge_00')['expected'])
+        self.assertEqual(catalog.verifications, 2)
+
+        self.assertTrue(catalog.grade('signed_ok', 'Authentic'))
+        self.assertFalse(catalog.grade('signed_ok', 'tampered'))
+        self.assertTrue(catalog.grade('signed_bad', 'tampered'))
+        # Grading and rescans of unchanged challenges never re-verify
+        self.assertEqual(catalog.verifications, 2)
+        with self.assertRaises(ValueError):
+            catalog.grade('signed_ok', 'maybe')
+        with self.assertRaises(ValueError):
+            catalog.grade('challenge_00', 'authentic')
+        with self.assertRaises(KeyError):
+            catalog.grade('missing', 'authentic')
+
+class TestChallengeRoutes(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        for i in range(3):
+            path = os.path.join(self.temp_dir.name, f"challenge_{i:02d}")
+            os.makedirs(path)
+            with open(os.path.join(path, 'evidence.txt'), 'w') as f:
+                f.write(f"evidence {i}")
+        make_signed_challenge(self.temp_dir.name, 'signed_bad', tamper=True)
+        self.previous = app_module.challenge_catalog
+        app_module.challenge_catalog = ChallengeCatalog(self.temp_dir.name)
+        app.config['CHALLENGES_PER_PAGE'] = 2
+        self.client = app.test_client()
+
+    def tearDown(self):
+        app_module.challenge_catalog = self.previous
+        app.config['CHALLENGES_PER_PAGE'] = 20
+        self.temp_dir.cleanup()
+
+    def test_listing_is_paginated(self):
+        page = self.client.get('/forensic_challenges').get_data(as_text=True)
+        self.assertIn('Challenge 01', page)
+        self.assertNotIn('Challenge 02', page)
+        page = self.client.get('/forensic_challenges?page=2').get_data(as_text=True)
+        self.assertIn('Challenge 02', page)
+        self.assertEqual(self.client.get('/forensic_challenges?page=9').status_code, 302)
+
+    def test_detail_and_download(self):
+        page = self.client.get('/challenge/challenge_00').get_data(as_text=True)
+        self.assertIn(hashlib.sha256(b"evidence 0").hexdigest(), page)
+        response = self.client.get('/download_challenge_file/challenge_00/evidence.txt')
+        self.assertEqual(response.data, b"evidence 0")
+        response.close()
+        self.assertEqual(self.client.get('/download_challenge_file/challenge_00/other.txt').status_code, 302)
+
+    def test_answer_api(self):
+        response = self.client.post('/api/challenges/signed_bad/answer', json={'answer': 'tampered'})
+        self.assertEqual(response.get_json(), {'challenge': 'signed_bad', 'answer': 'tampered', 'correct': True})
+        response = self.client.post('/api/challenges/signed_bad/answer', data={'answer': 'authentic'})
+        self.assertFalse(response.get_json()['correct'])
+        self.assertEqual(self.client.post('/api/challenges/challenge_00/answer',
+                                          json={'answer': 'authentic'}).status_code, 400)
+        self.assertEqual(self.client.post('/api/challenges/missing/answer',
+                                          json={'answer': 'authentic'}).status_code, 404)
+        for body in (["authentic"], "authentic", 1, None):
+            response = self.client.post('/api/challenges/signed_bad/answer', json=body)
+            self.assertEqual(response.status_code, 400)
+
+    def test_answer_form(self):
+        self.assertIn('name="answer"', self.client.get('/challenge/signed_bad').get_data(as_text=True))
+        response = self.client.post('/challenge/signed_bad/answer', data={'answer': 'tampered'},
+                                    follow_redirects=True)
+        self.assertIn('Correct!', response.get_data(as_text=True))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+import tempfile
+import io
+import json
+import os
+from contextlib import redirect_stderr
+from cli import main
+
+def run(argv):
+    out = io.StringIO()
+    with redirect_stderr(io.StringIO()) as err:
+        code = main(argv, out=out)
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    return code, records, json.loads(err.getvalue().splitlines()[-1])['summary']
+
+class TestCLI(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.evidence = os.path.join(self.temp_dir.name, "evidence")
+        os.makedirs(os.path.join(self.evidence, "sub"))
+        for name in ("a.txt", "b.txt", os.path.join("sub", "c.txt")):
+            with open(os.path.join(self.evidence, name), 'w') as f:
+                f.write(f"contents of {name}")
+        self.keys = os.path.join(self.temp_dir.name, "keys")
+        run(['keygen', '--out-dir', self.keys])
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_sign_then_verify_directory(self):
+        code, records, summary = run(['sign', self.evidence, '--key', os.path.join(self.keys, 'private.pem')])
+        self.assertEqual(code, 0)
+        self.assertEqual(summary['files'], 3)
+        with open(os.path.join(self.evidence, "b.txt"), 'a') as f:
+            f.write("tampered")
+        code, records, summary = run(['verify', self.evidence, '--key', os.path.join(self.keys, 'public.pem'),
+                                      '--workers', '2'])
+        self.assertEqual(code, 1)
+        self.assertEqual([r['valid'] for r in records], [True, False, True])
+        self.assertEqual(summary['failures'], 1)
+
+    def test_resume_skips_completed_files(self):
+        state = os.path.join(self.temp_dir.name, "hash.state")
+        code, records, _ = run(['hash', self.evidence, '--resume', state])
+        self.assertEqual(len(records), 3)
+        with open(os.path.join(self.evidence, "d.txt"), 'w') as f:
+            f.write("new")
+        code, records, summary = run(['hash', self.evidence, '--resume', state])
+        self.assertEqual([os.path.basename(r['path']) for r in records], ["d.txt"])
+        self.assertEqual(summary['skipped'], 3)
+
+if __name__ == '__main__':
+    unittest.main()
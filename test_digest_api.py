@@ -0,0 +1,94 @@
+import unittest
+import base64
+import hashlib
+import io
+import json
+import struct
+from app import app
+from crypto_utils import generate_key_pair, parse_digest, sign_merkle, load_private_key_data, SIGNATURE_MAGIC
+
+DOCUMENT = b"Evidence hashed in the browser."
+
+class TestParseDigest(unittest.TestCase):
+    def test_length_follows_algorithm(self):
+        digest = hashlib.sha256(DOCUMENT).digest()
+        self.assertEqual(parse_digest(digest.hex().upper() + "\n"), digest)
+        self.assertEqual(len(parse_digest("ab" * 64, 'sha512')), 64)
+        for bad in ("ab" * 31, "zz" * 32, None):
+            with self.assertRaises(ValueError):
+                parse_digest(bad)
+        with self.assertRaises(ValueError):
+            parse_digest("ab" * 32, 'sha512')
+
+class TestDigestAPI(unittest.TestCase):
+    def setUp(self):
+        self.client = app.test_client()
+        self.private_pem, self.public_pem = (pem.encode() for pem in generate_key_pair(1024))
+        self.digest = hashlib.sha256(DOCUMENT).hexdigest()
+
+    def sign_digest(self, digest, **fields):
+        data = {'digest': digest, 'private_key': (io.BytesIO(self.private_pem), 'private.pem')}
+        data.update(fields)
+        return self.client.post('/api/sign_digest', data=data)
+
+    def verify_digest(self, digest, signature):
+        return self.client.post('/api/verify_digest', data={
+            'digest': digest,
+            'signature': (io.BytesIO(signature), 'doc.sig'),
+            'public_key': (io.BytesIO(self.public_pem), 'public.pem'),
+        })
+
+    def test_sign_and_verify_without_the_document(self):
+        response = self.sign_digest(self.digest)
+        self.assertEqual(response.status_code, 200)
+        signature = base64.b64decode(response.get_json()['signature'])
+
+        self.assertTrue(self.verify_digest(self.digest, signature).get_json()['valid'])
+        self.assertFalse(self.verify_digest(hashlib.sha256(b"other").hexdigest(), signature).get_json()['valid'])
+
+        # Interchangeable with signing and verifying the uploaded document
+        response = self.client.post('/api/verify', data={
+            'document': (io.BytesIO(DOCUMENT), 'doc.txt'),
+            'signature': (io.BytesIO(signature), 'doc.sig'),
+            'public_key': (io.BytesIO(self.public_pem), 'public.pem'),
+        })
+        self.assertTrue(response.get_json()['valid'])
+
+    def test_malformed_envelope_headers_are_rejected(self):
+        for header in ([], "x", {'format': 'flat', 'signature_length': 8, 'digest': [1]}):
+            raw = json.dumps(header).encode()
+            response = self.client.post('/api/verify', data={
+                'document': (io.BytesIO(DOCUMENT), 'doc.txt'),
+                'signature': (io.BytesIO(SIGNATURE_MAGIC + struct.pack('>I', len(raw)) + raw + b"\x00" * 8), 'doc.sig'),
+                'public_key': (io.BytesIO(self.public_pem), 'public.pem'),
+            })
+            self.assertEqual(response.status_code, 400, header)
+            self.assertIn("Malformed signature file", response.get_json()['error'])
+
+    def test_other_digest_algorithms(self):
+        digest = hashlib.sha512(DOCUMENT).hexdigest()
+        response = self.sign_digest(digest, digest_algorithm='sha512')
+        self.assertEqual(response.get_json()['digest_algorithm'], 'sha512')
+        signature = base64.b64decode(response.get_json()['signature'])
+        self.assertTrue(self.verify_digest(digest, signature).get_json()['valid'])
+        # The digest must match the algorithm the signature records
+        self.assertEqual(self.verify_digest(self.digest, signature).status_code, 400)
+
+    def test_rejects_bad_input(self):
+        self.assertEqual(self.sign_digest("abc").status_code, 400)
+        self.assertEqual(self.client.post('/api/sign_digest', data={'digest': self.digest}).status_code, 400)
+        envelope = sign_merkle(io.BytesIO(DOCUMENT), load_private_key_data(self.private_pem))
+        response = self.verify_digest(self.digest, envelope.to_bytes())
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Merkle', response.get_json()['error'])
+
+    def test_session_key_is_used_without_upload(self):
+        self.client.post('/generate_keys', data={'key_size': 2048})
+        response = self.client.post('/api/sign_digest', data={'digest': self.digest})
+        self.assertEqual(response.status_code, 200)
+        self.public_pem = self.client.get('/download_key/public').data
+        signature = base64.b64decode(response.get_json()['signature'])
+        self.assertTrue(self.verify_digest(self.digest, signature).get_json()['valid'])
+
+if __name__ == '__main__':
+    unittest.main()
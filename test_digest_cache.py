@@ -0,0 +1,80 @@
+import unittest
+import tempfile
+import os
+import sqlite3
+from crypto_utils import hash_file, hash_data, set_digest_cache
+from digest_cache import DigestCache
+
+class TestDigestCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = DigestCache(os.path.join(self.temp_dir.name, "digests.db"), max_entries=3)
+        set_digest_cache(self.cache)
+        self.doc_path = os.path.join(self.temp_dir.name, "doc.txt")
+        with open(self.doc_path, 'wb') as f:
+            f.write(b"Hello, World!")
+
+    def tearDown(self):
+        set_digest_cache(None)
+        self.cache.close()
+        self.temp_dir.cleanup()
+
+    def test_hit_after_first_hash(self):
+        expected = hash_data(b"Hello, World!")
+        self.assertEqual(hash_file(self.doc_path), expected)
+        self.assertEqual(hash_file(self.doc_path), expected)
+        self.assertEqual(self.cache.hits, 1)
+        self.assertEqual(self.cache.misses, 1)
+
+    def test_modified_file_is_rehashed(self):
+        hash_file(self.doc_path)
+        with open(self.doc_path, 'wb') as f:
+            f.write(b"Modified content")
+        self.assertEqual(hash_file(self.doc_path), hash_data(b"Modified content"))
+        self.assertEqual(self.cache.invalidations, 1)
+
+    def test_edit_with_restored_mtime_is_rehashed(self):
+        hash_file(self.doc_path)
+        before = os.stat(self.doc_path)
+        with open(self.doc_path, 'r+b') as f:
+            f.write(b"J")  # same size
+        os.utime(self.doc_path, ns=(before.st_atime_ns, before.st_mtime_ns))  # touch -r
+        self.assertEqual(os.stat(self.doc_path).st_mtime_ns, before.st_mtime_ns)
+        self.assertEqual(hash_file(self.doc_path), hash_data(b"Jello, World!"))
+        self.assertEqual(self.cache.invalidations, 1)
+
+    def test_cache_without_ctime_column_is_rebuilt(self):
+        db_path = os.path.join(self.temp_dir.name, "old.db")
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("CREATE TABLE digests (path TEXT NOT NULL, algorithm TEXT NOT NULL, size INTEGER NOT NULL, "
+                         "mtime_ns INTEGER NOT NULL, inode INTEGER NOT NULL, digest BLOB NOT NULL, "
+                         "last_used REAL NOT NULL, PRIMARY KEY (path, algorithm))")
+        conn.close()
+        cache = DigestCache(db_path)
+        try:
+            cache.store(self.doc_path, os.stat(self.doc_path), b"\x01" * 32)
+            self.assertEqual(cache.lookup(self.doc_path, os.stat(self.doc_path)), b"\x01" * 32)
+        finally:
+            cache.close()
+
+    def test_cached_digest_is_not_read_from_disk(self):
+        hash_file(self.doc_path)
+        stat_result = os.stat(self.doc_path)
+        self.cache.store(self.doc_path, stat_result, b"\x00" * 32)
+        self.assertEqual(hash_file(self.doc_path), "00" * 32)
+
+    def test_lru_eviction(self):
+        paths = []
+        for i in range(5):
+            path = os.path.join(self.temp_dir.name, f"file_{i}")
+            with open(path, 'wb') as f:
+                f.write(bytes([i]))
+            paths.append(path)
+            hash_file(path)
+        self.assertLessEqual(len(self.cache), 3)
+        self.assertGreater(self.cache.evictions, 0)
+        self.assertIsNone(self.cache.lookup(paths[0], os.stat(paths[0])))
+        self.assertIsNotNone(self.cache.lookup(paths[4], os.stat(paths[4])))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+import io
+import os
+import magic
+from app import sniff_mime, is_file_allowed
+from crypto_utils import generate_key_pair, SignatureEnvelope
+
+class TestFileValidation(unittest.TestCase):
+    def test_fast_paths_agree_with_libmagic(self):
+        private_pem, public_pem = generate_key_pair(1024)
+        samples = [
+            b'%PDF-1.7\n%\xe2\xe3\xcf\xd3\n' + os.urandom(512),
+            b'\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR' + os.urandom(512),
+            b'\xff\xd8\xff\xe0\x00\x10JFIF\x00' + os.urandom(512),
+            private_pem.encode(),
+            public_pem.encode(),
+            SignatureEnvelope(os.urandom(64), 'flat', algorithm='ed25519').to_bytes(),
+        ]
+        for data in samples:
+            head = data[:2048]
+            self.assertEqual(sniff_mime(head), magic.from_buffer(head, mime=True), head[:16])
+
+    def test_fallback_still_rejects_disallowed_types(self):
+        self.assertFalse(is_file_allowed(io.BytesIO(b'<html><body>hi</body></html>')))
+        self.assertFalse(is_file_allowed(io.BytesIO(b'')))
+        # Not ASCII, or not a key block: left to libmagic
+        lookalikes = [
+            b'-----BEGIN \x00\x01',
+            b'-----BEGIN PUBLIC KEY-----\n\x00\x01',
+            b'-----BEGIN PGP PUBLIC KEY BLOCK-----\n\nmQENBF\n-----END PGP PUBLIC KEY BLOCK-----\n',
+            b'-----BEGIN PGP MESSAGE-----\n\nhQEMA\n-----END PGP MESSAGE-----\n',
+            b'-----BEGIN <html><body>hi</body></html>\n',
+            b'-----BEGIN PUBLIC KEY-----<html><body>hi</body></html>\n',
+        ]
+        for head in lookalikes:
+            self.assertEqual(sniff_mime(head), magic.from_buffer(head, mime=True), head[:40])
+        self.assertFalse(is_file_allowed(io.BytesIO(lookalikes[2])))
+        self.assertFalse(is_file_allowed(io.BytesIO(lookalikes[4])))
+        self.assertTrue(is_file_allowed(io.BytesIO(b'Plain notes.\n')))
+
+    def test_stream_is_rewound(self):
+        stream = io.BytesIO(b'%PDF-1.4\n' + b'x' * 5000)
+        stream.seek(100)
+        self.assertTrue(is_file_allowed(stream))
+        self.assertEqual(stream.tell(), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,165 @@
+import unittest
+import base64
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from unittest import mock
+import app as app_module
+from app import app
+from crypto_utils import generate_key_pair
+from jobs import JobQueue, QueueFull
+
+class TestJobQueue(unittest.TestCase):
+    def setUp(self):
+        self.queue = JobQueue(workers=1, max_queued=1)
+
+    def tearDown(self):
+        self.queue.shutdown()
+
+    def test_job_runs_and_reports_result(self):
+        def work(job, value):
+            job.set_progress(0.5)
+            return value * 2
+        job = self.queue.submit('double', work, 21)
+        while not job.wait(5):
+            pass
+        self.assertEqual(job.status, 'done')
+        self.assertEqual(job.result, 42)
+        self.assertEqual(job.progress, 1.0)
+        self.assertIs(self.queue.get(job.id), job)
+
+    def test_failure_is_recorded(self):
+        def work(job):
+            raise ValueError("bad key")
+        job = self.queue.submit('fail', work)
+        while not job.wait(5):
+            pass
+        self.assertEqual(job.status, 'failed')
+        self.assertEqual(job.error, "bad key")
+
+    def test_full_queue_rejects_jobs(self):
+        release = threading.Event()
+        started = threading.Event()
+
+        def block(job):
+            started.set()
+            release.wait(5)
+
+        first = self.queue.submit('block', block)
+        started.wait(5)
+        self.queue.submit('block', block)  # fills the single queue slot
+        with self.assertRaises(QueueFull):
+            self.queue.submit('block', block)
+        self.assertEqual(self.queue.stats()['rejected'], 1)
+        release.set()
+        while not first.wait(5):
+            pass
+
+class TestJobRoutes(unittest.TestCase):
+    document = b"Evidence processed in the background.\n"
+
+    @classmethod
+    def setUpClass(cls):
+        cls.private_pem, cls.public_pem = (pem.encode() for pem in generate_key_pair(1024))
+
+    def setUp(self):
+        self.client = app.test_client()
+        self.saved_queue = app_module.job_queue
+        self.queue = app_module.job_queue = JobQueue(workers=1, max_queued=1)
+
+    def tearDown(self):
+        self.queue.shutdown()
+        app_module.job_queue = self.saved_queue
+        app.config['SPOOL_UPLOADS_TO_DISK'] = False
+
+    def submit_sign(self):
+        return self.client.post('/api/jobs/sign', data={
+            'document': (io.BytesIO(self.document), 'doc.txt'),
+            'private_key': (io.BytesIO(self.private_pem), 'private.pem'),
+        })
+
+    def record_detached(self, detached):
+        """Patch _detach_upload to append each (digest, temp path) it returns to detached"""
+        detach_upload = app_module._detach_upload
+
+        def detach(upload, digest_algorithm=None):
+            detached.append(detach_upload(upload, digest_algorithm))
+            return detached[-1]
+        return mock.patch.object(app_module, '_detach_upload', detach)
+
+    def finish(self, response):
+        self.assertEqual(response.status_code, 202, response.get_data(as_text=True))
+        status_url = response.get_json()['status_url']
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            state = self.client.get(status_url).get_json()
+            if state['status'] in ('done', 'failed'):
+                return state
+            time.sleep(0.01)
+        self.fail(f"job still {state['status']}")
+
+    def test_sign_then_verify(self):
+        signed = self.finish(self.submit_sign())
+        self.assertEqual(signed['status'], 'done', signed['error'])
+        self.assertEqual(signed['result']['digest'], hashlib.sha256(self.document).hexdigest())
+        signature = base64.b64decode(signed['result']['signature'])
+
+        for document, valid in ((self.document, True), (self.document + b"tampered", False)):
+            state = self.finish(self.client.post('/api/jobs/verify', data={
+                'document': (io.BytesIO(document), 'doc.txt'),
+                'signature': (io.BytesIO(signature), 'doc.sig'),
+                'public_key': (io.BytesIO(self.public_pem), 'public.pem'),
+            }))
+            self.assertEqual((state['status'], state['result']['valid']), ('done', valid))
+
+    def test_events_stream_ends_with_final_state(self):
+        response = self.submit_sign()
+        events = self.client.get(response.get_json()['events_url'])
+        self.assertEqual(events.mimetype, 'text/event-stream')
+        states = [json.loads(line[len('data: '):]) for line in events.get_data(as_text=True).splitlines()
+                  if line.startswith('data: ')]
+        self.assertEqual(states[-1]['status'], 'done')
+        self.assertEqual(states[-1]['progress'], 1.0)
+        self.assertEqual(self.client.get('/api/jobs/missing/events').status_code, 404)
+        self.assertEqual(self.client.get('/api/jobs/missing').status_code, 404)
+
+    def test_full_queue_returns_503(self):
+        release = threading.Event()
+        started = threading.Event()
+
+        def block(job):
+            started.set()
+            release.wait(5)
+
+        self.queue.submit('block', block)
+        started.wait(5)
+        self.queue.submit('block', block)  # fills the single queue slot
+        app.config['SPOOL_UPLOADS_TO_DISK'] = True
+        detached = []
+        try:
+            with self.record_detached(detached):
+                response = self.submit_sign()
+        finally:
+            release.set()
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers['Retry-After'], '5')
+        # The spooled copy of the rejected upload is not left behind
+        self.assertIsNotNone(detached[0][1])
+        self.assertFalse(os.path.exists(detached[0][1]))
+
+    def test_spooled_upload_is_removed_after_the_job(self):
+        app.config['SPOOL_UPLOADS_TO_DISK'] = True
+        detached = []
+        with self.record_detached(detached):
+            state = self.finish(self.submit_sign())
+        self.assertEqual(state['status'], 'done', state['error'])
+        self.assertEqual(state['result']['digest'], hashlib.sha256(self.document).hexdigest())
+        digest, path = detached[0]
+        self.assertIsNone(digest)
+        self.assertFalse(os.path.exists(path))
+
+if __name__ == '__main__':
+    unittest.main()
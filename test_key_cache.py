@@ -0,0 +1,65 @@
+import unittest
+import tempfile
+import os
+from unittest import mock
+import crypto_utils
+from crypto_utils import LRUCache, generate_key_pair, load_public_key, load_private_key
+
+class TestKeyCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        crypto_utils._key_cache.clear()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _write(self, name, content):
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
+
+    def test_same_key_at_different_paths_is_parsed_once(self):
+        _, pub = generate_key_pair()
+        first = load_public_key(self._write("a.pem", pub))
+        hits = crypto_utils._key_cache.hits
+        second = load_public_key(self._write("b.pem", pub))
+        self.assertIs(first, second)
+        self.assertEqual(crypto_utils._key_cache.hits, hits + 1)
+
+    def test_reused_path_returns_new_key(self):
+        priv_a, pub_a = generate_key_pair()
+        priv_b, pub_b = generate_key_pair()
+        path = self._write("public.pem", pub_a)
+        key_a = load_public_key(path)
+        self._write("public.pem", pub_b)
+        key_b = load_public_key(path)
+        self.assertNotEqual(key_a.public_numbers(), key_b.public_numbers())
+        # A private key must never be served from a public-key cache entry
+        path = self._write("private.pem", priv_a)
+        load_private_key(path)
+        with self.assertRaises(ValueError):
+            load_public_key(path)
+
+    def test_lru_eviction(self):
+        cache = LRUCache(max_size=2)
+        cache.put('public', 'a', 1)
+        cache.put('public', 'b', 2)
+        cache.get('public', 'a')
+        cache.put('public', 'c', 3)
+        self.assertEqual(cache.get('public', 'a'), 1)
+        self.assertIsNone(cache.get('public', 'b'))
+        self.assertEqual(cache.evictions, 1)
+
+    def test_ttl_expiry(self):
+        cache = LRUCache(ttl=10)
+        with mock.patch('crypto_utils.time.monotonic', return_value=100.0):
+            cache.put('public', 'a', 1)
+        with mock.patch('crypto_utils.time.monotonic', return_value=105.0):
+            self.assertEqual(cache.get('public', 'a'), 1)
+        with mock.patch('crypto_utils.time.monotonic', return_value=111.0):
+            self.assertIsNone(cache.get('public', 'a'))
+        self.assertEqual(cache.expirations, 1)
+
+if __name__ == '__main__':
+    unittest.main()
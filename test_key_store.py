@@ -0,0 +1,94 @@
+import unittest
+import tempfile
+import io
+import os
+import stat
+import time
+import app as app_module
+from app import app
+from artifact_store import ArtifactStore
+from crypto_utils import generate_key_pair, load_public_key_data, verify_digest, hash_data, parse_signature
+from key_store import KeyStore
+
+class TestKeyStore(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.private_pem, self.public_pem = generate_key_pair(1024)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_handle_resolves_and_caches_parsed_key(self):
+        store = KeyStore()
+        handle = store.put(self.private_pem, self.public_pem)
+        self.assertLess(len(handle), 32)
+        pair = store.get(handle)
+        self.assertEqual(pair.public_pem, self.public_pem)
+        self.assertIs(pair.private_key, store.get(handle).private_key)
+        self.assertIsNone(store.get('unknown'))
+        self.assertIsNone(store.get(None))
+        store.delete(handle)
+        self.assertIsNone(store.get(handle))
+
+    def test_entries_expire(self):
+        store = KeyStore(ttl=0.05)
+        handle = store.put(self.private_pem, self.public_pem)
+        time.sleep(0.1)
+        self.assertIsNone(store.get(handle))
+
+    def test_shared_database_across_instances(self):
+        db_path = os.path.join(self.temp_dir.name, "keys.db")
+        writer = KeyStore(db_path=db_path)
+        handle = writer.put(self.private_pem, self.public_pem)
+        self.assertEqual(stat.S_IMODE(os.stat(db_path).st_mode), 0o600)
+        reader = KeyStore(db_path=db_path)
+        self.assertEqual(reader.get(handle).private_pem, self.private_pem)
+        writer.delete(handle)
+        reader.delete(handle)
+        self.assertIsNone(KeyStore(db_path=db_path).get(handle))
+        writer.close()
+        reader.close()
+
+class TestSessionKeys(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.signature_store = app_module.signature_store
+        app_module.signature_store = ArtifactStore(self.temp_dir.name)
+        self.client = app.test_client()
+
+    def tearDown(self):
+        app_module.signature_store.stop()
+        app_module.signature_store = self.signature_store
+        self.temp_dir.cleanup()
+
+    def test_session_holds_only_a_handle(self):
+        response = self.client.post('/generate_keys', data={'key_size': 2048})
+        self.assertEqual(response.status_code, 302)
+        cookie = response.headers['Set-Cookie']
+        self.assertLess(len(cookie), 300)
+        self.assertNotIn('BEGIN', cookie)
+
+        public_pem = self.client.get('/download_key/public').data
+        self.assertIn(b'BEGIN PUBLIC KEY', public_pem)
+        self.assertIn(b'BEGIN PRIVATE KEY', self.client.get('/download_key/private').data)
+        self.assertEqual(self.client.get('/keys').status_code, 200)
+
+        # Signing without uploading a key uses the stored pair
+        document = b"Signed with the session key."
+        response = self.client.post('/sign_document', data={
+            'document': (io.BytesIO(document), 'doc.txt'),
+        }, content_type='multipart/form-data')
+        self.assertEqual(response.headers['Location'], '/signature_result')
+        signature = parse_signature(self.client.get('/download_signature').data)
+        self.assertTrue(verify_digest(bytes.fromhex(hash_data(document)), signature,
+                                      load_public_key_data(public_pem)))
+
+    def test_without_keys(self):
+        self.assertEqual(self.client.get('/download_key/public').status_code, 302)
+        response = self.client.post('/sign_document', data={
+            'document': (io.BytesIO(b"no key"), 'doc.txt'),
+        }, content_type='multipart/form-data')
+        self.assertTrue(response.headers['Location'].endswith('/sign_document'))
+
+if __name__ == '__main__':
+    unittest.main()
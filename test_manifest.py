@@ -0,0 +1,80 @@
+import unittest
+import tempfile
+import json
+import os
+from unittest import mock
+from crypto_utils import generate_key_pair, save_keys, hash_data
+import manifest as manifest_module
+from manifest import sign_manifest, verify_manifest, load_manifest
+
+class TestManifest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.temp_dir.name, "release")
+        os.makedirs(os.path.join(self.root, "docs"))
+        self.files = {"a.txt": b"alpha", "docs/b.txt": b"bravo", "docs/c.txt": b"charlie"}
+        for relpath, data in self.files.items():
+            with open(os.path.join(self.root, relpath), 'wb') as f:
+                f.write(data)
+        priv, pub = generate_key_pair()
+        self.priv_path = os.path.join(self.temp_dir.name, "private.pem")
+        self.pub_path = os.path.join(self.temp_dir.name, "public.pem")
+        save_keys(priv, pub, self.priv_path, self.pub_path)
+        self.manifest_path = os.path.join(self.root, "MANIFEST.json")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_manifest_lists_digests_and_verifies(self):
+        manifest = sign_manifest(self.root, self.manifest_path, self.priv_path, workers=2)
+        self.assertEqual(manifest['files'], {p: hash_data(d) for p, d in self.files.items()})
+        self.assertEqual(load_manifest(self.manifest_path), manifest)
+        result = verify_manifest(self.root, self.manifest_path, self.pub_path, workers=2)
+        self.assertTrue(result['signature_valid'])
+        self.assertTrue(result['valid'])
+
+    def test_manifest_with_other_digest(self):
+        manifest = sign_manifest(self.root, self.manifest_path, self.priv_path, algorithm='sha512')
+        self.assertEqual(manifest['digest'], 'sha512')
+        self.assertEqual(manifest['files'], {p: hash_data(d, 'sha512') for p, d in self.files.items()})
+        self.assertTrue(verify_manifest(self.root, self.manifest_path, self.pub_path)['valid'])
+
+    def test_modified_and_missing_files_are_reported(self):
+        sign_manifest(self.root, self.manifest_path, self.priv_path)
+        with open(os.path.join(self.root, "docs/b.txt"), 'ab') as f:
+            f.write(b"!")
+        os.unlink(os.path.join(self.root, "docs/c.txt"))
+        result = verify_manifest(self.root, self.manifest_path, self.pub_path)
+        statuses = {r['path']: r['status'] for r in result['results']}
+        self.assertEqual(statuses, {"a.txt": "ok", "docs/b.txt": "mismatch", "docs/c.txt": "missing"})
+        self.assertFalse(result['valid'])
+
+    def test_edited_manifest_fails_signature(self):
+        sign_manifest(self.root, self.manifest_path, self.priv_path)
+        with open(self.manifest_path) as f:
+            manifest = json.load(f)
+        manifest['files']['a.txt'] = hash_data(b"forged")
+        with open(self.manifest_path, 'w') as f:
+            json.dump(manifest, f)
+        result = verify_manifest(self.root, self.manifest_path, self.pub_path)
+        self.assertFalse(result['signature_valid'])
+        self.assertEqual(result['results'], [])
+
+    def test_manifest_swapped_after_signature_check_is_not_used(self):
+        sign_manifest(self.root, self.manifest_path, self.priv_path)
+        forged = load_manifest(self.manifest_path)
+        forged['files']['a.txt'] = hash_data(b"forged")
+        digest_stream = manifest_module.digest_stream
+
+        def swap_then_digest(*args, **kwargs):
+            # Replace the file between the read that is verified and any later read
+            manifest_module.write_manifest(forged, self.manifest_path)
+            return digest_stream(*args, **kwargs)
+
+        with mock.patch.object(manifest_module, 'digest_stream', swap_then_digest):
+            result = verify_manifest(self.root, self.manifest_path, self.pub_path)
+        self.assertTrue(result['valid'])
+        self.assertEqual({r['path']: r['status'] for r in result['results']}["a.txt"], "ok")
+
+if __name__ == '__main__':
+    unittest.main()
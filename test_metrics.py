@@ -0,0 +1,72 @@
+import unittest
+import tempfile
+import io
+import os
+import metrics
+from metrics import Registry
+from app import app
+from crypto_utils import generate_key_pair
+
+class TestRegistry(unittest.TestCase):
+    def test_text_exposition(self):
+        registry = Registry()
+        counter = registry.counter('test_total', "Things counted", ('kind',))
+        counter.inc(kind='a')
+        counter.inc(2, kind='a')
+        counter.set_total(7, kind='b')
+        histogram = registry.histogram('test_seconds', "Durations", buckets=(0.1, 1.0))
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+        histogram.observe(5)
+        text = registry.render()
+        self.assertIn('# TYPE test_total counter\ntest_total{kind="a"} 3\ntest_total{kind="b"} 7\n', text)
+        self.assertIn('test_seconds_bucket{le="0.1"} 1\n', text)
+        self.assertIn('test_seconds_bucket{le="1"} 2\n', text)
+        self.assertIn('test_seconds_bucket{le="+Inf"} 3\n', text)
+        self.assertIn('test_seconds_count 3\n', text)
+        with self.assertRaises(ValueError):
+            counter.inc(other='x')
+        with self.assertRaises(ValueError):
+            registry.gauge('test_total', "Clash")
+
+class TestMetricsEndpoint(unittest.TestCase):
+    def setUp(self):
+        self.client = app.test_client()
+        self.private_pem = generate_key_pair(1024)[0].encode()
+
+    def sign(self):
+        return self.client.post('/api/sign', data={
+            'document': (io.BytesIO(b"metrics test document"), 'doc.txt'),
+            'private_key': (io.BytesIO(self.private_pem), 'private.pem'),
+        })
+
+    def test_phases_and_requests_are_recorded(self):
+        before = {phase: metrics.phase_seconds.snapshot(phase=phase)['count']
+                  for phase in ('upload_read', 'magic_sniff', 'key_parse', 'hash', 'sign')}
+        self.assertEqual(self.sign().status_code, 200)
+        for phase, count in before.items():
+            self.assertGreater(metrics.phase_seconds.snapshot(phase=phase)['count'], count, phase)
+
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith('text/plain'))
+        text = response.get_data(as_text=True)
+        self.assertIn('dsv_requests_total{endpoint="api_sign",method="POST",status="200"}', text)
+        self.assertIn('dsv_phase_seconds_bucket{phase="hash",le="+Inf"}', text)
+        self.assertIn('dsv_key_cache_entries', text)
+        self.assertIn('# TYPE dsv_key_cache_lookups_total counter\n', text)
+        self.assertIn('dsv_key_cache_lookups_total{outcome="hits"}', text)
+
+    def test_profiling_hook_dumps_stats(self):
+        with tempfile.TemporaryDirectory() as profile_dir:
+            app.config.update(PROFILE_REQUESTS=True, PROFILE_DIR=profile_dir)
+            try:
+                self.assertEqual(self.sign().status_code, 200)
+            finally:
+                app.config['PROFILE_REQUESTS'] = False
+            profiles = os.listdir(profile_dir)
+            self.assertEqual(len(profiles), 1)
+            self.assertIn('api_sign', profiles[0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import unittest
+import tempfile
+import io
+import json
+import os
+import zipfile
+from app import app
+from crypto_utils import generate_key_pair, save_keys, hash_file, sign_file, verify_signature, save_signature
+import parallel
+from parallel import hash_files, sign_files, verify_files, verify_directory
+
+class TestParallel(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.docs = []
+        for i in range(6):
+            path = os.path.join(self.temp_dir.name, f"doc_{i}.txt")
+            with open(path, 'wb') as f:
+                f.write(os.urandom(10000 + i))
+            self.docs.append(path)
+
+        priv, pub = generate_key_pair()
+        self.priv_path = os.path.join(self.temp_dir.name, "private.key")
+        self.pub_path = os.path.join(self.temp_dir.name, "public.key")
+        save_keys(priv, pub, self.priv_path, self.pub_path)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_hash_files_matches_serial(self):
+        for workers in (1, 3):
+            self.assertEqual(hash_files(self.docs, workers=workers),
+                             [hash_file(p) for p in self.docs])
+
+    def test_sign_files(self):
+        signatures = sign_files(self.docs, self.priv_path, workers=2)
+        for path, sig in zip(self.docs, signatures):
+            self.assertTrue(verify_signature(path, sig, self.pub_path))
+
+    def test_verify_files_reports_per_item(self):
+        sig = sign_file(self.docs[0], self.priv_path)
+        items = [
+            {'document': self.docs[0], 'signature': sig, 'public_key': self.pub_path},
+            {'document': self.docs[1], 'signature': sig, 'public_key': self.pub_path},
+            {'document': os.path.join(self.temp_dir.name, "missing"), 'signature': sig, 'public_key': self.pub_path},
+        ]
+        results = verify_files(items, workers=2)
+        self.assertEqual([r['valid'] for r in results], [True, False, False])
+        self.assertIsNotNone(results[2]['error'])
+
+    def test_verify_files_mixed_digest_algorithms(self):
+        items = []
+        for i, path in enumerate(self.docs):
+            algorithm = ('sha256', 'sha512', 'blake2s')[i % 3]
+            items.append({'document': path, 'signature': sign_file(path, self.priv_path, digest_algorithm=algorithm),
+                          'public_key': self.pub_path})
+        self.assertTrue(all(r['valid'] for r in verify_files(items, workers=2)))
+
+    def test_thread_only_hashing_never_forks(self):
+        parallel.shutdown()
+        items = [{'document': path, 'signature': sign_file(path, self.priv_path), 'public_key': self.pub_path}
+                 for path in self.docs]
+        self.assertTrue(all(r['valid'] for r in verify_files(items, workers=3, processes=False)))
+        self.assertEqual(hash_files(self.docs, workers=3, processes=False), [hash_file(p) for p in self.docs])
+        self.assertEqual({kind for kind, _ in parallel._pools}, {'thread'})
+
+    def test_verify_directory(self):
+        for path in self.docs:
+            save_signature(sign_file(path, self.priv_path), path + '.sig')
+        with open(self.docs[2], 'ab') as f:
+            f.write(b"tampered")
+        results = verify_directory(self.temp_dir.name, self.pub_path, workers=2)
+        self.assertEqual(len(results), len(self.docs))
+        self.assertEqual([r['valid'] for r in results], [i != 2 for i in range(len(self.docs))])
+
+class TestBatchArchive(unittest.TestCase):
+    def setUp(self):
+        self.client = app.test_client()
+        self.limits = app.config['ARCHIVE_MAX_MEMBERS'], app.config['ARCHIVE_MAX_EXTRACTED_SIZE']
+        with tempfile.TemporaryDirectory() as temp_dir:
+            doc_path = os.path.join(temp_dir, "doc.txt")
+            with open(doc_path, 'wb') as f:
+                f.write(b"a" * 5000)
+            priv_path, pub_path = os.path.join(temp_dir, "private.pem"), os.path.join(temp_dir, "public.pem")
+            save_keys(*generate_key_pair(1024), priv_path, pub_path)
+            sig_path = os.path.join(temp_dir, "doc.sig")
+            save_signature(sign_file(doc_path, priv_path), sig_path)
+            buffer = io.BytesIO()
+            with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zf:
+                for path in (doc_path, sig_path, pub_path):
+                    zf.write(path, os.path.basename(path))
+                zf.writestr('manifest.json', json.dumps(
+                    [{'document': 'doc.txt', 'signature': 'doc.sig', 'public_key': 'public.pem'}]))
+            self.archive = buffer.getvalue()
+
+    def tearDown(self):
+        app.config['ARCHIVE_MAX_MEMBERS'], app.config['ARCHIVE_MAX_EXTRACTED_SIZE'] = self.limits
+
+    def post(self):
+        return self.client.post('/api/verify_batch', data={'archive': (io.BytesIO(self.archive), 'batch.zip')})
+
+    def test_archive_within_limits(self):
+        response = self.post()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['valid'], 1)
+
+    def test_extraction_limits(self):
+        app.config['ARCHIVE_MAX_MEMBERS'] = 3
+        response = self.post()
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("more than 3 files", response.get_json()['error'])
+
+        # The document alone compresses to a few bytes but expands past the quota
+        app.config['ARCHIVE_MAX_MEMBERS'] = 10
+        app.config['ARCHIVE_MAX_EXTRACTED_SIZE'] = 4096
+        response = self.post()
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("expands to more than", response.get_json()['error'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,12 @@
 import unittest
 import tempfile
 import os
-from crypto_utils import generate_key_pair, save_keys, sign_file, verify_signature, save_signature, load_signature
+import json
+import struct
+import time
+from crypto_utils import (generate_key_pair, save_keys, sign_file, verify_signature, save_signature, load_signature,
+                          verify_batch, sign_file_merkle, verify_file_merkle, parse_signature, SignatureEnvelope,
+                          SIGNATURE_MAGIC)
 
 class TestSignatureVerification(unittest.TestCase):
     def setUp(self):
@@ -52,5 +57,105 @@ class TestSignatureVerification(unittest.TestCase):
         loaded = load_signature(sig_path)
         self.assertEqual(sig, loaded)
 
+    def test_verify_batch(self):
+        sig = sign_file(self.doc_path, self.priv_path)
+        sig_path = os.path.join(self.temp_dir.name, "doc.txt.sig")
+        save_signature(sig, sig_path)
+        results = verify_batch([
+            {'document': self.doc_path, 'signature': sig_path, 'public_key': self.pub_path},
+            {'document': self.doc_path, 'signature': b"bogus", 'public_key': self.pub_path},
+            {'document': self.doc_path, 'signature': sig, 'public_key': self.priv_path},
+            {'document': self.doc_path, 'public_key': self.pub_path},
+        ])
+        self.assertEqual([r['valid'] for r in results], [True, False, False, False])
+        self.assertIsNone(results[0]['error'])
+        self.assertIsNone(results[1]['error'])
+        self.assertIn("PUBLIC key", results[2]['error'])
+        self.assertIn("signature", results[3]['error'])
+
+    def _write_chunks(self, chunks):
+        with open(self.doc_path, 'wb') as f:
+            f.write(b"".join(chunks))
+
+    def test_merkle_signature_round_trip(self):
+        self._write_chunks([bytes([i]) * 1000 for i in range(5)])
+        envelope = sign_file_merkle(self.doc_path, self.priv_path, chunk_size=1000, workers=2)
+        self.assertEqual(len(envelope.chunk_hashes), 5)
+        sig_path = os.path.join(self.temp_dir.name, "doc.txt.sig")
+        save_signature(envelope, sig_path)
+        loaded = load_signature(sig_path)
+        self.assertIsInstance(loaded, SignatureEnvelope)
+        self.assertEqual(loaded.chunk_hashes, envelope.chunk_hashes)
+        self.assertTrue(verify_signature(self.doc_path, loaded, self.pub_path))
+        # Plain signatures still load as raw bytes
+        save_signature(sign_file(self.doc_path, self.priv_path), sig_path)
+        self.assertIsInstance(load_signature(sig_path), bytes)
+
+    def test_merkle_localizes_tampered_chunks(self):
+        chunks = [bytes([i]) * 1000 for i in range(5)]
+        self._write_chunks(chunks)
+        envelope = sign_file_merkle(self.doc_path, self.priv_path, chunk_size=1000)
+        chunks[3] = b"X" * 1000
+        self._write_chunks(chunks)
+        result = verify_file_merkle(self.doc_path, envelope, self.pub_path)
+        self.assertTrue(result['signature_valid'])
+        self.assertFalse(result['valid'])
+        self.assertEqual(result['tampered_chunks'], [3])
+        # Only the requested chunks are checked
+        partial = verify_file_merkle(self.doc_path, envelope, self.pub_path, indices=[0, 1])
+        self.assertTrue(partial['valid'])
+
+    def test_merkle_detects_appended_data(self):
+        self._write_chunks([b"a" * 1500])
+        envelope = sign_file_merkle(self.doc_path, self.priv_path, chunk_size=1000)
+        self._write_chunks([b"a" * 1500, b"b" * 1000])
+        result = verify_file_merkle(self.doc_path, envelope, self.pub_path)
+        self.assertFalse(result['valid'])
+        self.assertEqual(result['tampered_chunks'], [1, 2])
+
+    def test_merkle_rejects_forged_chunk_list(self):
+        envelope = sign_file_merkle(self.doc_path, self.priv_path, chunk_size=8)
+        envelope.chunk_hashes[0] = b"\x00" * 32
+        result = verify_file_merkle(self.doc_path, envelope, self.pub_path)
+        self.assertFalse(result['signature_valid'])
+        self.assertFalse(result['valid'])
+
+    def test_envelope_header_is_checked_against_the_data(self):
+        def envelope(header, body=b"\x00" * 64):
+            raw = json.dumps(header).encode()
+            return SIGNATURE_MAGIC + struct.pack('>I', len(raw)) + raw + body
+
+        merkle = {'format': 'merkle', 'signature_length': 32, 'chunks': 1, 'chunk_size': 8, 'file_size': 8}
+        self.assertEqual(len(SignatureEnvelope.from_bytes(envelope(merkle)).chunk_hashes), 1)
+
+        start = time.perf_counter()
+        with self.assertRaises(ValueError):
+            SignatureEnvelope.from_bytes(envelope(dict(merkle, chunks=10 ** 9)))
+        self.assertLess(time.perf_counter() - start, 0.5)
+        for header in (dict(merkle, chunks=-1), dict(merkle, signature_length=True),
+                       {k: v for k, v in merkle.items() if k != 'chunk_size'},
+                       dict(merkle, chunk_size=0), dict(merkle, file_size=-8), dict(merkle, file_size="8")):
+            with self.assertRaises(ValueError):
+                SignatureEnvelope.from_bytes(envelope(header))
+
+        # A malformed item is reported on its own and does not stop the batch
+        bad_sig = os.path.join(self.temp_dir.name, "bad.sig")
+        with open(bad_sig, 'wb') as f:
+            f.write(envelope({k: v for k, v in merkle.items() if k != 'file_size'}))
+        good_sig = os.path.join(self.temp_dir.name, "good.sig")
+        save_signature(sign_file(self.doc_path, self.priv_path), good_sig)
+        results = verify_batch([{'document': self.doc_path, 'signature': path, 'public_key': self.pub_path}
+                                for path in (bad_sig, good_sig)])
+        self.assertIn("Malformed", results[0]['error'])
+        self.assertTrue(results[1]['valid'])
+
+    def test_envelope_header_must_be_an_object_of_strings(self):
+        flat = {'format': 'flat', 'signature_length': 64}
+        for header in ([], "x", 1, None, dict(flat, format=None), {'signature_length': 64},
+                       dict(flat, algorithm=['ed25519']), dict(flat, digest=[1]), dict(flat, digest={'a': 1})):
+            raw = json.dumps(header).encode()
+            with self.subTest(header=header), self.assertRaisesRegex(ValueError, "Malformed signature file"):
+                parse_signature(SIGNATURE_MAGIC + struct.pack('>I', len(raw)) + raw + b"\x00" * 64)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,138 @@
+import unittest
+import tempfile
+import hashlib
+import os
+import socket
+import stat
+import threading
+from crypto_utils import generate_key_pair, save_keys, load_public_key, parse_signature, verify_digest
+from signing_daemon import SigningDaemon, SigningClient, encode_frame
+
+class TestSigningDaemon(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = tempfile.TemporaryDirectory()
+        cls.priv_path = os.path.join(cls.temp_dir.name, "private.pem")
+        cls.pub_path = os.path.join(cls.temp_dir.name, "public.pem")
+        save_keys(*generate_key_pair(1024), cls.priv_path, cls.pub_path)
+        cls.socket_path = os.path.join(cls.temp_dir.name, "sign.sock")
+        cls.daemon = SigningDaemon(cls.socket_path, {'release': cls.priv_path}, workers=2, max_batch=16)
+        cls.daemon.start()
+        cls.public_key = load_public_key(cls.pub_path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.daemon.stop()
+        cls.temp_dir.cleanup()
+
+    def assertValid(self, digest, signature):
+        self.assertTrue(verify_digest(digest, parse_signature(signature), self.public_key))
+
+    def test_pipelined_signing(self):
+        digests = [hashlib.sha256(str(i).encode()).digest() for i in range(100)]
+        with SigningClient(self.socket_path) as client:
+            self.assertEqual(client.keys(), {'release': 'rsa-pkcs1v15'})
+            signatures = client.sign_many('release', digests, window=32)
+            self.assertEqual(len(signatures), 100)
+            for digest, signature in zip(digests, signatures):
+                self.assertValid(digest, signature)
+
+            digest = hashlib.sha512(b"doc").digest()
+            signature = client.sign('release', digest, algorithm='rsa-pss', digest_algorithm='sha512')
+            envelope = parse_signature(signature)
+            self.assertEqual((envelope.algorithm, envelope.digest_algorithm), ('rsa-pss', 'sha512'))
+            self.assertValid(digest, signature)
+        self.assertEqual(stat.S_IMODE(os.stat(self.socket_path).st_mode), 0o600)
+
+    def test_errors_do_not_break_the_connection(self):
+        digest = hashlib.sha256(b"doc").digest()
+        with SigningClient(self.socket_path) as client:
+            with self.assertRaisesRegex(ValueError, "Unknown key"):
+                client.sign('missing', digest)
+            with self.assertRaisesRegex(ValueError, "Digest must be"):
+                client.sign('release', digest[:16])
+            self.assertValid(digest, client.sign('release', digest))
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as raw:
+            raw.connect(self.socket_path)
+            raw.sendall(b"\x00\x00\x00\x03abc" + encode_frame({'id': 7, 'op': 'nope'}))
+            reader = raw.makefile('rb')
+            responses = []
+            for _ in range(2):
+                length = int.from_bytes(reader.read(4), 'big')
+                responses.append(reader.read(length))
+            self.assertIn(b"Malformed request", responses[0])
+            self.assertIn(b"Unsupported operation", responses[1])
+            reader.close()
+
+    def test_concurrent_clients(self):
+        failures = []
+
+        def worker(n):
+            digests = [hashlib.sha256(f"{n}-{i}".encode()).digest() for i in range(25)]
+            try:
+                with SigningClient(self.socket_path) as client:
+                    for digest, signature in zip(digests, client.sign_many('release', digests)):
+                        if not verify_digest(digest, parse_signature(signature), self.public_key):
+                            failures.append(n)
+            except Exception as e:
+                failures.append(e)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(failures, [])
+
+    def test_refuses_to_replace_a_regular_file(self):
+        path = os.path.join(self.temp_dir.name, "not-a-socket")
+        with open(path, 'w') as f:
+            f.write("keep me")
+        daemon = SigningDaemon(path, {'release': self.priv_path}, workers=1)
+        with self.assertRaisesRegex(ValueError, "not a socket"):
+            daemon.start()
+        with open(path) as f:
+            self.assertEqual(f.read(), "keep me")
+
+    def test_live_socket_is_not_taken_over(self):
+        second = SigningDaemon(self.socket_path, {'release': self.priv_path}, workers=1)
+        with self.assertRaisesRegex(ValueError, "in use"):
+            second.start()
+        with SigningClient(self.socket_path) as client:
+            self.assertEqual(client.keys(), {'release': 'rsa-pkcs1v15'})
+
+    def test_stale_socket_is_replaced_and_stop_leaves_a_successor(self):
+        path = os.path.join(self.temp_dir.name, "stale.sock")
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(path)
+        stale.close()  # bound but not listening: connect() is refused
+        daemon = SigningDaemon(path, {'release': self.priv_path}, workers=1)
+        daemon.start()
+        # Someone else's socket now sits at the path; stop() must leave it alone
+        os.unlink(path)
+        successor = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        successor.bind(path)
+        try:
+            daemon.stop()
+            self.assertTrue(os.path.exists(path))
+        finally:
+            successor.close()
+
+    def test_pending_queue_is_bounded(self):
+        path = os.path.join(self.temp_dir.name, "bounded.sock")
+        daemon = SigningDaemon(path, {'release': self.priv_path}, workers=1, max_batch=4, max_pending=4)
+        daemon.start()
+        try:
+            self.assertEqual(daemon._queue.maxsize, 4)
+            self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o600)
+            digests = [hashlib.sha256(str(i).encode()).digest() for i in range(50)]
+            with SigningClient(path) as client:
+                for digest, signature in zip(digests, client.sign_many('release', digests, window=50)):
+                    self.assertValid(digest, signature)
+        finally:
+            daemon.stop()
+        self.assertFalse(os.path.exists(path))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+class TestStartup(unittest.TestCase):
+    def run_python(self, code):
+        # A fresh interpreter, so nothing the other tests imported is loaded
+        result = subprocess.run([sys.executable, '-c', code], cwd=REPO_ROOT, capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        return json.loads(result.stdout)
+
+    def test_import_defers_backends_and_setup(self):
+        state = self.run_python(
+            "import json, logging, sys, app\n"
+            "print(json.dumps({'loaded': [m for m in ('magic', 'cryptography') if m in sys.modules],\n"
+            "                  'handlers': len(logging.getLogger().handlers),\n"
+            "                  'catalog': app.challenge_catalog is not None}))")
+        self.assertEqual(state, {'loaded': [], 'handlers': 0, 'catalog': False})
+
+    def test_create_app_applies_config(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            uploads = os.path.join(temp_dir, 'uploads')
+            challenges = os.path.join(temp_dir, 'challenges')
+            state = self.run_python(
+                "import json, app\n"
+                f"flask_app = app.create_app({{'UPLOAD_FOLDER': {uploads!r}, 'CHALLENGES_DIR': {challenges!r},\n"
+                "                             'VERIFY_CACHE_SIZE': 0, 'JOB_WORKERS': 3})\n"
+                "print(json.dumps({'same_app': flask_app is app.app,\n"
+                "                  'signatures': app._signature_store().root,\n"
+                "                  'job_workers': app._job_queue().workers,\n"
+                "                  'verification_cache': app.verification_cache is not None,\n"
+                "                  'challenges': len(app.challenge_catalog)}))")
+            self.assertEqual(state, {'same_app': True, 'signatures': os.path.join(uploads, 'signatures'),
+                                     'job_workers': 3, 'verification_cache': False, 'challenges': 0})
+            self.assertTrue(os.path.isdir(uploads))
+            self.assertTrue(os.path.isdir(challenges))
+
+    def test_config_after_setup_is_refused(self):
+        state = self.run_python(
+            "import json, app\n"
+            "app._job_queue()\n"
+            "try:\n"
+            "    app.create_app({'JOB_WORKERS': 7})\n"
+            "    error = None\n"
+            "except RuntimeError as e:\n"
+            "    error = str(e)\n"
+            "print(json.dumps({'error': error, 'job_workers': app._job_queue().workers,\n"
+            "                  'again': app.create_app() is app.app}))")
+        self.assertIn("job_queue", state['error'])
+        self.assertEqual((state['job_workers'], state['again']), (2, True))
+
+if __name__ == '__main__':
+    unittest.main()
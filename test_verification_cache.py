@@ -0,0 +1,76 @@
+import unittest
+import tempfile
+import os
+import time
+import crypto_utils
+from crypto_utils import (generate_key_pair, save_keys, sign_file, verify_signature, set_verification_cache,
+                          verification_key, load_public_key)
+from verification_cache import VerificationCache
+
+class TestVerificationCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.doc_path = os.path.join(self.temp_dir.name, "doc.txt")
+        with open(self.doc_path, 'w') as f:
+            f.write("Evidence under audit.")
+        priv, pub = generate_key_pair(1024)
+        self.priv_path = os.path.join(self.temp_dir.name, "private.pem")
+        self.pub_path = os.path.join(self.temp_dir.name, "public.pem")
+        save_keys(priv, pub, self.priv_path, self.pub_path)
+        self.previous = crypto_utils._verification_cache
+
+    def tearDown(self):
+        set_verification_cache(self.previous)
+        self.temp_dir.cleanup()
+
+    def test_repeat_verification_is_served_from_cache(self):
+        cache = VerificationCache()
+        set_verification_cache(cache)
+        sig = sign_file(self.doc_path, self.priv_path)
+        self.assertTrue(verify_signature(self.doc_path, sig, self.pub_path))
+        self.assertTrue(verify_signature(self.doc_path, sig, self.pub_path))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+        # A different document digest is a different key
+        with open(self.doc_path, 'a') as f:
+            f.write("!")
+        self.assertFalse(verify_signature(self.doc_path, sig, self.pub_path))
+        self.assertEqual(cache.misses, 2)
+
+    def test_key_covers_digest_signature_and_key(self):
+        public_key = load_public_key(self.pub_path)
+        other_key = crypto_utils.load_public_key_data(generate_key_pair(1024)[1].encode())
+        base = verification_key(b"\x01" * 32, b"sig", public_key)
+        self.assertNotEqual(base, verification_key(b"\x02" * 32, b"sig", public_key))
+        self.assertNotEqual(base, verification_key(b"\x01" * 32, b"sih", public_key))
+        self.assertNotEqual(base, verification_key(b"\x01" * 32, b"sig", other_key))
+
+    def test_ttl_expires_entries(self):
+        cache = VerificationCache(ttl=0.05)
+        cache.store("k", True)
+        self.assertTrue(cache.lookup("k"))
+        time.sleep(0.1)
+        self.assertIsNone(cache.lookup("k"))
+
+    def test_shared_database_across_instances(self):
+        db_path = os.path.join(self.temp_dir.name, "verdicts.db")
+        writer = VerificationCache(db_path=db_path)
+        writer.store("k", False)
+        reader = VerificationCache(db_path=db_path)
+        self.assertIs(reader.lookup("k"), False)
+        self.assertEqual(reader.stats()['shared_hits'], 1)
+        # Now held in memory too
+        self.assertIs(reader.lookup("k"), False)
+        self.assertEqual(reader.stats()['shared_hits'], 1)
+        writer.close()
+        reader.close()
+
+    def test_memory_is_bounded(self):
+        cache = VerificationCache(max_size=2)
+        for key in "abc":
+            cache.store(key, True)
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.lookup("a"))
+
+if __name__ == '__main__':
+    unittest.main()
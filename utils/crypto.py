@@ -6,18 +6,20 @@ from cryptography.hazmat.primitives.asymmetric import padding, rsa, utils
 from cryptography.hazmat.primitives.asymmetric.rsa import RSAPublicKey, RSAPrivateKey
 from cryptography.exceptions import InvalidSignature
 from cryptography.hazmat.backends import default_backend
+from crypto_utils import LRUCache, key_fingerprint
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
-_key_cache = {}
+_key_cache = LRUCache()
 
 def load_public_key(key_path):
     """Load and validate a public key from a PEM file."""
-    if key_path in _key_cache:
-        return _key_cache[key_path]
-        
     with open(key_path, 'rb') as f:
         pem_data = f.read()
+
+    fingerprint = key_fingerprint(pem_data)
+    cached = _key_cache.get('public', fingerprint)
+    if cached is not None:
+        return cached
     
     # Strict PEM format validation
     if b"-----BEGIN PUBLIC KEY-----" not in pem_data:
@@ -31,7 +33,7 @@ def load_public_key(key_path):
     if not isinstance(key, RSAPublicKey):
         raise ValueError("Invalid key type: The provided key is not a valid RSA public key")
     
-    _key_cache[key_path] = key
+    _key_cache.put('public', fingerprint, key)
     return key
 
 def verify_signature(file_path, signature, public_key_path):
@@ -0,0 +1,100 @@
+"""Cache of signature verdicts keyed by what was verified.
+
+The key combines the document digest, the SHA-256 of the serialized
+signature and the fingerprint of the public key, so a verdict can only be
+reused for exactly the same (document, signature, key) triple. Verdicts
+are deterministic; the TTL only bounds how long stale entries occupy space.
+
+Verdicts are held in a bounded in-memory LRU. With ``db_path`` they are also
+written to SQLite so every worker process sharing the file benefits;
+in-memory misses fall through to the database.
+
+Install a cache with ``crypto_utils.set_verification_cache(VerificationCache())``
+to make ``verify_digest`` (and everything built on it) consult it.
+"""
+import time
+import logging
+from crypto_utils import LRUCache
+from sqlite_db import SQLiteDB, lookup_stats
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS verdicts (
+    key TEXT PRIMARY KEY,
+    valid INTEGER NOT NULL,
+    expires REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS verdicts_last_used ON verdicts (last_used);
+"""
+
+
+class VerificationCache:
+    def __init__(self, max_size=10_000, ttl=3600, db_path=None, max_entries=1_000_000):
+        self.ttl = ttl
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.shared_hits = 0
+        self.evictions = 0
+        self._memory = LRUCache(max_size, ttl)
+        self._db = None
+        if db_path is not None:
+            self._db = SQLiteDB(db_path, _SCHEMA, maintenance_interval=min(1000, max_entries // 10))
+
+    def lookup(self, key):
+        """Return the cached verdict (True/False) for a verification key, or None"""
+        valid = self._memory.get('verdict', key)
+        if valid is not None:
+            self.hits += 1
+            return valid
+        if self._db is None:
+            self.misses += 1
+            return None
+
+        now = time.time()
+        with self._db.connect() as conn:
+            row = conn.execute("SELECT valid, expires FROM verdicts WHERE key = ?", (key,)).fetchone()
+            if row is None or row[1] <= now:
+                if row is not None:
+                    conn.execute("DELETE FROM verdicts WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            conn.execute("UPDATE verdicts SET last_used = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            self.shared_hits += 1
+        valid = bool(row[0])
+        self._memory.put('verdict', key, valid)
+        return valid
+
+    def store(self, key, valid):
+        self._memory.put('verdict', key, valid)
+        if self._db is None:
+            return
+        now = time.time()
+        with self._db.connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO verdicts (key, valid, expires, last_used) VALUES (?, ?, ?, ?)",
+                         (key, int(valid), now + self.ttl, now))
+            if self._db.wrote():
+                conn.execute("DELETE FROM verdicts WHERE expires <= ?", (now,))
+                self.evictions += self._db.trim(conn, 'verdicts', self.max_entries)
+
+    def clear(self):
+        self._memory.clear()
+        if self._db is not None:
+            with self._db.connect() as conn:
+                conn.execute("DELETE FROM verdicts")
+
+    def __len__(self):
+        return len(self._memory)
+
+    def stats(self):
+        """Hit/miss counters for this process"""
+        return lookup_stats(self.hits, self.misses, size=len(self._memory), shared_hits=self.shared_hits,
+                            evictions=self._memory.evictions + self.evictions)
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()